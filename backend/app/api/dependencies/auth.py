@@ -13,6 +13,7 @@ from app.models.user import UserInDB
 from app.api.dependencies.database import get_repository
 from app.db.repositories.users import UsersRepository
 from app.services import auth_service
+from app.services import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f'{API_PREFIX}/users/login/token/')
 
@@ -24,7 +25,13 @@ async def get_user_from_token(
 ) -> Optional[UserInDB]:
     try:
         username = auth_service.get_username_from_token(token=token, secret_key=str(SECRET_KEY))
-        user = await user_repo.get_user_by_username(username=username)
+
+        # the token is verified (or found in the verified token cache) above, this only saves the db lookup
+        user = user_cache.get_user(token=token)
+        if not user:
+            user = await user_repo.get_user_by_username(username=username)
+            if user:
+                user_cache.set_user(token=token, user=user)
     except Exception as e:
         raise e
 
@@ -39,4 +46,12 @@ def get_current_active_user(current_user: UserInDB = Depends(get_user_from_token
             headers={'WWW-Authenticate': 'Bearer'},
         )
     
+    return current_user
+
+def get_current_superuser(current_user: UserInDB = Depends(get_current_active_user)) -> UserInDB:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail='Action forbidden. Only superusers can access this resource.',
+        )
+
     return current_user
\ No newline at end of file
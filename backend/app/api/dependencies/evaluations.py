@@ -1,5 +1,3 @@
-from typing import List
-
 from fastapi import HTTPException
 from fastapi import Depends
 from fastapi import Path
@@ -7,25 +5,43 @@ from fastapi import status
 
 from app.models.user import UserInDB
 from app.models.cleaning import CleaningInDB
-from app.models.offer import OfferInDB
 from app.models.evaluation import EvaluationInDB
 
 from app.db.repositories.evaluations import EvaluationsRepository
+from app.db.repositories.evaluations import EvaluationCreateContext
 
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.auth import get_current_active_user
 from app.api.dependencies.users import get_user_by_username_from_path
 from app.api.dependencies.cleanings import get_cleaning_by_id_from_path
-from app.api.dependencies.offers import get_offer_for_cleaning_from_user_by_path
 
 
-async def check_evaluation_create_permissions(
+async def get_evaluation_create_context_from_path(
+    cleaning_id: int = Path(..., ge=1),
+    username: str = Path(..., min_length=3, regex='^[a-zA-Z0-9_-]+$'),
     current_user: UserInDB = Depends(get_current_active_user),
-    cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
-    cleaner: UserInDB = Depends(get_user_by_username_from_path),
-    offer: OfferInDB = Depends(get_offer_for_cleaning_from_user_by_path),
     evals_repo: EvaluationsRepository = Depends(get_repository(EvaluationsRepository)),
+) -> EvaluationCreateContext:
+    '''
+    Resolves the cleaning, cleaner and offer in a single query instead of one query per dependency.
+    '''
+    context = await evals_repo.get_evaluation_create_context(cleaning_id=cleaning_id, cleaner_username=username)
+
+    if not context:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No cleaning found with that id.')
+    if not context.cleaner:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No user found with that username.')
+    if not context.offer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Offer not found.')
+
+    return context
+
+
+async def check_evaluation_create_permissions(
+    current_user: UserInDB = Depends(get_current_active_user),
+    context: EvaluationCreateContext = Depends(get_evaluation_create_context_from_path),
 ) -> None:
+    cleaning, cleaner, offer = context
     # check that only owners of a cleaning can leave evaluations for that cleaning job
     if cleaning.owner != current_user.id:
         raise HTTPException(
@@ -46,14 +62,6 @@ async def check_evaluation_create_permissions(
         )
 
 
-async def list_evaluations_for_cleaner_from_path(
-    cleaner: UserInDB = Depends(get_user_by_username_from_path),
-    evals_repo: EvaluationsRepository = Depends(get_repository(EvaluationsRepository)),
-) -> List[EvaluationInDB]:
-
-    return await evals_repo.list_evaluations_for_cleaner(cleaner=cleaner)
-
-
 async def get_cleaner_evaluation_for_cleaning_from_path(
     cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
     cleaner: UserInDB = Depends(get_user_by_username_from_path),
@@ -0,0 +1,13 @@
+from typing import Dict
+from typing import Optional
+
+from starlette.requests import Request  # TODO: replace starlette with fastapi
+
+
+def get_readiness(request: Request) -> bool:
+    # set once startup warmup finishes, cleared as soon as shutdown begins
+    return getattr(request.app.state, '_ready', False)
+
+
+def get_warmup_report(request: Request) -> Optional[Dict]:
+    return getattr(request.app.state, '_warmup', None)
\ No newline at end of file
@@ -0,0 +1,23 @@
+from starlette.requests import Request  # TODO: replace starlette with fastapi
+
+from app.core.metrics import RequestMetrics
+from app.core.metrics import EventLoopMonitor
+
+from app.db.pool import InstrumentedPool
+from app.db.instrumentation import QueryStatsRegistry
+
+
+def get_db_pool(request: Request) -> InstrumentedPool:
+    return request.app.state._db_pool
+
+
+def get_query_stats(request: Request) -> QueryStatsRegistry:
+    return request.app.state._query_stats
+
+
+def get_request_metrics(request: Request) -> RequestMetrics:
+    return request.app.state._request_metrics
+
+
+def get_loop_monitor(request: Request) -> EventLoopMonitor:
+    return request.app.state._loop_monitor
\ No newline at end of file
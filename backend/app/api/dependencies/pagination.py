@@ -0,0 +1,38 @@
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional
+from typing import Tuple
+
+from fastapi import HTTPException
+from fastapi import Query
+from fastapi import status
+
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    '''
+    Opaque cursor pointing just past the row with this (created_at, id) keyset
+    '''
+    payload = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid pagination cursor.')
+
+
+def get_cursor_from_query(
+    cursor: Optional[str] = Query(None, description=f'Value of the {NEXT_CURSOR_HEADER} header from the previous page'),
+) -> Optional[Tuple[datetime, int]]:
+    if cursor is None:
+        return None
+
+    return decode_cursor(cursor)
\ No newline at end of file
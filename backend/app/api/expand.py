@@ -0,0 +1,46 @@
+'''
+Fill in the related objects asked for with `expand=` on listings that were serialized with `public_rows`.
+
+Each relation costs at most one batched query per page, however many rows reference it.
+'''
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Type
+
+from pydantic import BaseModel
+
+from app.models.user import UserPublic
+from app.models.cleaning import CleaningPublic
+
+from app.db.repositories.users import UsersRepository
+from app.db.repositories.cleanings import CleaningsRepository
+
+from app.api.responses import public_rows
+
+
+def public_object(public_model: Type[BaseModel], row: BaseModel) -> Dict[str, Any]:
+    return public_rows(public_model, [row])[0]
+
+
+def replace_ids(rows: List[Dict[str, Any]], *, key: str, objects: Dict[int, Dict[str, Any]]) -> None:
+    for row in rows:
+        row[key] = objects.get(row[key], row[key])
+
+
+async def expand_users(rows: List[Dict[str, Any]], *, key: str, users_repo: UsersRepository) -> None:
+    ids = {row[key] for row in rows}
+    if not ids:
+        return
+
+    users = await users_repo.get_users_by_ids(ids=sorted(ids))
+    replace_ids(rows, key=key, objects={user.id: public_object(UserPublic, user) for user in users})
+
+
+async def expand_cleanings(rows: List[Dict[str, Any]], *, key: str, cleanings_repo: CleaningsRepository) -> None:
+    ids = {row[key] for row in rows}
+    if not ids:
+        return
+
+    cleanings = await cleanings_repo.get_cleanings_by_ids(ids=sorted(ids))
+    replace_ids(rows, key=key, objects={cleaning.id: public_object(CleaningPublic, cleaning) for cleaning in cleanings})
\ No newline at end of file
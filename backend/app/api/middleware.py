@@ -0,0 +1,118 @@
+import time
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders  # TODO: replace starlette with fastapi
+from starlette.types import ASGIApp  # TODO: replace starlette with fastapi
+from starlette.types import Message  # TODO: replace starlette with fastapi
+from starlette.types import Receive  # TODO: replace starlette with fastapi
+from starlette.types import Scope  # TODO: replace starlette with fastapi
+from starlette.types import Send  # TODO: replace starlette with fastapi
+
+from app.core import config
+from app.core.metrics import RequestMetrics
+
+from app.db.instrumentation import QueryStats
+from app.db.instrumentation import QueryStatsRegistry
+from app.db.instrumentation import current_query_stats
+
+
+DB_QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+DB_TIME_HEADER = 'X-DB-Time-Ms'
+DB_SLOWEST_QUERY_HEADER = 'X-DB-Slowest-Ms'
+
+
+# endpoint function -> route name, filled in as routes are first hit
+_route_names: Dict[Callable, Optional[str]] = {}
+
+
+def get_route_name(scope: Scope) -> Optional[str]:
+    '''
+    Name of the route the router matched for this request, e.g. `offers:accept-offer-from-user`.
+    '''
+    endpoint = scope.get('endpoint')
+    if endpoint is None:
+        return None
+
+    if endpoint not in _route_names:
+        _route_names[endpoint] = next(
+            (route.name for route in scope['app'].router.routes if getattr(route, 'endpoint', None) is endpoint),
+            None,
+        )
+
+    return _route_names[endpoint]
+
+
+class QueryStatsMiddleware:
+    '''
+    Collects the queries issued while handling each request and adds them to the
+    per-route totals in `registry`. In debug mode the request's own numbers are
+    also sent back as response headers.
+    '''
+    def __init__(self, app: ASGIApp, *, registry: QueryStatsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message['type'] == 'http.response.start' and config.DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers[DB_QUERY_COUNT_HEADER] = str(stats.count)
+                headers[DB_TIME_HEADER] = f'{stats.total_time * 1000:.3f}'
+                headers[DB_SLOWEST_QUERY_HEADER] = f'{stats.slowest_time * 1000:.3f}'
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_query_stats.reset(token)
+
+            route_name = get_route_name(scope)
+            if route_name is not None:
+                self.registry.add(route_name, stats)
+
+
+class RequestMetricsMiddleware:
+    '''
+    Records the status and latency of every request against the route that handled it.
+    Requests that didn't match any route are grouped under `unmatched`.
+    '''
+    def __init__(self, app: ASGIApp, *, metrics: RequestMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # unless a response gets started, the request failed
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.observe(
+                route_name=get_route_name(scope) or 'unmatched',
+                method=scope['method'],
+                status_code=status_code,
+                elapsed=time.perf_counter() - start,
+            )
\ No newline at end of file
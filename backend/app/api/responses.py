@@ -0,0 +1,152 @@
+import hashlib
+from datetime import date
+from datetime import datetime
+from datetime import time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from typing import AsyncIterable
+from typing import AsyncIterator
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Type
+
+import orjson
+from pydantic import BaseModel
+from starlette.requests import Request  # TODO: replace starlette with fastapi
+from starlette.responses import JSONResponse  # TODO: replace starlette with fastapi
+from starlette.responses import Response  # TODO: replace starlette with fastapi
+
+
+def _default(value: Any) -> Any:
+    # mirrors what jsonable_encoder does for the types our models hold
+    if isinstance(value, BaseModel):
+        return value.dict(by_alias=True)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    '''
+    JSONResponse rendered with orjson.
+
+    Returning one from a route skips FastAPI's response_model validation and jsonable_encoder pass,
+    so the content must already match the route's response_model. See `public_rows`.
+    '''
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# (public model, row model) -> (output key, row attribute, default) for every public field
+_public_row_plans: Dict[Tuple[type, type], List[Tuple[str, str, Any]]] = {}
+
+
+def _public_row_plan(public_model: Type[BaseModel], row_model: type) -> List[Tuple[str, str, Any]]:
+    plan = _public_row_plans.get((public_model, row_model))
+    if plan is None:
+        row_fields = getattr(row_model, '__fields__', {})
+        plan = [
+            # public fields are often aliased to the db column, e.g. OfferPublic.user <- user_id
+            (field.alias, field.alias if field.alias in row_fields else name, field.default)
+            for name, field in public_model.__fields__.items()
+        ]
+        plan = _public_row_plans[(public_model, row_model)] = plan
+
+    return plan
+
+
+def public_rows(public_model: Type[BaseModel], rows: Iterable[BaseModel]) -> List[Dict[str, Any]]:
+    '''
+    Shape rows the way FastAPI would serialize them through `response_model=List[public_model]`
+    (every public field, keyed by alias) without validating each row into `public_model` first.
+    '''
+    serialized = []
+    for row in rows:
+        serialized.append({
+            key: getattr(row, attribute, default)
+            for key, attribute, default in _public_row_plan(public_model, type(row))
+        })
+
+    return serialized
+
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+async def ndjson_chunks(
+    public_model: Type[BaseModel], rows: AsyncIterable[BaseModel], *, rows_per_chunk: int = 100
+) -> AsyncIterator[bytes]:
+    '''
+    Newline delimited JSON for a StreamingResponse, one `public_rows` object per line.
+    Lines are sent in chunks of `rows_per_chunk` so memory stays flat however many rows there are.
+    '''
+    chunk = []
+    async for row in rows:
+        chunk.append(dumps({
+            key: getattr(row, attribute, default)
+            for key, attribute, default in _public_row_plan(public_model, type(row))
+        }))
+        if len(chunk) >= rows_per_chunk:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
+
+ETAG_HEADER = 'ETag'
+# clients may keep the body but must revalidate it with If-None-Match before every use
+CONDITIONAL_CACHE_CONTROL = 'private, no-cache'
+
+
+def weak_etag(*parts: Any) -> str:
+    '''
+    Weak validator for a representation that only changes when one of `parts` does,
+    e.g. the route name, the row id and its `updated_at`.
+    '''
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored on both sides
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    opaque_tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque_tag:
+            return True
+
+    return False
+
+
+def not_modified(request: Request, response: Response, *, etag: str) -> Optional[Response]:
+    '''
+    Tag the route's response with `etag`. Returns a bodiless 304 for the route to hand back as is
+    when the client already holds this version, so the body is never serialized.
+    '''
+    headers = {ETAG_HEADER: etag, 'Cache-Control': CONDITIONAL_CACHE_CONTROL}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
\ No newline at end of file
@@ -5,6 +5,7 @@ from app.api.routes.users import router as users_router
 from app.api.routes.profiles import router as profiles_router
 from app.api.routes.offers import router as offers_router
 from app.api.routes.evaluations import router as evaluations_router
+from app.api.routes.metrics import router as metrics_router
 
 router = APIRouter()
 
@@ -12,4 +13,5 @@ router.include_router(cleanings_router, prefix='/cleanings', tags=['cleanings'])
 router.include_router(users_router, prefix='/users', tags=['users'])
 router.include_router(profiles_router, prefix='/profiles', tags=['profiles'])
 router.include_router(offers_router, prefix='/cleanings/{cleaning_id}/offers', tags=['offers'])
-router.include_router(evaluations_router, prefix='/users/{username}/evaluations', tags=['evaluations'])
\ No newline at end of file
+router.include_router(evaluations_router, prefix='/users/{username}/evaluations', tags=['evaluations'])
+router.include_router(metrics_router, prefix='/metrics', tags=['metrics'])
\ No newline at end of file
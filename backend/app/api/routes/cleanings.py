@@ -1,19 +1,42 @@
+from typing import Any
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
+from datetime import datetime
 
 from fastapi import APIRouter
 from fastapi import Body
 from fastapi import Depends
+from fastapi import HTTPException
+from fastapi import Query
 from fastapi import status
 
+from pydantic import ValidationError
+
+from starlette.requests import Request  # TODO: replace starlette with fastapi
+from starlette.responses import Response  # TODO: replace starlette with fastapi
+
+from app.core.config import DEFAULT_PAGE_SIZE
+from app.core.config import MAX_PAGE_SIZE
+from app.core.config import MAX_BATCH_CREATE_SIZE
+
 from app.models.user import UserInDB
 
 from app.models.cleaning import CleaningCreate
 from app.models.cleaning import CleaningUpdate
 from app.models.cleaning import CleaningInDB
 from app.models.cleaning import CleaningPublic
+from app.models.cleaning import CleaningBatchItemError
+from app.models.cleaning import CleaningBatchCreateResult
 
 from app.db.repositories.cleanings import CleaningsRepository
 
+from app.api.responses import FastJSONResponse
+from app.api.responses import public_rows
+from app.api.responses import weak_etag
+from app.api.responses import not_modified
+
 from app.api.dependencies.database import get_repository
 
 from app.api.dependencies.auth import get_current_active_user
@@ -21,6 +44,10 @@ from app.api.dependencies.auth import get_current_active_user
 from app.api.dependencies.cleanings import get_cleaning_by_id_from_path
 from app.api.dependencies.cleanings import check_cleaning_modification_permissions
 
+from app.api.dependencies.pagination import NEXT_CURSOR_HEADER
+from app.api.dependencies.pagination import encode_cursor
+from app.api.dependencies.pagination import get_cursor_from_query
+
 
 router = APIRouter()
 
@@ -36,22 +63,78 @@ async def create_new_cleaning(
     return created_cleaning
 
 
+@router.post(
+    '/batch/',
+    response_model=CleaningBatchCreateResult,
+    name='cleanings:create-cleanings-batch',
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_new_cleanings_batch(
+    new_cleanings: List[Dict[str, Any]] = Body(..., embed=True),
+    current_user: UserInDB = Depends(get_current_active_user),
+    cleanings_repo: CleaningsRepository = Depends(get_repository(CleaningsRepository)),
+) -> CleaningBatchCreateResult:
+    '''
+    Validate every item on its own so one bad row doesn't sink the batch: valid items are created
+    in a single insert and invalid ones are reported back by their index in the request.
+    '''
+    if not 1 <= len(new_cleanings) <= MAX_BATCH_CREATE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'A batch must contain between 1 and {MAX_BATCH_CREATE_SIZE} cleanings.',
+        )
+
+    valid_cleanings, errors = [], []
+    for index, new_cleaning in enumerate(new_cleanings):
+        try:
+            valid_cleanings.append(CleaningCreate(**new_cleaning))
+        except ValidationError as e:
+            errors.append(CleaningBatchItemError(index=index, errors=e.errors()))
+
+    if not valid_cleanings:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=[error.dict() for error in errors]
+        )
+
+    created_cleanings = await cleanings_repo.create_cleanings(
+        new_cleanings=valid_cleanings, requesting_user=current_user
+    )
+
+    return CleaningBatchCreateResult(created=created_cleanings, errors=errors)
+
+
 @router.get('/{cleaning_id}/', response_model=CleaningPublic, name='cleanings:get-cleaning-by-id')
 async def get_cleaning_by_id(
+    request: Request,
+    response: Response,
     cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
 ) -> CleaningPublic:
+    # every column of the row is in the body, and the update trigger bumps updated_at on any change
+    etag = weak_etag('cleaning', cleaning.id, cleaning.updated_at.isoformat())
+    not_modified_response = not_modified(request, response, etag=etag)
+    if not_modified_response:
+        return not_modified_response
 
     return cleaning
 
 
 @router.get('/', response_model=List[CleaningPublic], name='cleanings:list-all-user-cleanings')
 async def list_all_user_cleanings(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[Tuple[datetime, int]] = Depends(get_cursor_from_query),
     current_user: UserInDB = Depends(get_current_active_user),
     cleanings_repo: CleaningsRepository = Depends(get_repository(CleaningsRepository)),
-) -> List[CleaningPublic]:
-    cleanings = await cleanings_repo.list_all_user_cleanings(requesting_user=current_user)
-    
-    return cleanings
+) -> FastJSONResponse:
+    # fetch one extra row to find out whether there's another page
+    cleanings = await cleanings_repo.list_all_user_cleanings(requesting_user=current_user, limit=limit + 1, after=after)
+
+    headers = {}
+    if len(cleanings) > limit:
+        cleanings = cleanings[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(cleanings[-1].created_at, cleanings[-1].id)
+
+    # rows are already shaped like CleaningPublic, response_model only documents them
+    return FastJSONResponse(public_rows(CleaningPublic, cleanings), headers=headers)
 
 
 @router.put(
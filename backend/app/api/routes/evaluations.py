@@ -1,28 +1,56 @@
 from typing import List
+from typing import Optional
+from typing import Tuple
+from datetime import datetime
 
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Body
 from fastapi import Path
+from fastapi import Query
 from fastapi import status
 
+from starlette.requests import Request  # TODO: replace starlette with fastapi
+from starlette.responses import Response  # TODO: replace starlette with fastapi
+from starlette.responses import StreamingResponse  # TODO: replace starlette with fastapi
+
+from app.core.config import DEFAULT_PAGE_SIZE
+from app.core.config import MAX_PAGE_SIZE
+
 from app.models.evaluation import EvaluationCreate
 from app.models.evaluation import EvaluationInDB
 from app.models.evaluation import EvaluationPublic
 from app.models.evaluation import EvaluationAggregate
+from app.models.evaluation import EvaluationSort
+from app.models.evaluation import EvaluationExpand
 
 from app.models.user import UserInDB
-from app.models.cleaning import CleaningInDB
+from app.models.user import UserPublic
 
 from app.db.repositories.evaluations import EvaluationsRepository
+from app.db.repositories.cleanings import CleaningsRepository
+from app.db.repositories.evaluations import EvaluationCreateContext
+
+from app.api.responses import FastJSONResponse
+from app.api.responses import public_rows
+from app.api.expand import expand_cleanings
+from app.api.expand import public_object
+from app.api.expand import replace_ids
+from app.api.responses import ndjson_chunks
+from app.api.responses import weak_etag
+from app.api.responses import not_modified
+from app.api.responses import NDJSON_MEDIA_TYPE
 
 from app.api.dependencies.database import get_repository
-from app.api.dependencies.cleanings import get_cleaning_by_id_from_path
 from app.api.dependencies.users import get_user_by_username_from_path
 from app.api.dependencies.evaluations import check_evaluation_create_permissions
-from app.api.dependencies.evaluations import list_evaluations_for_cleaner_from_path
+from app.api.dependencies.evaluations import get_evaluation_create_context_from_path
 from app.api.dependencies.evaluations import get_cleaner_evaluation_for_cleaning_from_path
 
+from app.api.dependencies.pagination import NEXT_CURSOR_HEADER
+from app.api.dependencies.pagination import encode_cursor
+from app.api.dependencies.pagination import get_cursor_from_query
+
 
 router = APIRouter()
 
@@ -36,12 +64,11 @@ router = APIRouter()
 )
 async def create_evaluation_for_cleaner(
     evaluation_create: EvaluationCreate = Body(..., embed=True),
-    cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
-    cleaner: UserInDB = Depends(get_user_by_username_from_path),
+    context: EvaluationCreateContext = Depends(get_evaluation_create_context_from_path),
     evals_repo: EvaluationsRepository = Depends(get_repository(EvaluationsRepository)),
 ) -> EvaluationPublic:
     return await evals_repo.create_evaluation_for_cleaner(
-        evaluation_create=evaluation_create, cleaner=cleaner, cleaning=cleaning
+        evaluation_create=evaluation_create, cleaner=context.cleaner, cleaning=context.cleaning
     )
 
 
@@ -51,9 +78,39 @@ async def create_evaluation_for_cleaner(
     name='evaluations:list-evaluations-for-cleaner',
 )
 async def list_evaluations_for_cleaner(
-    evaluations: List[EvaluationInDB] = Depends(list_evaluations_for_cleaner_from_path)
-) -> List[EvaluationPublic]:
-    return evaluations
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[Tuple[datetime, int]] = Depends(get_cursor_from_query),
+    sort: EvaluationSort = Query(EvaluationSort.newest),
+    min_overall_rating: Optional[int] = Query(None, ge=0, le=5),
+    no_show: Optional[bool] = Query(None),
+    expand: List[EvaluationExpand] = Query([], description='Embed these related objects instead of their ids'),
+    cleaner: UserInDB = Depends(get_user_by_username_from_path),
+    evals_repo: EvaluationsRepository = Depends(get_repository(EvaluationsRepository)),
+    cleanings_repo: CleaningsRepository = Depends(get_repository(CleaningsRepository)),
+) -> FastJSONResponse:
+    # fetch one extra row to find out whether there's another page
+    evaluations = await evals_repo.list_evaluations_for_cleaner(
+        cleaner=cleaner,
+        limit=limit + 1,
+        after=after,
+        sort=sort,
+        min_overall_rating=min_overall_rating,
+        no_show=no_show,
+    )
+
+    headers = {}
+    if len(evaluations) > limit:
+        evaluations = evaluations[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(evaluations[-1].created_at, evaluations[-1].cleaning_id)
+
+    rows = public_rows(EvaluationPublic, evaluations)
+    if EvaluationExpand.cleaner in expand:
+        # every evaluation on the page is for the cleaner we already loaded
+        replace_ids(rows, key='cleaner_id', objects={cleaner.id: public_object(UserPublic, cleaner)})
+    if EvaluationExpand.cleaning in expand:
+        await expand_cleanings(rows, key='cleaning_id', cleanings_repo=cleanings_repo)
+
+    return FastJSONResponse(rows, headers=headers)
 
 
 @router.get(
@@ -61,10 +118,36 @@ async def list_evaluations_for_cleaner(
     response_model=EvaluationAggregate, name='evaluations:get-stats-for-cleaner',
 )
 async def get_status_for_cleaner(
+    request: Request,
+    response: Response,
     cleaner: UserInDB = Depends(get_user_by_username_from_path),
     evals_repo: EvaluationsRepository = Depends(get_repository(EvaluationsRepository)),
 ) -> EvaluationAggregate:
-    return await evals_repo.get_cleaner_aggregates(cleaner=cleaner)
+    aggregates = await evals_repo.get_cleaner_aggregates(cleaner=cleaner)
+
+    # every new evaluation updates the aggregates row, which bumps its updated_at
+    if aggregates:
+        etag = weak_etag('cleaner-stats', cleaner.id, aggregates['updated_at'].isoformat())
+        not_modified_response = not_modified(request, response, etag=etag)
+        if not_modified_response:
+            return not_modified_response
+
+    return aggregates
+
+
+@router.get(
+    '/export/',
+    name='evaluations:export-evaluations-for-cleaner',
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {'content': {NDJSON_MEDIA_TYPE: {}}, 'description': 'One EvaluationPublic per line'}},
+)
+async def export_evaluations_for_cleaner(
+    cleaner: UserInDB = Depends(get_user_by_username_from_path),
+    evals_repo: EvaluationsRepository = Depends(get_repository(EvaluationsRepository)),
+) -> StreamingResponse:
+    evaluations = evals_repo.iterate_evaluations_for_cleaner(cleaner=cleaner)
+
+    return StreamingResponse(ndjson_chunks(EvaluationPublic, evaluations), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.get(
@@ -0,0 +1,46 @@
+from typing import Dict
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import status
+from starlette.responses import JSONResponse  # TODO: replace starlette with fastapi
+
+from app.models.health import HealthStatus
+
+from app.api.dependencies.health import get_readiness
+from app.api.dependencies.health import get_warmup_report
+
+
+router = APIRouter()
+
+
+@router.get('/live', response_model=HealthStatus, name='health:live')
+async def live() -> HealthStatus:
+    '''
+    The process is up and its event loop is serving requests. Failing this should restart the worker.
+    '''
+    return HealthStatus(status='alive')
+
+
+@router.get(
+    '/ready',
+    response_model=HealthStatus,
+    name='health:ready',
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {'model': HealthStatus}},
+)
+async def ready(
+    is_ready: bool = Depends(get_readiness),
+    warmup: Optional[Dict] = Depends(get_warmup_report),
+) -> HealthStatus:
+    '''
+    The worker has connected to the db and finished warming up, so it can take traffic.
+    Reports 503 while starting up and once shutdown has begun.
+    '''
+    if not is_ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=HealthStatus(status='starting' if warmup is None else 'stopping', warmup=warmup).dict(),
+        )
+
+    return HealthStatus(status='ready', warmup=warmup)
\ No newline at end of file
@@ -0,0 +1,105 @@
+from typing import Dict
+
+from fastapi import APIRouter
+from fastapi import Depends
+from starlette.responses import Response  # TODO: replace starlette with fastapi
+
+from app.core.metrics import RequestMetrics
+from app.core.metrics import EventLoopMonitor
+from app.core.metrics import PrometheusWriter
+
+from app.services import hashing_pool
+
+from app.models.metrics import DBPoolStats
+from app.models.metrics import RouteQueryStats
+
+from app.db.pool import InstrumentedPool
+from app.db.instrumentation import QueryStatsRegistry
+
+from app.api.dependencies.metrics import get_db_pool
+from app.api.dependencies.metrics import get_query_stats
+from app.api.dependencies.metrics import get_request_metrics
+from app.api.dependencies.metrics import get_loop_monitor
+from app.api.dependencies.auth import get_current_superuser
+
+
+router = APIRouter()
+prometheus_router = APIRouter()
+
+
+# pool internals and the SQL each route runs are only for operators. /metrics stays open for prometheus to scrape,
+# it's mounted at the root so it can be firewalled off from the public api
+@router.get(
+    '/db-pool/',
+    response_model=DBPoolStats,
+    name='metrics:get-db-pool-stats',
+    dependencies=[Depends(get_current_superuser)],
+)
+async def get_db_pool_stats(db_pool: InstrumentedPool = Depends(get_db_pool)) -> DBPoolStats:
+    return db_pool.snapshot()
+
+
+@router.get(
+    '/queries/',
+    response_model=Dict[str, RouteQueryStats],
+    name='metrics:get-query-stats',
+    dependencies=[Depends(get_current_superuser)],
+)
+async def get_query_stats_by_route(
+    query_stats: QueryStatsRegistry = Depends(get_query_stats),
+) -> Dict[str, RouteQueryStats]:
+    return query_stats.snapshot()
+
+
+@prometheus_router.get('/metrics', name='metrics:prometheus', include_in_schema=False)
+async def get_prometheus_metrics(
+    request_metrics: RequestMetrics = Depends(get_request_metrics),
+    loop_monitor: EventLoopMonitor = Depends(get_loop_monitor),
+    db_pool: InstrumentedPool = Depends(get_db_pool),
+) -> Response:
+    writer = PrometheusWriter()
+
+    writer.metric('http_requests_total', 'counter', 'Requests handled, by route, method and status code.')
+    for route_name, route in request_metrics.routes.items():
+        for (method, status_code), count in route.requests.items():
+            writer.sample('http_requests_total', count, {'route': route_name, 'method': method, 'status': status_code})
+
+    writer.metric('http_request_errors_total', 'counter', 'Requests that ended in a 5xx or an unhandled exception.')
+    for route_name, route in request_metrics.routes.items():
+        writer.sample('http_request_errors_total', route.errors, {'route': route_name})
+
+    writer.metric('http_request_duration_seconds', 'histogram', 'Time spent handling requests, by route.')
+    for route_name, route in request_metrics.routes.items():
+        writer.histogram('http_request_duration_seconds', route.latency, {'route': route_name})
+
+    writer.metric('event_loop_lag_seconds', 'histogram', 'How late the event loop woke up from a timed sleep.')
+    writer.histogram('event_loop_lag_seconds', loop_monitor.lag)
+    writer.metric('event_loop_lag_last_seconds', 'gauge', 'Most recently measured event loop lag.')
+    writer.sample('event_loop_lag_last_seconds', loop_monitor.last_lag)
+    writer.metric('event_loop_lag_max_seconds', 'gauge', 'Largest event loop lag measured since startup.')
+    writer.sample('event_loop_lag_max_seconds', loop_monitor.max_lag)
+
+    pool_stats = db_pool.snapshot()
+    for name, help_text, value in (
+        ('db_pool_size', 'Open connections in the db pool.', pool_stats['size']),
+        ('db_pool_max_size', 'Most connections the db pool will open.', pool_stats['max_size']),
+        ('db_pool_in_use', 'Connections currently checked out of the db pool.', pool_stats['in_use']),
+        ('db_pool_waiters', 'Requests waiting for a db connection.', pool_stats['waiters']),
+        ('db_pool_saturation', 'Share of the db pool checked out, 1 meaning every connection is busy.',
+            pool_stats['in_use'] / pool_stats['max_size'] if pool_stats['max_size'] else 0.0),
+    ):
+        writer.metric(name, 'gauge', help_text)
+        writer.sample(name, value)
+    writer.metric('db_pool_acquire_timeouts_total', 'counter', 'Connection checkouts that timed out.')
+    writer.sample('db_pool_acquire_timeouts_total', pool_stats['acquire_timeouts'])
+    writer.metric('db_pool_acquire_seconds', 'histogram', 'Time spent waiting to check out a db connection.')
+    writer.histogram('db_pool_acquire_seconds', db_pool.acquire_latency)
+
+    writer.metric('password_hashing_queue_depth', 'gauge', 'Password hashing jobs queued or running.')
+    writer.sample('password_hashing_queue_depth', hashing_pool.pending)
+    writer.metric('password_hashing_queue_limit', 'gauge', 'Queued password hashing jobs allowed before rejecting.')
+    writer.sample('password_hashing_queue_limit', hashing_pool.max_queue)
+    writer.metric('password_hashing_rejected_total', 'counter', 'Password hashing jobs rejected with a 503.')
+    writer.sample('password_hashing_rejected_total', hashing_pool.rejected)
+
+    return Response(content=writer.render(), media_type=PrometheusWriter.CONTENT_TYPE)
\ No newline at end of file
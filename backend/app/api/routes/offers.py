@@ -5,18 +5,28 @@ from fastapi import HTTPException
 from fastapi import Depends
 from fastapi import Body
 from fastapi import Path
+from fastapi import Query
 from fastapi import status
 
 from app.models.offer import OfferCreate
 from app.models.offer import OfferUpdate
 from app.models.offer import OfferPublic
 from app.models.offer import OfferInDB
+from app.models.offer import OfferExpand
 
 from app.models.user import UserInDB
 
 from app.models.cleaning import CleaningInDB
+from app.models.cleaning import CleaningPublic
 
 from app.db.repositories.offers import OffersRepository
+from app.db.repositories.users import UsersRepository
+
+from app.api.responses import FastJSONResponse
+from app.api.responses import public_rows
+from app.api.expand import expand_users
+from app.api.expand import public_object
+from app.api.expand import replace_ids
 
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.auth import get_current_active_user
@@ -63,10 +73,21 @@ async def create_offer(offer_create: OfferCreate = Body(..., embed=True)) -> Off
     dependencies=[Depends(check_offer_list_permissions)],
 )
 async def list_offers_for_cleaning(
+    expand: List[OfferExpand] = Query([], description='Embed these related objects instead of their ids'),
     cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
     offers_repo: OffersRepository = Depends(get_repository(OffersRepository)),
-) -> OfferPublic:
-    return await offers_repo.list_offers_for_cleaning(cleaning=cleaning)
+    users_repo: UsersRepository = Depends(get_repository(UsersRepository)),
+) -> FastJSONResponse:
+    offers = await offers_repo.list_offers_for_cleaning(cleaning=cleaning)
+
+    rows = public_rows(OfferPublic, offers)
+    if OfferExpand.user in expand:
+        await expand_users(rows, key='user_id', users_repo=users_repo)
+    if OfferExpand.cleaning in expand:
+        # every offer is for the cleaning we already loaded
+        replace_ids(rows, key='cleaning_id', objects={cleaning.id: public_object(CleaningPublic, cleaning)})
+
+    return FastJSONResponse(rows)
 
 
 @router.get(
@@ -7,6 +7,12 @@ from fastapi import (
     status,
 )
 
+from starlette.requests import Request  # TODO: replace starlette with fastapi
+from starlette.responses import Response  # TODO: replace starlette with fastapi
+
+from app.api.responses import weak_etag
+from app.api.responses import not_modified
+
 from app.api.dependencies.auth import get_current_active_user
 from app.api.dependencies.database import get_repository
 
@@ -27,6 +33,8 @@ router = APIRouter()
 
 @router.get('/{username}/', response_model=ProfilePublic, name='profiles:get-profile-by-username')
 async def get_profile_by_username(
+    request: Request,
+    response: Response,
     username: str = Path(..., min_length=3, regex='[a-zA-Z0-9_-]+$'),
     current_user: UserInDB = Depends(get_current_active_user),
     profile_repo: ProfilesRepository = Depends(get_repository(ProfilesRepository)),    
@@ -36,6 +44,12 @@ async def get_profile_by_username(
     if not profile:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No profile foudn with that username.')
 
+    # username and email come from the users row, whose updates don't touch the profile's updated_at
+    etag = weak_etag('profile', profile.id, profile.updated_at.isoformat(), profile.username, profile.email)
+    not_modified_response = not_modified(request, response, etag=etag)
+    if not_modified_response:
+        return not_modified_response
+
     return profile
 
 
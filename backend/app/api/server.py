@@ -4,7 +4,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core import config
 from app.core import tasks
 
+from app.core.metrics import RequestMetrics
+from app.core.metrics import EventLoopMonitor
+
+from app.db.instrumentation import QueryStatsRegistry
+
 from app.api.routes import router as api_router
+from app.api.routes.metrics import prometheus_router
+from app.api.routes.health import router as health_router
+from app.api.middleware import QueryStatsMiddleware
+from app.api.middleware import RequestMetricsMiddleware
+from app.api.middleware import DB_QUERY_COUNT_HEADER
+from app.api.middleware import DB_TIME_HEADER
+from app.api.middleware import DB_SLOWEST_QUERY_HEADER
+from app.api.dependencies.pagination import NEXT_CURSOR_HEADER
+from app.api.responses import ETAG_HEADER
 
 
 def get_application():
@@ -16,12 +30,27 @@ def get_application():
         allow_credentials=True,
         allow_methods=['*'],
         allow_headers=['*'],
+        expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, DB_QUERY_COUNT_HEADER, DB_TIME_HEADER, DB_SLOWEST_QUERY_HEADER],
     )
 
+    # flipped to True by the startup handler once warmup is done
+    app.state._ready = False
+
+    app.state._query_stats = QueryStatsRegistry()
+    app.add_middleware(QueryStatsMiddleware, registry=app.state._query_stats)
+
+    app.state._request_metrics = RequestMetrics()
+    app.state._loop_monitor = EventLoopMonitor(interval=config.EVENT_LOOP_MONITOR_INTERVAL)
+    app.add_middleware(RequestMetricsMiddleware, metrics=app.state._request_metrics)
+
     app.add_event_handler('startup', tasks.create_start_app_handler(app))
     app.add_event_handler('shutdown', tasks.create_stop_app_handler(app))
 
     app.include_router(api_router, prefix='/api')
+    # prometheus expects to scrape /metrics at the root
+    app.include_router(prometheus_router)
+    # orchestrator probes, kept out of /api like /metrics
+    app.include_router(health_router, prefix='/health', tags=['health'])
 
     return app
 
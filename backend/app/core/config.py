@@ -1,3 +1,5 @@
+import os
+
 from databases import DatabaseURL
 from starlette.config import Config  # TODO: try replacing starlette with fastapi
 from starlette.datastructures import Secret  # TODO: try replacing starlette with fastapi
@@ -8,6 +10,26 @@ PROJECT_NAME = 'phresh'
 VERSION = '1.0.0'
 API_PREFIX = '/api'
 
+DEBUG = config('DEBUG', cast=bool, default=False)  # adds per-request db stats headers to responses
+EVENT_LOOP_MONITOR_INTERVAL = config('EVENT_LOOP_MONITOR_INTERVAL', cast=float, default=0.5)  # seconds
+
+# production server, read by gunicorn_conf.py
+WEB_HOST = config('WEB_HOST', cast=str, default='0.0.0.0')
+WEB_PORT = config('WEB_PORT', cast=int, default=8000)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', cast=int, default=0)  # worker processes, 0 picks from the cpu count
+WEB_WORKERS_PER_CORE = config('WEB_WORKERS_PER_CORE', cast=float, default=1.0)
+WEB_MAX_WORKERS = config('WEB_MAX_WORKERS', cast=int, default=0)  # 0 for no cap, each worker opens its own db pool
+WEB_KEEP_ALIVE = config('WEB_KEEP_ALIVE', cast=int, default=5)  # seconds
+WEB_BACKLOG = config('WEB_BACKLOG', cast=int, default=2048)
+WEB_MAX_REQUESTS = config('WEB_MAX_REQUESTS', cast=int, default=10000)  # recycle a worker after this many, 0 to never
+WEB_MAX_REQUESTS_JITTER = config('WEB_MAX_REQUESTS_JITTER', cast=int, default=1000)
+WEB_TIMEOUT = config('WEB_TIMEOUT', cast=int, default=60)  # seconds
+WEB_GRACEFUL_TIMEOUT = config('WEB_GRACEFUL_TIMEOUT', cast=int, default=30)  # seconds
+
+DEFAULT_PAGE_SIZE = config('DEFAULT_PAGE_SIZE', cast=int, default=50)
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', cast=int, default=100)
+MAX_BATCH_CREATE_SIZE = config('MAX_BATCH_CREATE_SIZE', cast=int, default=500)
+
 SECRET_KEY = config('SECRET_KEY', cast=Secret)
 
 ACCESS_TOKEN_EXPIRE_MINUTES = config(
@@ -19,6 +41,19 @@ JWT_ALGORITHM = config('JWT_ALGORITHM', cast=str, default='HS256')
 JWT_AUDIENCE = config('JWT_AUDIENCE', cast=str, default='phresh:auth')
 JWT_TOKEN_PREFIX = config('JWT_TOKEN_PREFIX', cast=str, default='Bearer')
 
+# every worker has its own user cache and a profile update only invalidates the worker that handled it, so the
+# others can keep serving the old user (profile, is_superuser) until their entry expires - keep this short
+USER_CACHE_TTL_SECONDS = config('USER_CACHE_TTL_SECONDS', cast=int, default=5)
+USER_CACHE_MAX_SIZE = config('USER_CACHE_MAX_SIZE', cast=int, default=10000)
+
+TOKEN_CACHE_TTL_SECONDS = config('TOKEN_CACHE_TTL_SECONDS', cast=int, default=300)  # also capped by each token's exp
+TOKEN_CACHE_MAX_SIZE = config('TOKEN_CACHE_MAX_SIZE', cast=int, default=10000)
+
+PASSWORD_HASHING_EXECUTOR = config('PASSWORD_HASHING_EXECUTOR', cast=str, default='thread')  # thread or process
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', cast=int, default=os.cpu_count() or 1)
+PASSWORD_HASHING_MAX_QUEUE = config('PASSWORD_HASHING_MAX_QUEUE', cast=int, default=64)
+PASSWORD_HASHING_WARMUP = config('PASSWORD_HASHING_WARMUP', cast=bool, default=True)  # one bcrypt hash per worker at startup
+
 POSTGRES_USER = config('POSTGRES_USER', cast=str)
 POSTGRES_PASSWORD = config('POSTGRES_PASSWORD', cast=Secret)
 POSTGRES_SERVER = config('POSTGRES_SERVER', cast=str, default='db')
@@ -29,4 +64,13 @@ DATABASE_URL = config(
     'DATABASE_URL',
     cast=DatabaseURL,
     default=f'postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}'
-)
\ No newline at end of file
+)
+
+DB_MIN_POOL_SIZE = config('DB_MIN_POOL_SIZE', cast=int, default=2)
+DB_MAX_POOL_SIZE = config('DB_MAX_POOL_SIZE', cast=int, default=10)
+DB_POOL_ACQUIRE_TIMEOUT = config('DB_POOL_ACQUIRE_TIMEOUT', cast=float, default=10.0)  # seconds
+DB_STATEMENT_CACHE_SIZE = config('DB_STATEMENT_CACHE_SIZE', cast=int, default=100)  # prepared statements per connection
+DB_MAX_QUERIES_PER_CONNECTION = config('DB_MAX_QUERIES_PER_CONNECTION', cast=int, default=50000)
+DB_MAX_INACTIVE_CONNECTION_LIFETIME = config('DB_MAX_INACTIVE_CONNECTION_LIFETIME', cast=float, default=300.0)  # seconds
+DB_CONNECT_RETRIES = config('DB_CONNECT_RETRIES', cast=int, default=5)
+DB_CONNECT_RETRY_INTERVAL = config('DB_CONNECT_RETRY_INTERVAL', cast=float, default=1.0)  # seconds
\ No newline at end of file
@@ -0,0 +1,158 @@
+import bisect
+import asyncio
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+
+class Histogram:
+    '''
+    Fixed bucket histogram, reported cumulatively the same way prometheus histograms are.
+    '''
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+    def cumulative_counts(self) -> Dict[str, int]:
+        cumulative = {}
+        running_total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running_total += count
+            cumulative['+Inf' if bound == float('inf') else str(bound)] = running_total
+
+        return cumulative
+
+
+    def snapshot(self) -> Dict:
+        return {'buckets': self.cumulative_counts(), 'sum': self.sum, 'count': self.count}
+
+
+class RouteMetrics:
+    '''
+    Request counts by method and status, error count and latency for a single route.
+    '''
+    def __init__(self) -> None:
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.errors = 0
+        self.latency = Histogram()
+
+
+class RequestMetrics:
+    '''
+    RouteMetrics keyed by route name, e.g. `cleanings:list-all-user-cleanings`.
+    '''
+    def __init__(self) -> None:
+        self.routes: Dict[str, RouteMetrics] = {}
+
+
+    def observe(self, *, route_name: str, method: str, status_code: int, elapsed: float) -> None:
+        route = self.routes.get(route_name)
+        if route is None:
+            route = self.routes[route_name] = RouteMetrics()
+
+        key = (method, status_code)
+        route.requests[key] = route.requests.get(key, 0) + 1
+        if status_code >= 500:
+            route.errors += 1
+        route.latency.observe(elapsed)
+
+
+class EventLoopMonitor:
+    '''
+    Measures event loop lag: how much later than requested a sleep of `interval` seconds wakes up.
+    A busy loop (blocking calls, heavy cpu work in handlers) shows up as growing lag.
+    '''
+    LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    def __init__(self, *, interval: float = 0.5) -> None:
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.lag = Histogram(self.LAG_BUCKETS)
+        self._task: Optional[asyncio.Task] = None
+
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0.0)
+
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.lag.observe(lag)
+
+
+class PrometheusWriter:
+    '''
+    Builds a response in the prometheus text exposition format (version 0.0.4).
+    '''
+    CONTENT_TYPE = 'text/plain; version=0.0.4'  # starlette appends the charset
+
+    def __init__(self) -> None:
+        self._lines: List[str] = []
+
+
+    @staticmethod
+    def _format_labels(labels: Dict[str, Any]) -> str:
+        if not labels:
+            return ''
+
+        formatted = ','.join(
+            '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in labels.items()
+        )
+        return '{' + formatted + '}'
+
+
+    def metric(self, name: str, metric_type: str, help_text: str) -> None:
+        self._lines.append(f'# HELP {name} {help_text}')
+        self._lines.append(f'# TYPE {name} {metric_type}')
+
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        self._lines.append(f'{name}{self._format_labels(labels or {})} {value}')
+
+
+    def histogram(self, name: str, histogram: Histogram, labels: Optional[Dict[str, Any]] = None) -> None:
+        labels = labels or {}
+        for bound, count in histogram.cumulative_counts().items():
+            self.sample(f'{name}_bucket', count, {**labels, 'le': bound})
+        self.sample(f'{name}_sum', histogram.sum, labels)
+        self.sample(f'{name}_count', histogram.count, labels)
+
+
+    def render(self) -> str:
+        return '\n'.join(self._lines) + '\n'
\ No newline at end of file
@@ -4,16 +4,35 @@ from fastapi import FastAPI
 from app.db.tasks import connect_to_db
 from app.db.tasks import close_db_connection
 
+from app.core import config
+from app.core.warmup import warm_up
+
+from app.services import auth_service
+from app.services import hashing_pool
+
 
 def create_start_app_handler(app: FastAPI) -> Callable:
     async def start_app() -> None:
         await connect_to_db(app)
+        # /health/ready only reports ready once the pool and the hashing workers are warm
+        app.state._warmup = await warm_up(
+            pool=app.state._db_pool,
+            auth_service=auth_service,
+            hashing_pool=hashing_pool,
+            hash_passwords=config.PASSWORD_HASHING_WARMUP,
+        )
+        app.state._loop_monitor.start()
+        app.state._ready = True
     
     return start_app
 
 
 def create_stop_app_handler(app: FastAPI) -> Callable:
     async def stop_app() -> None:
+        # stop taking new traffic before the db goes away
+        app.state._ready = False
+        await app.state._loop_monitor.stop()
         await close_db_connection(app)
+        hashing_pool.shutdown(wait=False)
     
     return stop_app
\ No newline at end of file
@@ -0,0 +1,89 @@
+import time
+import asyncio
+import logging
+from typing import Any
+from typing import Dict
+from typing import Tuple
+
+from app.db.executor import CompiledQuery
+from app.db.pool import InstrumentedPool
+from app.db.repositories import users
+from app.db.repositories import profiles
+from app.db.repositories import cleanings
+from app.db.repositories import offers
+from app.db.repositories import evaluations
+
+from app.services.hashing import HashingPool
+from app.services.authentication import AuthService
+
+
+logger = logging.getLogger(__name__)
+
+
+# read only queries most requests run, with values that match no rows so warming them changes nothing
+HOT_QUERIES: Tuple[Tuple[CompiledQuery, Dict[str, Any]], ...] = (
+    (users.GET_USER_BY_USERNAME_QUERY, {'username': ''}),
+    (users.GET_USER_BY_EMAIL_QUERY, {'email': ''}),
+    (profiles.GET_PROFILE_BY_USERNAME_QUERY, {'username': ''}),
+    (cleanings.GET_CLEANING_BY_ID_QUERY, {'id': 0}),
+    (cleanings.LIST_USER_CLEANINGS_QUERY, {'owner': 0, 'limit': 1}),
+    (offers.LIST_OFFERS_FOR_CLEANING_QUERY, {'cleaning_id': 0}),
+    (offers.GET_OFFER_FOR_CLEANING_FROM_USER_QUERY, {'cleaning_id': 0, 'user_id': 0}),
+    (evaluations.GET_CLEANER_AGGREGATE_RATINGS_QUERY, {'cleaner_id': 0}),
+    (
+        evaluations.LIST_NEWEST_EVALUATIONS_FOR_CLEANER_QUERY,
+        {'cleaner_id': 0, 'min_overall_rating': None, 'no_show': None, 'limit': 1},
+    ),
+)
+
+
+async def warm_db_pool(pool: InstrumentedPool) -> int:
+    '''
+    asyncpg already opened `min_size` connections when it created the pool. Check them all out at once, so each
+    one is a different connection, and run every hot query on them so asyncpg has it prepared before the first
+    request needs it.
+    '''
+    connections = [await pool.acquire() for _ in range(pool.min_size)]
+    try:
+        for connection in connections:
+            for query, values in HOT_QUERIES:
+                await connection.fetch(query.positional_sql, *query.args(values))
+    finally:
+        for connection in connections:
+            await pool.release(connection)
+
+    return len(connections)
+
+
+async def warm_password_hashing(auth_service: AuthService, hashing_pool: HashingPool) -> int:
+    '''
+    Hash once on every hashing worker, so threads or processes are started and bcrypt is loaded
+    before the first login or registration waits on it.
+    '''
+    workers = min(hashing_pool.max_workers or 1, hashing_pool.max_queue)
+    await asyncio.gather(*(
+        auth_service.hash_password_async(password='warmup-password', salt=auth_service.generate_salt())
+        for _ in range(workers)
+    ))
+
+    return workers
+
+
+async def warm_up(
+    *, pool: InstrumentedPool, auth_service: AuthService, hashing_pool: HashingPool, hash_passwords: bool = True,
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    connections = await warm_db_pool(pool)
+    hashing_workers = await warm_password_hashing(auth_service, hashing_pool) if hash_passwords else 0
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        f'--- WARMUP: {connections} db connections with {len(HOT_QUERIES)} statements prepared, '
+        f'{hashing_workers} hashing workers, {elapsed:.2f}s ---'
+    )
+    return {
+        'db_connections': connections,
+        'prepared_statements': len(HOT_QUERIES),
+        'hashing_workers': hashing_workers,
+        'seconds': elapsed,
+    }
\ No newline at end of file
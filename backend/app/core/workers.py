@@ -0,0 +1,35 @@
+import os
+from typing import Optional
+
+from uvicorn.workers import UvicornWorker
+
+
+class AutoUvicornWorker(UvicornWorker):
+    '''
+    Gunicorn worker running uvicorn with uvloop and httptools when they're installed,
+    falling back to asyncio and h11 otherwise (the stock worker fails to boot without them).
+    Keep-alive and max requests are passed through from the gunicorn config.
+    '''
+    CONFIG_KWARGS = {'loop': 'auto', 'http': 'auto'}
+
+
+def get_worker_count(
+    *,
+    concurrency: int = 0,
+    workers_per_core: float = 1.0,
+    max_workers: int = 0,
+    cpu_count: Optional[int] = None,
+) -> int:
+    '''
+    An explicit concurrency wins. Otherwise the count scales with the cpu count - requests
+    are io bound and bcrypt runs off the event loop, so one worker per core keeps every
+    core busy - capped by max_workers so the db pools of all workers fit in the server.
+    '''
+    if concurrency > 0:
+        return concurrency
+
+    workers = max(int((cpu_count or os.cpu_count() or 1) * workers_per_core), 2)
+    if max_workers > 0:
+        workers = min(workers, max_workers)
+
+    return workers
\ No newline at end of file
@@ -0,0 +1,161 @@
+import time
+from contextvars import ContextVar
+from typing import Any
+from typing import AsyncIterator
+from typing import Dict
+from typing import Optional
+
+from databases import Database
+
+from app.db.executor import QueryExecutor
+
+
+class QueryStats:
+    '''
+    Query count, total time and slowest statement seen while handling a single request.
+    '''
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_query: Optional[str] = None
+
+
+    def record(self, query: Any, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_query = str(query)
+
+
+# set by the QueryStatsMiddleware for the duration of each request
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('current_query_stats', default=None)
+
+
+class InstrumentedDatabase:
+    '''
+    Wraps a `databases.Database` so that every query run through it is timed and
+    recorded against the stats of the request currently being handled, if any.
+
+    Queries run through a QueryExecutor, so compiled repository queries skip the `databases` compile step.
+    Everything else (transactions, connections, ...) is passed straight through.
+    '''
+    def __init__(self, database: Database) -> None:
+        self._database = database if isinstance(database, QueryExecutor) else QueryExecutor(database)
+
+
+    async def _timed(self, method_name: str, query: Any, *args: Any, **kwargs: Any) -> Any:
+        stats = current_query_stats.get()
+        if stats is None:
+            return await getattr(self._database, method_name)(query, *args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return await getattr(self._database, method_name)(query, *args, **kwargs)
+        finally:
+            stats.record(query, time.perf_counter() - start)
+
+
+    async def fetch_all(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        return await self._timed('fetch_all', query, *args, **kwargs)
+
+
+    async def fetch_one(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        return await self._timed('fetch_one', query, *args, **kwargs)
+
+
+    async def fetch_val(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        return await self._timed('fetch_val', query, *args, **kwargs)
+
+
+    async def execute(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        return await self._timed('execute', query, *args, **kwargs)
+
+
+    async def execute_many(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        return await self._timed('execute_many', query, *args, **kwargs)
+
+
+    async def iterate(self, query: Any, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        stats = current_query_stats.get()
+        if stats is None:
+            async for record in self._database.iterate(query, *args, **kwargs):
+                yield record
+            return
+
+        # only time spent waiting on the database counts, not the caller's work between records
+        records = self._database.iterate(query, *args, **kwargs).__aiter__()
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    record = await records.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+
+                yield record
+        finally:
+            stats.record(query, elapsed)
+
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._database, name)
+
+
+class RouteQueryStats:
+    '''
+    Running totals of QueryStats for every request handled by a single route.
+    '''
+    def __init__(self) -> None:
+        self.requests = 0
+        self.queries = 0
+        self.max_queries_per_request = 0
+        self.db_time = 0.0
+        self.slowest_query_time = 0.0
+        self.slowest_query: Optional[str] = None
+
+
+    def add(self, stats: QueryStats) -> None:
+        self.requests += 1
+        self.queries += stats.count
+        self.max_queries_per_request = max(self.max_queries_per_request, stats.count)
+        self.db_time += stats.total_time
+        if stats.slowest_time > self.slowest_query_time:
+            self.slowest_query_time = stats.slowest_time
+            self.slowest_query = stats.slowest_query
+
+
+    def snapshot(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'queries': self.queries,
+            'queries_per_request': self.queries / self.requests if self.requests else 0.0,
+            'max_queries_per_request': self.max_queries_per_request,
+            'db_time_seconds': self.db_time,
+            'slowest_query_seconds': self.slowest_query_time,
+            'slowest_query': self.slowest_query,
+        }
+
+
+class QueryStatsRegistry:
+    '''
+    RouteQueryStats keyed by route name, e.g. `offers:accept-offer-from-user`.
+    '''
+    def __init__(self) -> None:
+        self._routes: Dict[str, RouteQueryStats] = {}
+
+
+    def add(self, route_name: str, stats: QueryStats) -> None:
+        route_stats = self._routes.get(route_name)
+        if route_stats is None:
+            route_stats = self._routes[route_name] = RouteQueryStats()
+
+        route_stats.add(stats)
+
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {route_name: route_stats.snapshot() for route_name, route_stats in self._routes.items()}
\ No newline at end of file
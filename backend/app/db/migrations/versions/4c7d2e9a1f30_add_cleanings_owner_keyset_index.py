@@ -0,0 +1,22 @@
+
+"""add_cleanings_owner_keyset_index
+Revision ID: 4c7d2e9a1f30
+Revises: b96805e133ce
+Create Date: 2026-10-18 09:12:44.120931
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = '4c7d2e9a1f30'
+down_revision = 'b96805e133ce'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # backs the keyset pagination of a user's cleanings: WHERE owner = ? ORDER BY created_at DESC, id DESC
+    op.create_index('ix_cleanings_owner_created_at_id', 'cleanings', ['owner', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cleanings_owner_created_at_id', table_name='cleanings')
\ No newline at end of file
@@ -0,0 +1,29 @@
+
+"""unique_accepted_offer_per_cleaning
+Revision ID: 7a2f4c9e1b56
+Revises: d51f0a6c3b84
+Create Date: 2026-10-18 19:12:41.206318
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '7a2f4c9e1b56'
+down_revision = 'd51f0a6c3b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # a cleaning can only ever have one accepted offer, whatever races the application loses
+    op.create_index(
+        'ix_user_offers_for_cleanings_accepted_cleaning_id',
+        'user_offers_for_cleanings',
+        ['cleaning_id'],
+        unique=True,
+        postgresql_where=sa.text("status = 'accepted'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_offers_for_cleanings_accepted_cleaning_id', table_name='user_offers_for_cleanings')
\ No newline at end of file
@@ -0,0 +1,37 @@
+
+"""add_offer_and_profile_access_indexes
+Revision ID: 9e3b51c8d2a7
+Revises: 4c7d2e9a1f30
+Create Date: 2026-10-18 10:03:17.582144
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '9e3b51c8d2a7'
+down_revision = '4c7d2e9a1f30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # the offers primary key leads with user_id, so lookups by cleaning alone can't use it
+    op.create_index('ix_user_offers_for_cleanings_cleaning_id', 'user_offers_for_cleanings', ['cleaning_id'])
+    # accepting an offer rejects every other pending offer for the same cleaning
+    op.create_index(
+        'ix_user_offers_for_cleanings_pending_cleaning_id',
+        'user_offers_for_cleanings',
+        ['cleaning_id'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    # every user lookup joins in the profile by user_id
+    op.create_index('ix_profiles_user_id', 'profiles', ['user_id'])
+    # cleanings are never filtered by name, and lookups by owner use ix_cleanings_owner_created_at_id
+    op.drop_index('ix_cleanings_name', table_name='cleanings')
+
+
+def downgrade() -> None:
+    op.create_index('ix_cleanings_name', 'cleanings', ['name'])
+    op.drop_index('ix_profiles_user_id', table_name='profiles')
+    op.drop_index('ix_user_offers_for_cleanings_pending_cleaning_id', table_name='user_offers_for_cleanings')
+    op.drop_index('ix_user_offers_for_cleanings_cleaning_id', table_name='user_offers_for_cleanings')
\ No newline at end of file
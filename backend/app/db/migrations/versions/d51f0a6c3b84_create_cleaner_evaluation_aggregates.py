@@ -0,0 +1,130 @@
+
+"""create_cleaner_evaluation_aggregates
+Revision ID: d51f0a6c3b84
+Revises: 9e3b51c8d2a7
+Create Date: 2026-10-18 11:26:53.004718
+"""
+from typing import Tuple
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'd51f0a6c3b84'
+down_revision = '9e3b51c8d2a7'
+branch_labels = None
+depends_on = None
+
+
+def timestamps() -> Tuple[sa.Column, sa.Column]:
+    return (
+        sa.Column(
+            'created_at',
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            'updated_at',
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+
+
+def counter(name: str) -> sa.Column:
+    return sa.Column(name, sa.Integer, nullable=False, server_default='0')
+
+
+def create_cleaner_evaluation_aggregates_table() -> None:
+    """
+    Running totals of every evaluation left for a cleaner, so their stats can be read with one primary key lookup.
+
+    - Sums and counts are kept per rating so averages can be derived (counts skip ratings left blank)
+    - Min/max overall rating and a one to five star histogram
+    - Updated in the same transaction that creates each evaluation
+    """
+    op.create_table(
+        'cleaner_evaluation_aggregates',
+        sa.Column('cleaner_id', sa.Integer, sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        counter('total_evaluations'),
+        counter('total_no_show'),
+        counter('professionalism_sum'),
+        counter('professionalism_count'),
+        counter('completeness_sum'),
+        counter('completeness_count'),
+        counter('efficiency_sum'),
+        counter('efficiency_count'),
+        counter('overall_rating_sum'),
+        sa.Column('min_overall_rating', sa.Integer, nullable=True),
+        sa.Column('max_overall_rating', sa.Integer, nullable=True),
+        counter('one_stars'),
+        counter('two_stars'),
+        counter('three_stars'),
+        counter('four_stars'),
+        counter('five_stars'),
+        *timestamps(),
+    )
+    op.execute(
+        """
+        CREATE TRIGGER update_cleaner_evaluation_aggregates_modtime
+            BEFORE UPDATE
+            ON cleaner_evaluation_aggregates
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_updated_at_column();
+        """
+    )
+
+
+def backfill_cleaner_evaluation_aggregates() -> None:
+    op.execute(
+        """
+        INSERT INTO cleaner_evaluation_aggregates (
+            cleaner_id,
+            total_evaluations,
+            total_no_show,
+            professionalism_sum,
+            professionalism_count,
+            completeness_sum,
+            completeness_count,
+            efficiency_sum,
+            efficiency_count,
+            overall_rating_sum,
+            min_overall_rating,
+            max_overall_rating,
+            one_stars,
+            two_stars,
+            three_stars,
+            four_stars,
+            five_stars
+        )
+        SELECT cleaner_id,
+               COUNT(*),
+               COUNT(*) FILTER(WHERE no_show),
+               COALESCE(SUM(professionalism), 0),
+               COUNT(professionalism),
+               COALESCE(SUM(completeness), 0),
+               COUNT(completeness),
+               COALESCE(SUM(efficiency), 0),
+               COUNT(efficiency),
+               SUM(overall_rating),
+               MIN(overall_rating),
+               MAX(overall_rating),
+               COUNT(*) FILTER(WHERE overall_rating = 1),
+               COUNT(*) FILTER(WHERE overall_rating = 2),
+               COUNT(*) FILTER(WHERE overall_rating = 3),
+               COUNT(*) FILTER(WHERE overall_rating = 4),
+               COUNT(*) FILTER(WHERE overall_rating = 5)
+        FROM cleaning_to_cleaner_evaluations
+        GROUP BY cleaner_id;
+        """
+    )
+
+
+def upgrade() -> None:
+    create_cleaner_evaluation_aggregates_table()
+    backfill_cleaner_evaluation_aggregates()
+
+
+def downgrade() -> None:
+    op.drop_table('cleaner_evaluation_aggregates')
\ No newline at end of file
@@ -0,0 +1,35 @@
+
+"""add_cleaner_evaluations_keyset_index
+Revision ID: e83c1d5f2a90
+Revises: 7a2f4c9e1b56
+Create Date: 2026-10-18 20:41:05.318772
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = 'e83c1d5f2a90'
+down_revision = '7a2f4c9e1b56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # backs the keyset pagination of a cleaner's evaluations in either direction:
+    # WHERE cleaner_id = ? ORDER BY created_at, cleaning_id (ASC or DESC)
+    op.create_index(
+        'ix_cleaner_evaluations_cleaner_id_created_at_cleaning_id',
+        'cleaning_to_cleaner_evaluations',
+        ['cleaner_id', 'created_at', 'cleaning_id'],
+    )
+    # lookups by cleaner alone are served by the index above
+    op.drop_index('ix_cleaning_to_cleaner_evaluations_cleaner_id', table_name='cleaning_to_cleaner_evaluations')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_cleaning_to_cleaner_evaluations_cleaner_id', 'cleaning_to_cleaner_evaluations', ['cleaner_id']
+    )
+    op.drop_index(
+        'ix_cleaner_evaluations_cleaner_id_created_at_cleaning_id',
+        table_name='cleaning_to_cleaner_evaluations',
+    )
\ No newline at end of file
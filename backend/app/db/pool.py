@@ -0,0 +1,88 @@
+import time
+import asyncio
+from typing import Any
+from typing import Dict
+
+from databases import Database
+
+from app.core.metrics import Histogram
+
+
+class InstrumentedPool:
+    '''
+    Stands in for the asyncpg pool that `databases` checks connections out of,
+    so that every checkout honours the acquire timeout and is timed and counted.
+
+    Anything not overridden here is passed straight through to the asyncpg pool.
+    '''
+    def __init__(self, pool: Any, *, min_size: int, max_size: int, acquire_timeout: float) -> None:
+        self._pool = pool
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.in_use = 0
+        self.waiters = 0
+        self.acquire_timeouts = 0
+        self.acquire_latency = Histogram()
+
+
+    async def acquire(self) -> Any:
+        self.waiters += 1
+        start = time.perf_counter()
+        try:
+            connection = await self._pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts += 1
+            raise
+        finally:
+            self.waiters -= 1
+            self.acquire_latency.observe(time.perf_counter() - start)
+
+        self.in_use += 1
+        return connection
+
+
+    async def release(self, connection: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await self._pool.release(connection, *args, **kwargs)
+        finally:
+            self.in_use -= 1
+
+
+    @property
+    def size(self) -> int:
+        # get_size() only exists on newer asyncpg versions
+        if hasattr(self._pool, 'get_size'):
+            return self._pool.get_size()
+
+        return sum(1 for holder in self._pool._holders if holder._con is not None)
+
+
+    def snapshot(self) -> Dict:
+        size = self.size
+        return {
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'size': size,
+            'in_use': self.in_use,
+            'idle': max(size - self.in_use, 0),
+            'waiters': self.waiters,
+            'acquire_timeouts': self.acquire_timeouts,
+            'acquire_latency_seconds': self.acquire_latency.snapshot(),
+        }
+
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+
+def instrument_pool(database: Database, *, min_size: int, max_size: int, acquire_timeout: float) -> InstrumentedPool:
+    '''
+    Swap the connected database's asyncpg pool for an InstrumentedPool wrapping it.
+    '''
+    pool = InstrumentedPool(
+        database._backend._pool, min_size=min_size, max_size=max_size, acquire_timeout=acquire_timeout
+    )
+    database._backend._pool = pool
+
+    return pool
\ No newline at end of file
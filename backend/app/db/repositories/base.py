@@ -1,9 +1,12 @@
 from databases import Database
 
+from app.db.instrumentation import InstrumentedDatabase
+
 class BaseRepository:
     '''
-    Currently just a simple class to keep a reference to our db connection.
+    Keeps a reference to our db connection, wrapped so that every query is counted and timed.
     '''
     def __init__(self, db: Database) -> None:
-        self.db = db
+        # repositories hand their db to nested repositories, so only wrap it once
+        self.db = db if isinstance(db, InstrumentedDatabase) else InstrumentedDatabase(db)
 
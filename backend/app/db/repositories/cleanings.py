@@ -1,8 +1,12 @@
 from typing import List
+from typing import Optional
+from typing import Tuple
+from datetime import datetime
 
 from fastapi import HTTPException
 from fastapi import status
 
+from app.db.executor import compile_query
 from app.db.repositories.base import BaseRepository
 
 from app.models.cleaning import CleaningCreate
@@ -12,25 +16,56 @@ from app.models.cleaning import CleaningInDB
 from app.models.user import UserInDB
 
 
-CREATE_CLEANING_QUERY = """
+CREATE_CLEANING_QUERY = compile_query("""
     INSERT INTO cleanings (name, description, price, cleaning_type, owner)
     VALUES (:name, :description, :price, :cleaning_type, :owner)
     RETURNING id, name, description, price, cleaning_type, owner, created_at, updated_at;
-"""
+""")
 
-GET_CLEANING_BY_ID_QUERY = """
+# one statement for the whole batch: every column travels as a single array parameter
+CREATE_CLEANINGS_QUERY = compile_query("""
+    INSERT INTO cleanings (name, description, price, cleaning_type, owner)
+    SELECT name, description, price, cleaning_type, :owner
+    FROM unnest(
+        CAST(:names AS text[]),
+        CAST(:descriptions AS text[]),
+        CAST(:prices AS float8[]),
+        CAST(:cleaning_types AS text[])
+    ) WITH ORDINALITY AS new_cleanings (name, description, price, cleaning_type, position)
+    ORDER BY position
+    RETURNING id, name, description, price, cleaning_type, owner, created_at, updated_at;
+""")
+
+GET_CLEANING_BY_ID_QUERY = compile_query("""
     SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
     FROM cleanings
     WHERE id = :id;
-"""
+""")
+
+GET_CLEANINGS_BY_IDS_QUERY = compile_query("""
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
+    FROM cleanings
+    WHERE id = ANY(CAST(:ids AS integer[]));
+""")
 
-LIST_ALL_USER_CLEANINGS_QUERY = """
-SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
-FROM cleanings
-WHERE owner = :owner;
-"""
+LIST_USER_CLEANINGS_QUERY = compile_query("""
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
+    FROM cleanings
+    WHERE owner = :owner
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit;
+""")
+
+LIST_USER_CLEANINGS_AFTER_CURSOR_QUERY = compile_query("""
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
+    FROM cleanings
+    WHERE owner = :owner
+      AND (created_at, id) < (:created_at, :id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit;
+""")
 
-UPDATE_CLEANING_BY_ID_QUERY = """
+UPDATE_CLEANING_BY_ID_QUERY = compile_query("""
     UPDATE cleanings
     SET name          = :name,
         description   = :description,
@@ -38,13 +73,13 @@ UPDATE_CLEANING_BY_ID_QUERY = """
         cleaning_type = :cleaning_type
     WHERE id = :id
     RETURNING id, name, description, price, cleaning_type, owner, created_at, updated_at;
-"""
+""")
 
-DELETE_CLEANING_BY_ID_QUERY = """
+DELETE_CLEANING_BY_ID_QUERY = compile_query("""
     DELETE FROM cleanings
     WHERE id = :id
     RETURNING id;
-"""
+""")
 
 class CleaningsRepository(BaseRepository):
     '''
@@ -55,7 +90,30 @@ class CleaningsRepository(BaseRepository):
             query=CREATE_CLEANING_QUERY, values={**new_cleaning.dict(), 'owner': requesting_user.id}
         )
 
-        return CleaningInDB(**cleaning)
+        return CleaningInDB.from_trusted_record(cleaning)
+
+
+    async def create_cleanings(
+        self, *, new_cleanings: List[CleaningCreate], requesting_user: UserInDB
+    ) -> List[CleaningInDB]:
+        '''
+        Insert every cleaning in a single statement, returned in the order they were given
+        '''
+        cleaning_records = await self.db.fetch_all(
+            query=CREATE_CLEANINGS_QUERY,
+            values={
+                'names': [new_cleaning.name for new_cleaning in new_cleanings],
+                'descriptions': [new_cleaning.description for new_cleaning in new_cleanings],
+                'prices': [new_cleaning.price for new_cleaning in new_cleanings],
+                'cleaning_types': [new_cleaning.cleaning_type for new_cleaning in new_cleanings],
+                'owner': requesting_user.id,
+            },
+        )
+
+        # ids come from the same sequence in insertion order
+        return sorted(
+            (CleaningInDB.from_trusted_record(cleaning) for cleaning in cleaning_records), key=lambda cleaning: cleaning.id
+        )
     
 
     async def get_cleaning_by_id(self, *, id: int, requesting_user: UserInDB) -> CleaningInDB:
@@ -63,15 +121,36 @@ class CleaningsRepository(BaseRepository):
         if not cleaning:
             return None
 
-        return CleaningInDB(**cleaning)
+        return CleaningInDB.from_trusted_record(cleaning)
+
+
+    async def get_cleanings_by_ids(self, *, ids: List[int]) -> List[CleaningInDB]:
+        '''
+        Every cleaning in `ids`, in a single query. Unknown ids are skipped.
+        '''
+        cleaning_records = await self.db.fetch_all(query=GET_CLEANINGS_BY_IDS_QUERY, values={'ids': list(ids)})
+
+        return [CleaningInDB.from_trusted_record(cleaning) for cleaning in cleaning_records]
     
 
-    async def list_all_user_cleanings(self, requesting_user: UserInDB) -> List[CleaningInDB]:
-        cleaning_records = await self.db.fetch_all(
-            query=LIST_ALL_USER_CLEANINGS_QUERY, values={'owner': requesting_user.id}
-        )
+    async def list_all_user_cleanings(
+        self, requesting_user: UserInDB, *, limit: int, after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[CleaningInDB]:
+        '''
+        Newest cleanings first. `after` is the (created_at, id) of the last cleaning on the previous page.
+        '''
+        if after:
+            created_at, id = after
+            cleaning_records = await self.db.fetch_all(
+                query=LIST_USER_CLEANINGS_AFTER_CURSOR_QUERY,
+                values={'owner': requesting_user.id, 'created_at': created_at, 'id': id, 'limit': limit},
+            )
+        else:
+            cleaning_records = await self.db.fetch_all(
+                query=LIST_USER_CLEANINGS_QUERY, values={'owner': requesting_user.id, 'limit': limit}
+            )
 
-        return [CleaningInDB(**cleaning) for cleaning in cleaning_records]
+        return [CleaningInDB.from_trusted_record(cleaning) for cleaning in cleaning_records]
 
 
     async def update_cleaning(self, *, cleaning: CleaningInDB, cleaning_update: CleaningUpdate) -> CleaningInDB:
@@ -85,7 +164,7 @@ class CleaningsRepository(BaseRepository):
             query=UPDATE_CLEANING_BY_ID_QUERY,
             values=cleaning_update_params.dict(exclude={'owner', 'created_at', 'updated_at'}),
         )
-        return CleaningInDB(**updated_cleaning)
+        return CleaningInDB.from_trusted_record(updated_cleaning)
 
 
     async def delete_cleaning_by_id(self, *, cleaning: CleaningInDB) -> int:
@@ -1,19 +1,28 @@
+from typing import AsyncIterator
 from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from datetime import datetime
 
 from databases import Database
 
+from app.db.executor import compile_query
 from app.db.repositories.base import BaseRepository
 from app.db.repositories.offers import OffersRepository
+from app.db.repositories.users import build_user_with_profile
 
 from app.models.cleaning import CleaningInDB
 from app.models.user import UserInDB
+from app.models.offer import OfferInDB
 from app.models.evaluation import EvaluationCreate
 from app.models.evaluation import EvaluationUpdate
 from app.models.evaluation import EvaluationInDB
 from app.models.evaluation import EvaluationAggregate
+from app.models.evaluation import EvaluationSort
 
 
-CREATE_OWNER_EVALUATION_FOR_CLEANER_QUERY = """
+CREATE_OWNER_EVALUATION_FOR_CLEANER_QUERY = compile_query("""
     INSERT INTO cleaning_to_cleaner_evaluations (
         cleaning_id,
         cleaner_id,
@@ -47,9 +56,9 @@ CREATE_OWNER_EVALUATION_FOR_CLEANER_QUERY = """
               overall_rating,
               created_at,
               updated_at;
-"""
+""")
 
-GET_CLEANER_EVALUATION_FOR_CLEANING_QUERY = """
+GET_CLEANER_EVALUATION_FOR_CLEANING_QUERY = compile_query("""
     SELECT no_show,
            cleaning_id,
            cleaner_id,
@@ -63,9 +72,9 @@ GET_CLEANER_EVALUATION_FOR_CLEANING_QUERY = """
            updated_at
     FROM cleaning_to_cleaner_evaluations
     WHERE cleaning_id = :cleaning_id AND cleaner_id = :cleaner_id
-"""
+""")
 
-LIST_EVALUATIONS_FOR_CLEANER_QUERY = """
+LIST_EVALUATIONS_FOR_CLEANER_QUERY = compile_query("""
     SELECT no_show,
            cleaning_id,
            cleaner_id,
@@ -79,26 +88,223 @@ LIST_EVALUATIONS_FOR_CLEANER_QUERY = """
            updated_at
     FROM cleaning_to_cleaner_evaluations
     WHERE cleaner_id = :cleaner_id
-"""
+""")
 
-GET_CLEANER_AGGREGATE_RATINGS_QUERY = """
-    SELECT
-        AVG(professionalism) AS avg_professionalism,
-        AVG(completeness)     AS avg_completeness,
-        AVG(efficiency)      AS avg_efficiency,
-        AVG(overall_rating)  AS avg_overall_rating,
-        MIN(overall_rating)  AS min_overall_rating,
-        MAX(overall_rating)  AS max_overall_rating,
-        COUNT(cleaning_id)   AS total_evaluations,
-        COUNT(CASE WHEN no_show THEN 1 END) AS total_no_show,
-        COUNT(overall_rating) FILTER(WHERE overall_rating = 1) AS one_stars,
-        COUNT(overall_rating) FILTER(WHERE overall_rating = 2) AS two_stars,
-        COUNT(overall_rating) FILTER(WHERE overall_rating = 3) AS three_stars,
-        COUNT(overall_rating) FILTER(WHERE overall_rating = 4) AS four_stars,
-        COUNT(overall_rating) FILTER(WHERE overall_rating = 5) AS five_stars
+LIST_NEWEST_EVALUATIONS_FOR_CLEANER_QUERY = compile_query("""
+    SELECT no_show,
+           cleaning_id,
+           cleaner_id,
+           headline,
+           comment,
+           professionalism,
+           completeness,
+           efficiency,
+           overall_rating,
+           created_at,
+           updated_at
+    FROM cleaning_to_cleaner_evaluations
+    WHERE cleaner_id = :cleaner_id
+      AND (CAST(:min_overall_rating AS integer) IS NULL OR overall_rating >= :min_overall_rating)
+      AND (CAST(:no_show AS boolean) IS NULL OR no_show = :no_show)
+    ORDER BY created_at DESC, cleaning_id DESC
+    LIMIT :limit;
+""")
+
+LIST_NEWEST_EVALUATIONS_FOR_CLEANER_AFTER_CURSOR_QUERY = compile_query("""
+    SELECT no_show,
+           cleaning_id,
+           cleaner_id,
+           headline,
+           comment,
+           professionalism,
+           completeness,
+           efficiency,
+           overall_rating,
+           created_at,
+           updated_at
+    FROM cleaning_to_cleaner_evaluations
+    WHERE cleaner_id = :cleaner_id
+      AND (CAST(:min_overall_rating AS integer) IS NULL OR overall_rating >= :min_overall_rating)
+      AND (CAST(:no_show AS boolean) IS NULL OR no_show = :no_show)
+      AND (created_at, cleaning_id) < (:created_at, :cleaning_id)
+    ORDER BY created_at DESC, cleaning_id DESC
+    LIMIT :limit;
+""")
+
+LIST_OLDEST_EVALUATIONS_FOR_CLEANER_QUERY = compile_query("""
+    SELECT no_show,
+           cleaning_id,
+           cleaner_id,
+           headline,
+           comment,
+           professionalism,
+           completeness,
+           efficiency,
+           overall_rating,
+           created_at,
+           updated_at
     FROM cleaning_to_cleaner_evaluations
+    WHERE cleaner_id = :cleaner_id
+      AND (CAST(:min_overall_rating AS integer) IS NULL OR overall_rating >= :min_overall_rating)
+      AND (CAST(:no_show AS boolean) IS NULL OR no_show = :no_show)
+    ORDER BY created_at ASC, cleaning_id ASC
+    LIMIT :limit;
+""")
+
+LIST_OLDEST_EVALUATIONS_FOR_CLEANER_AFTER_CURSOR_QUERY = compile_query("""
+    SELECT no_show,
+           cleaning_id,
+           cleaner_id,
+           headline,
+           comment,
+           professionalism,
+           completeness,
+           efficiency,
+           overall_rating,
+           created_at,
+           updated_at
+    FROM cleaning_to_cleaner_evaluations
+    WHERE cleaner_id = :cleaner_id
+      AND (CAST(:min_overall_rating AS integer) IS NULL OR overall_rating >= :min_overall_rating)
+      AND (CAST(:no_show AS boolean) IS NULL OR no_show = :no_show)
+      AND (created_at, cleaning_id) > (:created_at, :cleaning_id)
+    ORDER BY created_at ASC, cleaning_id ASC
+    LIMIT :limit;
+""")
+
+# (sort, whether there's a cursor) -> query for one page of a cleaner's evaluations
+LIST_EVALUATIONS_FOR_CLEANER_PAGE_QUERIES = {
+    (EvaluationSort.newest, False): LIST_NEWEST_EVALUATIONS_FOR_CLEANER_QUERY,
+    (EvaluationSort.newest, True): LIST_NEWEST_EVALUATIONS_FOR_CLEANER_AFTER_CURSOR_QUERY,
+    (EvaluationSort.oldest, False): LIST_OLDEST_EVALUATIONS_FOR_CLEANER_QUERY,
+    (EvaluationSort.oldest, True): LIST_OLDEST_EVALUATIONS_FOR_CLEANER_AFTER_CURSOR_QUERY,
+}
+
+GET_EVALUATION_CREATE_CONTEXT_QUERY = compile_query("""
+    SELECT c.id,
+           c.name,
+           c.description,
+           c.price,
+           c.cleaning_type,
+           c.owner,
+           c.created_at,
+           c.updated_at,
+           u.id             AS cleaner_id,
+           u.username       AS cleaner_username,
+           u.email          AS cleaner_email,
+           u.email_verified AS cleaner_email_verified,
+           u.password       AS cleaner_password,
+           u.salt           AS cleaner_salt,
+           u.is_active      AS cleaner_is_active,
+           u.is_superuser   AS cleaner_is_superuser,
+           u.created_at     AS cleaner_created_at,
+           u.updated_at     AS cleaner_updated_at,
+           p.id             AS cleaner_profile_id,
+           p.full_name      AS cleaner_profile_full_name,
+           p.phone_number   AS cleaner_profile_phone_number,
+           p.bio            AS cleaner_profile_bio,
+           p.image          AS cleaner_profile_image,
+           p.created_at     AS cleaner_profile_created_at,
+           p.updated_at     AS cleaner_profile_updated_at,
+           o.status         AS offer_status,
+           o.created_at     AS offer_created_at,
+           o.updated_at     AS offer_updated_at
+    FROM cleanings c
+        LEFT JOIN users u
+        ON u.username = :username
+        LEFT JOIN profiles p
+        ON p.user_id = u.id
+        LEFT JOIN user_offers_for_cleanings o
+        ON o.cleaning_id = c.id AND o.user_id = u.id
+    WHERE c.id = :cleaning_id;
+""")
+
+UPDATE_CLEANER_AGGREGATES_FOR_EVALUATION_QUERY = compile_query("""
+    INSERT INTO cleaner_evaluation_aggregates AS agg (
+        cleaner_id,
+        total_evaluations,
+        total_no_show,
+        professionalism_sum,
+        professionalism_count,
+        completeness_sum,
+        completeness_count,
+        efficiency_sum,
+        efficiency_count,
+        overall_rating_sum,
+        min_overall_rating,
+        max_overall_rating,
+        one_stars,
+        two_stars,
+        three_stars,
+        four_stars,
+        five_stars
+    )
+    SELECT cleaner_id,
+           1,
+           no_show::int,
+           COALESCE(professionalism, 0),
+           (professionalism IS NOT NULL)::int,
+           COALESCE(completeness, 0),
+           (completeness IS NOT NULL)::int,
+           COALESCE(efficiency, 0),
+           (efficiency IS NOT NULL)::int,
+           overall_rating,
+           overall_rating,
+           overall_rating,
+           (overall_rating = 1)::int,
+           (overall_rating = 2)::int,
+           (overall_rating = 3)::int,
+           (overall_rating = 4)::int,
+           (overall_rating = 5)::int
+    FROM cleaning_to_cleaner_evaluations
+    WHERE cleaning_id = :cleaning_id AND cleaner_id = :cleaner_id
+    ON CONFLICT (cleaner_id) DO UPDATE
+    SET total_evaluations     = agg.total_evaluations + EXCLUDED.total_evaluations,
+        total_no_show         = agg.total_no_show + EXCLUDED.total_no_show,
+        professionalism_sum   = agg.professionalism_sum + EXCLUDED.professionalism_sum,
+        professionalism_count = agg.professionalism_count + EXCLUDED.professionalism_count,
+        completeness_sum      = agg.completeness_sum + EXCLUDED.completeness_sum,
+        completeness_count    = agg.completeness_count + EXCLUDED.completeness_count,
+        efficiency_sum        = agg.efficiency_sum + EXCLUDED.efficiency_sum,
+        efficiency_count      = agg.efficiency_count + EXCLUDED.efficiency_count,
+        overall_rating_sum    = agg.overall_rating_sum + EXCLUDED.overall_rating_sum,
+        min_overall_rating    = LEAST(agg.min_overall_rating, EXCLUDED.min_overall_rating),
+        max_overall_rating    = GREATEST(agg.max_overall_rating, EXCLUDED.max_overall_rating),
+        one_stars             = agg.one_stars + EXCLUDED.one_stars,
+        two_stars             = agg.two_stars + EXCLUDED.two_stars,
+        three_stars           = agg.three_stars + EXCLUDED.three_stars,
+        four_stars            = agg.four_stars + EXCLUDED.four_stars,
+        five_stars            = agg.five_stars + EXCLUDED.five_stars;
+""")
+
+GET_CLEANER_AGGREGATE_RATINGS_QUERY = compile_query("""
+    SELECT
+        professionalism_sum::float8 / NULLIF(professionalism_count, 0)  AS avg_professionalism,
+        completeness_sum::float8 / NULLIF(completeness_count, 0)        AS avg_completeness,
+        efficiency_sum::float8 / NULLIF(efficiency_count, 0)            AS avg_efficiency,
+        overall_rating_sum::float8 / NULLIF(total_evaluations, 0)       AS avg_overall_rating,
+        min_overall_rating,
+        max_overall_rating,
+        total_evaluations,
+        total_no_show,
+        one_stars,
+        two_stars,
+        three_stars,
+        four_stars,
+        five_stars,
+        updated_at
+    FROM cleaner_evaluation_aggregates
     WHERE cleaner_id = :cleaner_id;
-"""
+""")
+
+
+class EvaluationCreateContext(NamedTuple):
+    '''
+    Everything needed to authorize and create an evaluation. `cleaner` and `offer` are None when they don't exist.
+    '''
+    cleaning: CleaningInDB
+    cleaner: Optional[UserInDB]
+    offer: Optional[OfferInDB]
 
 
 class EvaluationsRepository(BaseRepository):
@@ -118,9 +324,48 @@ class EvaluationsRepository(BaseRepository):
             # also mark offer as completed
             await self.offers_repo.mark_offer_completed(cleaning=cleaning, cleaner=cleaner)
 
-            return EvaluationInDB(**created_evaluation)
+            # and fold the new evaluation into the cleaner's running stats
+            await self.db.execute(
+                query=UPDATE_CLEANER_AGGREGATES_FOR_EVALUATION_QUERY,
+                values={'cleaning_id': cleaning.id, 'cleaner_id': cleaner.id},
+            )
+
+            return EvaluationInDB.from_trusted_record(created_evaluation)
 
     
+    async def get_evaluation_create_context(
+        self, *, cleaning_id: int, cleaner_username: str
+    ) -> Optional[EvaluationCreateContext]:
+        '''
+        Load the cleaning, the cleaner (with profile) and the cleaner's offer for it in one round trip.
+        Returns None when the cleaning doesn't exist.
+        '''
+        record = await self.db.fetch_one(
+            query=GET_EVALUATION_CREATE_CONTEXT_QUERY,
+            values={'cleaning_id': cleaning_id, 'username': cleaner_username},
+        )
+        if not record:
+            return None
+
+        cleaning = CleaningInDB.from_trusted_record({key: record[key] for key in CleaningInDB.__fields__})
+
+        cleaner = None
+        if record['cleaner_id'] is not None:
+            cleaner = build_user_with_profile(record, prefix='cleaner_')
+
+        offer = None
+        if record['offer_status'] is not None:
+            offer = OfferInDB(
+                cleaning_id=cleaning.id,
+                user_id=cleaner.id,
+                status=record['offer_status'],
+                created_at=record['offer_created_at'],
+                updated_at=record['offer_updated_at'],
+            )
+
+        return EvaluationCreateContext(cleaning=cleaning, cleaner=cleaner, offer=offer)
+
+
     async def get_cleaner_evaluation_for_cleaning(self, *, cleaning: CleaningInDB, cleaner: UserInDB) -> EvaluationInDB:
         evaluation = await self.db.fetch_one(
             query=GET_CLEANER_EVALUATION_FOR_CLEANING_QUERY,
@@ -128,11 +373,49 @@ class EvaluationsRepository(BaseRepository):
         )
         if not evaluation:
             return None
-        return EvaluationInDB(**evaluation)
-    async def list_evaluations_for_cleaner(self, *, cleaner: UserInDB) -> List[EvaluationInDB]:
+        return EvaluationInDB.from_trusted_record(evaluation)
+    async def list_evaluations_for_cleaner(
+        self,
+        *,
+        cleaner: UserInDB,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        sort: EvaluationSort = EvaluationSort.newest,
+        min_overall_rating: Optional[int] = None,
+        no_show: Optional[bool] = None,
+    ) -> List[EvaluationInDB]:
+        '''
+        One page of a cleaner's evaluations ordered by (created_at, cleaning_id).
+        `after` is the (created_at, cleaning_id) of the last evaluation on the previous page.
+        '''
+        values = {
+            "cleaner_id": cleaner.id,
+            "min_overall_rating": min_overall_rating,
+            "no_show": no_show,
+            "limit": limit,
+        }
+        if after:
+            values["created_at"], values["cleaning_id"] = after
+
         evaluations = await self.db.fetch_all(
-            query=LIST_EVALUATIONS_FOR_CLEANER_QUERY, values={"cleaner_id": cleaner.id}
+            query=LIST_EVALUATIONS_FOR_CLEANER_PAGE_QUERIES[(sort, bool(after))], values=values
         )
-        return [EvaluationInDB(**e) for e in evaluations]
+        return [EvaluationInDB.from_trusted_record(e) for e in evaluations]
+
+
+    async def iterate_evaluations_for_cleaner(self, *, cleaner: UserInDB) -> AsyncIterator[EvaluationInDB]:
+        '''
+        Every evaluation for the cleaner, read through a server side cursor so that
+        only a handful of them are held in memory at a time.
+        '''
+        async for evaluation in self.db.iterate(
+            query=LIST_EVALUATIONS_FOR_CLEANER_QUERY, values={"cleaner_id": cleaner.id}
+        ):
+            yield EvaluationInDB.from_trusted_record(evaluation)
+
+
     async def get_cleaner_aggregates(self, *, cleaner: UserInDB) -> EvaluationAggregate:
+        '''
+        Reads the running totals kept up to date by create_evaluation_for_cleaner.
+        '''
         return await self.db.fetch_one(query=GET_CLEANER_AGGREGATE_RATINGS_QUERY, values={"cleaner_id": cleaner.id})
\ No newline at end of file
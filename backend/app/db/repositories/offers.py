@@ -3,6 +3,9 @@ from typing import List
 from fastapi import HTTPException
 from fastapi import status
 
+from asyncpg.exceptions import UniqueViolationError
+
+from app.db.executor import compile_query
 from app.db.repositories.base import BaseRepository
 
 from app.models.cleaning import CleaningInDB
@@ -14,65 +17,72 @@ from app.models.offer import OfferUpdate
 from app.models.offer import OfferInDB
 
 
-CREATE_OFFER_FOR_CLEANING_QUERY = """
+CREATE_OFFER_FOR_CLEANING_QUERY = compile_query("""
     INSERT INTO user_offers_for_cleanings (cleaning_id, user_id, status)
     VALUES (:cleaning_id, :user_id, :status)
     RETURNING cleaning_id, user_id, status, created_at, updated_at;
-"""
+""")
 
-LIST_OFFERS_FOR_CLEANING_QUERY = """
+LIST_OFFERS_FOR_CLEANING_QUERY = compile_query("""
     SELECT cleaning_id, user_id, status, created_at, updated_at
     FROM user_offers_for_cleanings
     WHERE cleaning_id = :cleaning_id;
-"""
+""")
 
-GET_OFFER_FOR_CLEANING_FROM_USER_QUERY = """
+GET_OFFER_FOR_CLEANING_FROM_USER_QUERY = compile_query("""
     SELECT cleaning_id, user_id, status, created_at, updated_at
     FROM user_offers_for_cleanings
     WHERE cleaning_id = :cleaning_id and user_id = :user_id;
-"""
-
-ACCEPT_OFFER_QUERY = """
-    UPDATE user_offers_for_cleanings
-    SET status = 'accepted'
-    WHERE cleaning_id = :cleaning_id AND user_id = :user_id
-    RETURNING cleaning_id, user_id, status, created_at, updated_at;
-"""
+""")
 
-REJECT_ALL_OTHER_OFFERS_QUERY = """
+# Accepts the offer and rejects every other pending one in a single statement, but only while the
+# offer is still pending and the cleaning has no accepted offer. Concurrent accepts for the same cleaning
+# update the same pending rows, so whichever commits second re-checks `status = 'pending'` against the
+# winner's changes and updates nothing.
+ACCEPT_OFFER_QUERY = compile_query("""
     UPDATE user_offers_for_cleanings
-    SET status = 'rejected'
+    SET status = CASE WHEN user_id = :user_id THEN 'accepted' ELSE 'rejected' END
     WHERE cleaning_id = :cleaning_id
-    AND user_id != :user_id
     AND status = 'pending'
-"""
+    AND EXISTS (
+        SELECT 1
+        FROM user_offers_for_cleanings
+        WHERE cleaning_id = :cleaning_id AND user_id = :user_id AND status = 'pending'
+    )
+    AND NOT EXISTS (
+        SELECT 1
+        FROM user_offers_for_cleanings
+        WHERE cleaning_id = :cleaning_id AND status = 'accepted'
+    )
+    RETURNING cleaning_id, user_id, status, created_at, updated_at;
+""")
 
-CANCEL_OFFER_QUERY = """
+CANCEL_OFFER_QUERY = compile_query("""
     UPDATE user_offers_for_cleanings
     SET status = 'cancelled'
     WHERE cleaning_id = :cleaning_id AND user_id = :user_id
     RETURNING cleaning_id, user_id, status, created_at, updated_at;
-"""
+""")
 
-SET_ALL_OTHER_OFFERS_AS_PENDING_QUERY = """
+SET_ALL_OTHER_OFFERS_AS_PENDING_QUERY = compile_query("""
     UPDATE user_offers_for_cleanings
     SET status = 'pending'
     WHERE cleaning_id = :cleaning_id
     AND user_id != :user_id
     AND status = 'rejected';
-"""
+""")
 
-RESCIND_OFFER_QUERY = """
+RESCIND_OFFER_QUERY = compile_query("""
     DELETE FROM user_offers_for_cleanings
     WHERE cleaning_id = :cleaning_id
     AND user_id = :user_id;
-"""
+""")
 
-MARK_OFFER_COMPLETED_QUERY = """
+MARK_OFFER_COMPLETED_QUERY = compile_query("""
     UPDATE user_offers_for_cleanings
     SET status = 'completed'
     WHERE cleaning_id = :cleaning_id AND user_id = :user_id;
-"""
+""")
 
 
 class OffersRepository(BaseRepository):
@@ -81,7 +91,7 @@ class OffersRepository(BaseRepository):
             query=CREATE_OFFER_FOR_CLEANING_QUERY,
             values={**new_offer.dict(), 'status': 'pending'},
         )
-        return OfferInDB(**created_offer)
+        return OfferInDB.from_trusted_record(created_offer)
 
 
     async def list_offers_for_cleaning(self, *, cleaning: CleaningInDB) -> List[OfferInDB]:
@@ -90,7 +100,7 @@ class OffersRepository(BaseRepository):
             values={'cleaning_id': cleaning.id}
         )
 
-        return [OfferInDB(**offer) for offer in offers]
+        return [OfferInDB.from_trusted_record(offer) for offer in offers]
 
 
     async def get_offer_for_cleaning_from_user(self, *, cleaning: CleaningInDB, user: UserInDB) -> OfferInDB:
@@ -102,22 +112,27 @@ class OffersRepository(BaseRepository):
         if not offer_record:
             return None
 
-        return OfferInDB(**offer_record)
+        return OfferInDB.from_trusted_record(offer_record)
     
 
     async def accept_offer(self, *, offer=OfferInDB, offer_update: OfferUpdate) -> OfferInDB:
-        async with self.db.transaction():
-            accepted_offer = await self.db.fetch_one(
-                query=ACCEPT_OFFER_QUERY,  # accept current offer
+        try:
+            updated_offers = await self.db.fetch_all(
+                query=ACCEPT_OFFER_QUERY,  # accept current offer and reject all other pending offers
                 values={'cleaning_id': offer.cleaning_id, 'user_id': offer.user_id},
             )
+        except UniqueViolationError:
+            # ix_user_offers_for_cleanings_accepted_cleaning_id caught an accept the statement itself let through
+            updated_offers = []
 
-            await self.db.execute(
-                query=REJECT_ALL_OTHER_OFFERS_QUERY,  # reject all other offers
-                values={'cleaning_id': offer.cleaning_id, 'user_id': offer.user_id},
-            )
+        for updated_offer in updated_offers:
+            if updated_offer['user_id'] == offer.user_id:
+                return OfferInDB.from_trusted_record(updated_offer)
 
-            return OfferInDB(**accepted_offer)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='That offer is no longer pending or another offer for this cleaning was already accepted.',
+        )
 
 
     async def cancel_offer(self, *, offer: OfferInDB, offer_update: OfferUpdate) -> OfferInDB:
@@ -132,7 +147,7 @@ class OffersRepository(BaseRepository):
                 values={'cleaning_id': offer.cleaning_id, 'user_id': offer.user_id},
             )
 
-            return OfferInDB(**cancelled_offer)
+            return OfferInDB.from_trusted_record(cancelled_offer)
 
 
     async def rescind_offer(self, *, offer: OfferInDB) -> int:
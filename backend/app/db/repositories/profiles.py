@@ -1,3 +1,4 @@
+from app.db.executor import compile_query
 from app.db.repositories.base import BaseRepository
 
 from app.models.profile import ProfileCreate
@@ -6,19 +7,21 @@ from app.models.profile import ProfileInDB
 
 from app.models.user import UserInDB
 
-CREATE_PROFILE_FOR_USER_QUERY = """
+from app.services import user_cache
+
+CREATE_PROFILE_FOR_USER_QUERY = compile_query("""
     INSERT INTO profiles (full_name, phone_number, bio, image, user_id)
     VALUES (:full_name, :phone_number, :bio, :image, :user_id)
     RETURNING id, full_name, phone_number, bio, image, user_id, created_at, updated_at;
-"""
+""")
 
-GET_PROFILE_BY_USER_ID_QUERY = """
+GET_PROFILE_BY_USER_ID_QUERY = compile_query("""
     SELECT id, full_name, phone_number, bio, image, user_id, created_at, updated_at
     FROM profiles
     WHERE user_id = :user_id;
-"""
+""")
 
-GET_PROFILE_BY_USERNAME_QUERY = """
+GET_PROFILE_BY_USERNAME_QUERY = compile_query("""
     SELECT p.id,
            u.email AS email,
            u.username AS username,
@@ -33,9 +36,9 @@ GET_PROFILE_BY_USERNAME_QUERY = """
         INNER JOIN users u
         ON p.user_id = u.id
     WHERE user_id = (SELECT id FROM users WHERE username = :username);
-"""
+""")
 
-UPDATE_PROFILE_QUERY = """
+UPDATE_PROFILE_QUERY = compile_query("""
     UPDATE profiles
     SET full_name   = :full_name,
        phone_number = :phone_number,
@@ -43,7 +46,7 @@ UPDATE_PROFILE_QUERY = """
        image        = :image
     WHERE user_id = :user_id
     RETURNING id, full_name, phone_number, bio, image, user_id, created_at, updated_at;
-"""
+""")
 
 
 class ProfilesRepository(BaseRepository):
@@ -59,7 +62,7 @@ class ProfilesRepository(BaseRepository):
         if not profile_record:
             return None
 
-        return ProfileInDB(**profile_record)
+        return ProfileInDB.from_trusted_record(profile_record)
 
     
     async def get_profile_by_username(self, *, username: str) -> ProfileInDB:
@@ -68,7 +71,7 @@ class ProfilesRepository(BaseRepository):
         if not profile_record:
             return None
 
-        return ProfileInDB(**profile_record)
+        return ProfileInDB.from_trusted_record(profile_record)
 
 
     async def update_profile(self, *, profile_update: ProfileUpdate, requesting_user: UserInDB) -> ProfileInDB:
@@ -79,5 +82,6 @@ class ProfilesRepository(BaseRepository):
             query=UPDATE_PROFILE_QUERY,
             values=update_params.dict(exclude={'id', 'created_at', 'updated_at', 'username', 'email'}),
         )
+        user_cache.invalidate_user(user_id=requesting_user.id)
 
-        return ProfileInDB(**updated_profile)
\ No newline at end of file
+        return ProfileInDB.from_trusted_record(updated_profile)
\ No newline at end of file
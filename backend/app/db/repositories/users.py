@@ -4,9 +4,12 @@ from fastapi import HTTPException
 from fastapi import status
 
 from databases import Database
+from asyncpg.exceptions import UniqueViolationError
 
+from typing import List
 from typing import Optional
 
+from app.db.executor import compile_query
 from app.db.repositories.base import BaseRepository
 from app.db.repositories.profiles import ProfilesRepository
 
@@ -14,29 +17,148 @@ from app.models.user import UserCreate
 from app.models.user import UserUpdate
 from app.models.user import UserInDB
 
-from app.models.profile import ProfileCreate
 from app.models.profile import ProfilePublic
 
 from app.services import auth_service
 
 
-GET_USER_BY_EMAIL_QUERY = """
-    SELECT id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at
-    FROM users
-    WHERE email = :email;
-"""
-
-GET_USER_BY_USERNAME_QUERY = """
-    SELECT id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at
-    FROM users
-    WHERE username = :username;
-"""
+GET_USER_BY_EMAIL_QUERY = compile_query("""
+    SELECT u.id,
+           u.username,
+           u.email,
+           u.email_verified,
+           u.password,
+           u.salt,
+           u.is_active,
+           u.is_superuser,
+           u.created_at,
+           u.updated_at,
+           p.id           AS profile_id,
+           p.full_name    AS profile_full_name,
+           p.phone_number AS profile_phone_number,
+           p.bio          AS profile_bio,
+           p.image        AS profile_image,
+           p.created_at   AS profile_created_at,
+           p.updated_at   AS profile_updated_at
+    FROM users u
+        LEFT JOIN profiles p
+        ON p.user_id = u.id
+    WHERE u.email = :email;
+""")
+
+GET_USER_BY_USERNAME_QUERY = compile_query("""
+    SELECT u.id,
+           u.username,
+           u.email,
+           u.email_verified,
+           u.password,
+           u.salt,
+           u.is_active,
+           u.is_superuser,
+           u.created_at,
+           u.updated_at,
+           p.id           AS profile_id,
+           p.full_name    AS profile_full_name,
+           p.phone_number AS profile_phone_number,
+           p.bio          AS profile_bio,
+           p.image        AS profile_image,
+           p.created_at   AS profile_created_at,
+           p.updated_at   AS profile_updated_at
+    FROM users u
+        LEFT JOIN profiles p
+        ON p.user_id = u.id
+    WHERE u.username = :username;
+""")
+
+GET_USERS_BY_IDS_QUERY = compile_query("""
+    SELECT u.id,
+           u.username,
+           u.email,
+           u.email_verified,
+           u.password,
+           u.salt,
+           u.is_active,
+           u.is_superuser,
+           u.created_at,
+           u.updated_at,
+           p.id           AS profile_id,
+           p.full_name    AS profile_full_name,
+           p.phone_number AS profile_phone_number,
+           p.bio          AS profile_bio,
+           p.image        AS profile_image,
+           p.created_at   AS profile_created_at,
+           p.updated_at   AS profile_updated_at
+    FROM users u
+        LEFT JOIN profiles p
+        ON p.user_id = u.id
+    WHERE u.id = ANY(CAST(:ids AS integer[]));
+""")
+
+# inserts the user and their empty profile in one statement, so either both exist or neither does
+REGISTER_NEW_USER_QUERY = compile_query("""
+    WITH new_user AS (
+        INSERT INTO users (username, email, password, salt)
+        VALUES (:username, :email, :password, :salt)
+        RETURNING id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at
+    ), new_profile AS (
+        INSERT INTO profiles (user_id)
+        SELECT id FROM new_user
+        RETURNING id, full_name, phone_number, bio, image, user_id, created_at, updated_at
+    )
+    SELECT u.id,
+           u.username,
+           u.email,
+           u.email_verified,
+           u.password,
+           u.salt,
+           u.is_active,
+           u.is_superuser,
+           u.created_at,
+           u.updated_at,
+           p.id           AS profile_id,
+           p.full_name    AS profile_full_name,
+           p.phone_number AS profile_phone_number,
+           p.bio          AS profile_bio,
+           p.image        AS profile_image,
+           p.created_at   AS profile_created_at,
+           p.updated_at   AS profile_updated_at
+    FROM new_user u
+        JOIN new_profile p
+        ON p.user_id = u.id;
+""")
+
+# unique indexes on users, mapped to the error returned when registration violates them
+REGISTRATION_CONFLICT_ERRORS = {
+    'ix_users_email': 'That email is already taken. Login with that email or register with another one.',
+    'ix_users_username': 'That username is already taken. Please try another one.',
+}
+
+PROFILE_COLUMN_PREFIX = 'profile_'
+USER_COLUMNS = (
+    'id', 'username', 'email', 'email_verified', 'password', 'salt', 'is_active', 'is_superuser', 'created_at', 'updated_at',
+)
+
+
+def build_user_with_profile(record, *, prefix: str = '') -> UserInDB:
+    '''
+    Build a user from a row of users LEFT JOIN profiles where profile columns are prefixed with `profile_`.
+
+    `prefix` is for rows where the user's own columns are namespaced too, e.g. `cleaner_id`, `cleaner_profile_id`.
+    '''
+    profile_prefix = f'{prefix}{PROFILE_COLUMN_PREFIX}'
+
+    profile = None
+    if record[f'{profile_prefix}id'] is not None:
+        profile = ProfilePublic.from_trusted_record(
+            {
+                key[len(profile_prefix):]: record[key]
+                for key in record.keys()
+                if key.startswith(profile_prefix)
+            },
+            user_id=record[f'{prefix}id'],
+        )
 
-REGISTER_NEW_USER_QUERY = """
-    INSERT INTO users (username, email, password, salt)
-    VALUES (:username, :email, :password, :salt)
-    RETURNING id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at;
-"""
+    return UserInDB.from_trusted_record({key: record[f'{prefix}{key}'] for key in USER_COLUMNS}, profile=profile)
 
 
 class UsersRepository(BaseRepository):
@@ -52,43 +174,43 @@ class UsersRepository(BaseRepository):
         if not user_record:
             return None
 
-        return await self.populate_user(user=UserInDB(**user_record))
-        
-        
+        return build_user_with_profile(user_record)
+
+
+    async def get_users_by_ids(self, *, ids: List[int]) -> List[UserInDB]:
+        '''
+        Every user in `ids` with their profile, in a single query. Unknown ids are skipped.
+        '''
+        user_records = await self.db.fetch_all(query=GET_USERS_BY_IDS_QUERY, values={'ids': list(ids)})
+
+        return [build_user_with_profile(user_record) for user_record in user_records]
+
+
     async def get_user_by_username(self, *, username: str) -> UserInDB:
         user_record = await self.db.fetch_one(query=GET_USER_BY_USERNAME_QUERY, values={'username': username})
 
         if not user_record:
             return None
 
-        return await self.populate_user(user=UserInDB(**user_record))
+        return build_user_with_profile(user_record)
 
 
     async def register_new_user(self, *, new_user: UserCreate) -> UserInDB:
-        # make sure email isn't already taken
-        if await self.get_user_by_email(email=new_user.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='That email is already taken. Login with that email or register with another one.'
-            )
-        
-        # make sure username isn't already taken
-        if await self.get_user_by_username(username=new_user.username):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='That username is already taken. Please try another one.'
-            )
-
-        user_password_update = self.auth_service.create_salt_and_hashed_password(plaintext_password=new_user.password)
+        user_password_update = await self.auth_service.create_salt_and_hashed_password_async(
+            plaintext_password=new_user.password
+        )
         new_user_params = new_user.copy(update=user_password_update.dict())
-        created_user = await self.db.fetch_one(query=REGISTER_NEW_USER_QUERY, values=new_user_params.dict())
 
-        # create profile for new user
-        profile = await self.profile_repo.create_profile_for_user(
-            profile_create=ProfileCreate(user_id=created_user['id'])
-        )
+        # the unique indexes on email and username catch taken credentials, even between concurrent registrations
+        try:
+            created_user = await self.db.fetch_one(query=REGISTER_NEW_USER_QUERY, values=new_user_params.dict())
+        except UniqueViolationError as e:
+            detail = REGISTRATION_CONFLICT_ERRORS.get(e.constraint_name)
+            if detail is None:
+                raise
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
-        return UserInDB(**created_user, profile=profile)
+        return build_user_with_profile(created_user)
 
 
     async def authenticate_user(self, *, email: EmailStr, password: str) -> Optional[UserInDB]:
@@ -99,13 +221,7 @@ class UsersRepository(BaseRepository):
             return None
 
         # if submitted password doesn't match
-        if not self.auth_service.verify_password(password=password, salt=user.salt, hashed_pw=user.password):
+        if not await self.auth_service.verify_password_async(password=password, salt=user.salt, hashed_pw=user.password):
             return None
 
-        return user
-
-    
-    async def populate_user(self, *, user: UserInDB) -> UserInDB:
-        user_profile = await self.profile_repo.get_profile_by_user_id(user_id=user.id)
-        user.profile = ProfilePublic(**user_profile.dict())
         return user
\ No newline at end of file
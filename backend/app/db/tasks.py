@@ -1,7 +1,17 @@
 import os
+import asyncio
 from fastapi import FastAPI
 from databases import Database
 from app.core.config import DATABASE_URL
+from app.core.config import DB_MIN_POOL_SIZE
+from app.core.config import DB_MAX_POOL_SIZE
+from app.core.config import DB_POOL_ACQUIRE_TIMEOUT
+from app.core.config import DB_STATEMENT_CACHE_SIZE
+from app.core.config import DB_MAX_QUERIES_PER_CONNECTION
+from app.core.config import DB_MAX_INACTIVE_CONNECTION_LIFETIME
+from app.core.config import DB_CONNECT_RETRIES
+from app.core.config import DB_CONNECT_RETRY_INTERVAL
+from app.db.pool import instrument_pool
 import logging
 
 
@@ -10,15 +20,34 @@ logger = logging.getLogger(__name__)
 
 async def connect_to_db(app: FastAPI) -> None:
     db_url = f"""{DATABASE_URL}{os.environ.get('DB_SUFFIX', '')}"""
-    database = Database(db_url, min_size=2, max_size=10)  # these can be configured in config.py as well
+    database = Database(
+        db_url,
+        min_size=DB_MIN_POOL_SIZE,
+        max_size=DB_MAX_POOL_SIZE,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+        max_queries=DB_MAX_QUERIES_PER_CONNECTION,
+        max_inactive_connection_lifetime=DB_MAX_INACTIVE_CONNECTION_LIFETIME,
+    )
 
-    try:
-        await database.connect()
-        app.state._db = database
-    except Exception as e:
-        logger.warn('--- DB CONNECTION ERROR ---')
-        logger.warn(e)
-        logger.warn('--- DB CONNECTION ERROR ---')
+    for attempt in range(1, DB_CONNECT_RETRIES + 1):
+        try:
+            await database.connect()
+            break
+        except Exception as e:
+            logger.warning(f'--- DB CONNECTION ERROR (attempt {attempt} of {DB_CONNECT_RETRIES}) ---')
+            logger.warning(e)
+            logger.warning('--- DB CONNECTION ERROR ---')
+
+            # fail startup instead of serving requests that can't reach the db
+            if attempt == DB_CONNECT_RETRIES:
+                raise
+
+            await asyncio.sleep(DB_CONNECT_RETRY_INTERVAL)
+
+    app.state._db_pool = instrument_pool(
+        database, min_size=DB_MIN_POOL_SIZE, max_size=DB_MAX_POOL_SIZE, acquire_timeout=DB_POOL_ACQUIRE_TIMEOUT
+    )
+    app.state._db = database
 
 
 async def close_db_connection(app: FastAPI) -> None:
@@ -1,3 +1,6 @@
+from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Union
 from enum import Enum
@@ -42,4 +45,17 @@ class CleaningInDB(IDModelMixin, DateTimeModelMixin, CleaningBase):
 
 
 class CleaningPublic(CleaningInDB):
-    pass
\ No newline at end of file
+    pass
+
+
+class CleaningBatchItemError(CoreModel):
+    '''
+    Validation errors for one item of a batch create, `index` is its position in the request
+    '''
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class CleaningBatchCreateResult(CoreModel):
+    created: List[CleaningPublic]
+    errors: List[CleaningBatchItemError]
\ No newline at end of file
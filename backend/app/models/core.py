@@ -1,14 +1,83 @@
+from copy import deepcopy
+from enum import Enum
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Tuple
+from typing import Type
+from typing import TypeVar
 from datetime import datetime
 from pydantic import BaseModel
 from pydantic import validator
 
 
+Model = TypeVar('Model', bound='CoreModel')
+
+FieldPlan = List[Tuple[str, str, bool, Any, Optional[Callable]]]
+
+# per model class: (name, alias, required, default, converter) for every field
+_trusted_field_plans: Dict[type, FieldPlan] = {}
+
+
+def _trusted_field_plan(model: Type[BaseModel]) -> FieldPlan:
+    plan = _trusted_field_plans.get(model)
+    if plan is None:
+        plan = []
+        for name, field in model.__fields__.items():
+            converter = None
+            if isinstance(field.type_, type):
+                if issubclass(field.type_, float):
+                    converter = float  # numeric columns come back as Decimal
+                elif issubclass(field.type_, Enum):
+                    converter = field.type_
+            plan.append((name, field.alias, field.required, field.default, converter))
+        plan = _trusted_field_plans[model] = plan
+
+    return plan
+
+
 class CoreModel(BaseModel):
     '''
     Any common logic to be shared by all models goes here.
     '''
-    pass
+    @classmethod
+    def from_trusted_record(cls: Type[Model], record: Mapping, **values: Any) -> Model:
+        '''
+        Build a model from a row our own queries returned, skipping validation.
+
+        Postgres has already typed and constrained these columns, so only the conversions that
+        validation would have made are done here: numeric -> float and text -> enum. Missing optional
+        fields get their defaults; rows missing a required field fall back to full validation.
+        '''
+        # copied because `in` on a databases Record raises instead of returning False for missing keys
+        data = {**record, **values}
+        model_values = {}
+        fields_set = set()
+
+        for name, alias, required, default, converter in _trusted_field_plan(cls):
+            if alias in data:
+                value = data[alias]
+            elif name in data:
+                value = data[name]
+            elif required:
+                return cls(**data)
+            else:
+                model_values[name] = deepcopy(default) if default is not None else None
+                continue
+
+            if converter is not None and value is not None and not isinstance(value, converter):
+                value = converter(value)
+
+            model_values[name] = value
+            fields_set.add(name)
+
+        model = cls.__new__(cls)
+        object.__setattr__(model, '__dict__', model_values)
+        object.__setattr__(model, '__fields_set__', fields_set)
+        return model
 
 
 class DateTimeModelMixin(BaseModel):
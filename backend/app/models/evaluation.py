@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Optional
 from typing import Union
 
@@ -13,6 +14,19 @@ from app.models.user import UserPublic
 from app.models.cleaning import CleaningPublic
 
 
+class EvaluationSort(str, Enum):
+    newest = 'newest'
+    oldest = 'oldest'
+
+
+class EvaluationExpand(str, Enum):
+    '''
+    Related objects that evaluation listings can embed in place of their ids
+    '''
+    cleaner = 'cleaner'
+    cleaning = 'cleaning'
+
+
 class EvaluationBase(CoreModel):
     no_show: bool = False
     headline: Optional[str]
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from app.models.core import CoreModel
+
+
+class WarmupReport(CoreModel):
+    '''
+    What the startup warmup did before the app reported itself ready
+    '''
+    db_connections: int
+    prepared_statements: int
+    hashing_workers: int
+    seconds: float
+
+
+class HealthStatus(CoreModel):
+    status: str
+    warmup: Optional[WarmupReport]
\ No newline at end of file
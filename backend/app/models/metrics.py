@@ -0,0 +1,37 @@
+from typing import Dict
+from typing import Optional
+
+from app.models.core import CoreModel
+
+
+class HistogramSnapshot(CoreModel):
+    '''
+    Cumulative bucket counts keyed by upper bound, plus the running sum and count
+    '''
+    buckets: Dict[str, int]
+    sum: float
+    count: int
+
+
+class DBPoolStats(CoreModel):
+    min_size: int
+    max_size: int
+    size: int
+    in_use: int
+    idle: int
+    waiters: int
+    acquire_timeouts: int
+    acquire_latency_seconds: HistogramSnapshot
+
+
+class RouteQueryStats(CoreModel):
+    '''
+    Totals for every request handled by a route since startup
+    '''
+    requests: int
+    queries: int
+    queries_per_request: float
+    max_queries_per_request: int
+    db_time_seconds: float
+    slowest_query_seconds: float
+    slowest_query: Optional[str]
\ No newline at end of file
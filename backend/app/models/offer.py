@@ -22,6 +22,14 @@ class OfferStatus(str, Enum):
     completed = 'completed'
 
 
+class OfferExpand(str, Enum):
+    '''
+    Related objects that offer listings can embed in place of their ids
+    '''
+    user = 'user'
+    cleaning = 'cleaning'
+
+
 class OfferBase(CoreModel):
     user_id: Optional[int]
     cleaning_id: Optional[int]
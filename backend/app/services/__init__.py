@@ -1,3 +1,21 @@
+from app.core.config import USER_CACHE_TTL_SECONDS
+from app.core.config import USER_CACHE_MAX_SIZE
+from app.core.config import PASSWORD_HASHING_EXECUTOR
+from app.core.config import PASSWORD_HASHING_WORKERS
+from app.core.config import PASSWORD_HASHING_MAX_QUEUE
+from app.core.config import TOKEN_CACHE_TTL_SECONDS
+from app.core.config import TOKEN_CACHE_MAX_SIZE
+
 from app.services.authentication import AuthService
+from app.services.cache import UserCache
+from app.services.cache import VerifiedTokenCache
+from app.services.hashing import HashingPool
 
-auth_service = AuthService()
\ No newline at end of file
+hashing_pool = HashingPool(
+    executor_type=PASSWORD_HASHING_EXECUTOR,
+    max_workers=PASSWORD_HASHING_WORKERS,
+    max_queue=PASSWORD_HASHING_MAX_QUEUE,
+)
+token_cache = VerifiedTokenCache(max_size=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+auth_service = AuthService(hashing_pool=hashing_pool, token_cache=token_cache)
+user_cache = UserCache(max_size=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
\ No newline at end of file
@@ -27,9 +27,21 @@ from app.models.token import JWTPayload
 from app.models.user import UserPasswordUpdate
 from app.models.user import UserInDB
 
+from app.services.hashing import HashingPool
+from app.services.cache import VerifiedTokenCache
+
 pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
 
+# module level so they can be pickled and sent to a process pool
+def hash_salted_password(salted_password: str) -> str:
+    return pwd_context.hash(salted_password)
+
+
+def verify_salted_password(salted_password: str, hashed_pw: str) -> bool:
+    return pwd_context.verify(salted_password, hashed_pw)
+
+
 class AuthException(BaseException):
     '''
     Custom auth exception that can be modified later on.
@@ -38,6 +50,13 @@ class AuthException(BaseException):
 
 
 class AuthService:
+    def __init__(
+        self, *, hashing_pool: Optional[HashingPool] = None, token_cache: Optional[VerifiedTokenCache] = None
+    ) -> None:
+        self.hashing_pool = hashing_pool or HashingPool()
+        self.token_cache = token_cache
+
+
     def create_salt_and_hashed_password(self, *, plaintext_password: str) -> UserPasswordUpdate:
         salt = self.generate_salt()
         hashed_password = self.hash_password(password=plaintext_password, salt=salt)
@@ -50,11 +69,30 @@ class AuthService:
 
 
     def hash_password(self, *, password: str, salt: str) -> str:
-        return pwd_context.hash(password + salt)
+        return hash_salted_password(password + salt)
 
 
     def verify_password(self, *, password: str, salt: str, hashed_pw: str) -> bool:
-        return pwd_context.verify(password + salt, hashed_pw)
+        return verify_salted_password(password + salt, hashed_pw)
+
+
+    async def create_salt_and_hashed_password_async(self, *, plaintext_password: str) -> UserPasswordUpdate:
+        salt = self.generate_salt()
+        hashed_password = await self.hash_password_async(password=plaintext_password, salt=salt)
+
+        return UserPasswordUpdate(salt=salt, password=hashed_password)
+
+
+    async def hash_password_async(self, *, password: str, salt: str) -> str:
+        '''
+        Same as hash_password, but bcrypt runs on the hashing pool so the event loop keeps serving other requests.
+        '''
+        return await self.hashing_pool.run(hash_salted_password, password + salt)
+
+
+    async def verify_password_async(self, *, password: str, salt: str, hashed_pw: str) -> bool:
+        return await self.hashing_pool.run(verify_salted_password, password + salt, hashed_pw)
+
 
     def create_access_token_for_user(
         self,
@@ -83,6 +121,11 @@ class AuthService:
 
 
     def get_username_from_token(self, *, token: str, secret_key: str) -> Optional[str]:
+        if self.token_cache is not None:
+            username = self.token_cache.get_username(token=token, secret_key=str(secret_key))
+            if username is not None:
+                return username
+
         try:
             decoded_token = jwt.decode(token, str(secret_key), audience=JWT_AUDIENCE, algorithms=[JWT_ALGORITHM])
             payload = JWTPayload(**decoded_token)
@@ -93,6 +136,11 @@ class AuthService:
                 headers={'WWW-Authenticate': 'Bearer'},
             )
 
+        if self.token_cache is not None:
+            self.token_cache.set_username(
+                token=token, secret_key=str(secret_key), username=payload.username, expires_at=payload.exp
+            )
+
         return payload.username
     
 
@@ -0,0 +1,151 @@
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Set
+
+from app.models.user import UserInDB
+
+
+class TTLCache:
+    '''
+    Small in-process LRU cache whose entries also expire after `ttl` seconds.
+
+    Only meant to be used from the event loop, so no locking is done.
+    '''
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self.pop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+
+    def set(self, key: Hashable, value: Any, *, ttl: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        # evict least recently used entries
+        while len(self._entries) > self.max_size:
+            self.pop(next(iter(self._entries)))
+
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+
+        return entry[1]
+
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class UserCache(TTLCache):
+    '''
+    Maps access tokens to the user they resolved to, so authenticated requests
+    don't need to hit the db just to identify the caller.
+
+    Tokens are stored as digests and indexed by user id so that every token
+    belonging to a user can be dropped as soon as that user or their profile changes.
+    That only reaches this process, the caches of other workers catch up when their entries expire.
+    '''
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._keys_by_user_id: Dict[int, Set[str]] = {}
+
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+
+    def get_user(self, *, token: str) -> Optional[UserInDB]:
+        user = self.get(self.token_key(token))
+        if not user:
+            return None
+
+        # hand out copies so callers can't mutate the cached user
+        return user.copy(deep=True)
+
+
+    def set_user(self, *, token: str, user: UserInDB) -> None:
+        key = self.token_key(token)
+        self.set(key, user.copy(deep=True))
+
+        if key in self._entries:
+            self._keys_by_user_id.setdefault(user.id, set()).add(key)
+
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        user = super().pop(key)
+        if user is None:
+            return None
+
+        keys = self._keys_by_user_id.get(user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user_id[user.id]
+
+        return user
+
+
+    def invalidate_user(self, *, user_id: int) -> None:
+        for key in list(self._keys_by_user_id.get(user_id, ())):
+            self.pop(key)
+
+
+    def clear(self) -> None:
+        super().clear()
+        self._keys_by_user_id.clear()
+
+
+
+class VerifiedTokenCache(TTLCache):
+    '''
+    Remembers which username an access token was verified to belong to, so the signature,
+    audience and payload checks only run the first time a token is seen.
+
+    Keys are digests of the secret and the token, so a token is only ever a hit for the secret it
+    was verified with, and entries never outlive the token's own `exp`.
+    '''
+    @staticmethod
+    def token_key(*, token: str, secret_key: str) -> str:
+        return hashlib.sha256(f'{secret_key}:{token}'.encode()).hexdigest()
+
+
+    def get_username(self, *, token: str, secret_key: str) -> Optional[str]:
+        return self.get(self.token_key(token=token, secret_key=secret_key))
+
+
+    def set_username(self, *, token: str, secret_key: str, username: str, expires_at: float) -> None:
+        ttl = min(self.ttl, expires_at - time.time())
+        self.set(self.token_key(token=token, secret_key=secret_key), username, ttl=ttl)
\ No newline at end of file
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi import status
+
+
+class HashingPool:
+    '''
+    Runs CPU bound password hashing on a thread or process pool instead of the event loop.
+
+    At most `max_queue` jobs may be queued or running at once. Past that, callers get a 503
+    right away instead of piling up behind each other while the worker stays responsive.
+    '''
+    EXECUTOR_TYPES = ('thread', 'process')
+
+    def __init__(self, *, executor_type: str = 'thread', max_workers: Optional[int] = None, max_queue: int = 64) -> None:
+        if executor_type not in self.EXECUTOR_TYPES:
+            raise ValueError(f'executor_type must be one of {self.EXECUTOR_TYPES}, got {executor_type!r}')
+
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+
+    @property
+    def executor(self) -> Executor:
+        # created lazily so the pool can be shut down and reused across app restarts
+        if self._executor is None:
+            if self.executor_type == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hashing')
+
+        return self._executor
+
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Too many authentication requests in progress. Please try again shortly.',
+                headers={'Retry-After': '1'},
+            )
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
\ No newline at end of file
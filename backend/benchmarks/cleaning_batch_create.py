@@ -0,0 +1,86 @@
+'''
+Compare rows/s of creating cleanings one insert at a time with the single statement batch insert.
+
+The one at a time loop is what clients onboarding many jobs had to do through `cleanings:create-cleaning`;
+the batch insert is what `cleanings:create-cleanings-batch` runs. Both run inside transactions that are
+rolled back, so no cleanings are left behind.
+
+    python -m benchmarks.cleaning_batch_create --username lebronjames --rows 500
+'''
+import os
+import time
+import asyncio
+import argparse
+
+from databases import Database
+
+from app.core.config import DATABASE_URL
+
+from app.models.cleaning import CleaningCreate
+
+from app.db.repositories.users import UsersRepository
+from app.db.repositories.cleanings import CleaningsRepository
+
+
+async def one_at_a_time(cleanings_repo: CleaningsRepository, new_cleanings, owner) -> None:
+    for new_cleaning in new_cleanings:
+        await cleanings_repo.create_cleaning(new_cleaning=new_cleaning, requesting_user=owner)
+
+
+async def batch(cleanings_repo: CleaningsRepository, new_cleanings, owner) -> None:
+    await cleanings_repo.create_cleanings(new_cleanings=new_cleanings, requesting_user=owner)
+
+
+async def run(db: Database, *, label: str, create, new_cleanings, owner, iterations: int) -> float:
+    cleanings_repo = CleaningsRepository(db)
+
+    elapsed = 0.0
+    for _ in range(iterations):
+        transaction = await db.transaction()
+        try:
+            start = time.perf_counter()
+            await create(cleanings_repo, new_cleanings, owner)
+            elapsed += time.perf_counter() - start
+        finally:
+            await transaction.rollback()
+
+    rows_per_second = len(new_cleanings) * iterations / elapsed
+    print(f'{label:<14} {elapsed / iterations * 1000:.2f} ms/batch   {rows_per_second:,.0f} rows/s')
+
+    return rows_per_second
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--username', required=True, help='existing user that will own the cleanings')
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    new_cleanings = [
+        CleaningCreate(name=f'recurring cleaning {i}', description='weekly', price=25 + i % 50, cleaning_type='full_clean')
+        for i in range(args.rows)
+    ]
+
+    db = Database(f"{DATABASE_URL}{os.environ.get('DB_SUFFIX', '')}", min_size=1, max_size=1)
+    await db.connect()
+    try:
+        owner = await UsersRepository(db).get_user_by_username(username=args.username)
+
+        # warm up the connection and the server side plan cache
+        await run(db, label='warmup', create=batch, new_cleanings=new_cleanings[:10], owner=owner, iterations=1)
+
+        single = await run(
+            db, label='one at a time', create=one_at_a_time, new_cleanings=new_cleanings, owner=owner,
+            iterations=args.iterations,
+        )
+        batched = await run(
+            db, label='batch', create=batch, new_cleanings=new_cleanings, owner=owner, iterations=args.iterations,
+        )
+        print(f'speedup        {batched / single:.1f}x')
+    finally:
+        await db.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
\ No newline at end of file
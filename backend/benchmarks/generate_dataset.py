@@ -0,0 +1,286 @@
+'''
+Bulk load a synthetic dataset so queries can be benchmarked at production scale. It creates users with
+profiles, cleanings, offers and evaluations.
+
+Rows are generated in chunks and streamed in with COPY, all in one transaction, so a failed run leaves
+nothing behind. Every user gets the same salt and password hash: bcrypt runs once, not once per user.
+Any generated user can log in with --password.
+
+The data is skewed like real traffic:
+- owners are drawn from a zipf distribution, so a few users own a large share of the cleanings
+- offers are drawn from a second zipf distribution over the cleaners, so a few cleaners get most of the
+  offers and evaluations
+
+Each cleaning gets a varying number of offers. Some of them are accepted and most of those are completed
+and evaluated. The cleaner evaluation aggregates are built from the loaded evaluations at the end.
+
+    python -m benchmarks.generate_dataset --users 1000000 --cleanings 3000000
+    python -m benchmarks.generate_dataset --users 10000 --cleanings 50000 --prefix small --seed 1
+'''
+import os
+import time
+import random
+import asyncio
+import argparse
+from decimal import Decimal
+from datetime import datetime
+from datetime import timezone
+from itertools import accumulate
+from typing import List
+from typing import Tuple
+
+import asyncpg
+
+from app.core.config import DATABASE_URL
+
+from app.services import auth_service
+
+DAY = 24 * 60 * 60
+
+CLEANING_TYPES = ('dust_up', 'spot_clean', 'full_clean')
+ROOMS = ('studio', 'one bedroom', 'two bedroom', 'three bedroom', 'house', 'office')
+
+USER_COLUMNS = (
+    'id', 'username', 'email', 'email_verified', 'salt', 'password', 'is_active', 'is_superuser',
+    'created_at', 'updated_at',
+)
+PROFILE_COLUMNS = ('user_id', 'full_name', 'phone_number', 'bio', 'image', 'created_at', 'updated_at')
+CLEANING_COLUMNS = ('id', 'name', 'description', 'cleaning_type', 'price', 'owner', 'created_at', 'updated_at')
+OFFER_COLUMNS = ('user_id', 'cleaning_id', 'status', 'created_at', 'updated_at')
+EVALUATION_COLUMNS = (
+    'cleaning_id', 'cleaner_id', 'no_show', 'headline', 'comment', 'professionalism', 'completeness',
+    'efficiency', 'overall_rating', 'created_at', 'updated_at',
+)
+
+# the same totals the evaluations repository keeps up to date one evaluation at a time
+BUILD_CLEANER_AGGREGATES_QUERY = """
+    INSERT INTO cleaner_evaluation_aggregates (
+        cleaner_id,
+        total_evaluations,
+        total_no_show,
+        professionalism_sum,
+        professionalism_count,
+        completeness_sum,
+        completeness_count,
+        efficiency_sum,
+        efficiency_count,
+        overall_rating_sum,
+        min_overall_rating,
+        max_overall_rating,
+        one_stars,
+        two_stars,
+        three_stars,
+        four_stars,
+        five_stars
+    )
+    SELECT cleaner_id,
+           count(*),
+           count(*) FILTER (WHERE no_show),
+           COALESCE(sum(professionalism), 0),
+           count(professionalism),
+           COALESCE(sum(completeness), 0),
+           count(completeness),
+           COALESCE(sum(efficiency), 0),
+           count(efficiency),
+           sum(overall_rating),
+           min(overall_rating),
+           max(overall_rating),
+           count(*) FILTER (WHERE overall_rating = 1),
+           count(*) FILTER (WHERE overall_rating = 2),
+           count(*) FILTER (WHERE overall_rating = 3),
+           count(*) FILTER (WHERE overall_rating = 4),
+           count(*) FILTER (WHERE overall_rating = 5)
+    FROM cleaning_to_cleaner_evaluations
+    WHERE cleaner_id BETWEEN $1 AND $2
+    GROUP BY cleaner_id;
+"""
+
+
+class Loader:
+    '''
+    Streams rows into tables with COPY and keeps per table row counts and load times for the summary.
+    '''
+    def __init__(self, conn: asyncpg.Connection) -> None:
+        self.conn = conn
+        self.rows = {}
+        self.seconds = {}
+
+    async def copy(self, table: str, columns: Tuple[str, ...], records: List[tuple]) -> None:
+        if not records:
+            return
+
+        start = time.perf_counter()
+        await self.conn.copy_records_to_table(table, records=records, columns=columns)
+        self.seconds[table] = self.seconds.get(table, 0.0) + time.perf_counter() - start
+        self.rows[table] = self.rows.get(table, 0) + len(records)
+
+
+def zipf_cum_weights(n: int, skew: float) -> List[float]:
+    return list(accumulate(rank ** -skew for rank in range(1, n + 1)))
+
+
+def timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def rating(rng: random.Random, quality: float) -> int:
+    return min(5, max(1, round(rng.gauss(quality, 0.8))))
+
+
+async def reserve_ids(conn: asyncpg.Connection, sequence: str, count: int) -> int:
+    '''
+    Takes `count` ids from the sequence and returns the first one, so rows can reference each other before they're loaded.
+    '''
+    first_id = await conn.fetchval('SELECT nextval($1::regclass)', sequence)
+    await conn.fetchval('SELECT setval($1::regclass, $2)', sequence, first_id + count - 1)
+
+    return first_id
+
+
+async def load_users(loader: Loader, rng: random.Random, args, *, first_user_id: int, start: float) -> None:
+    hashed = auth_service.create_salt_and_hashed_password(plaintext_password=args.password)
+
+    # everyone signs up during the first half of the window, their cleanings are posted in the second half
+    for chunk_start in range(0, args.users, args.chunk_size):
+        users, profiles = [], []
+        for i in range(chunk_start, min(chunk_start + args.chunk_size, args.users)):
+            username = f'{args.prefix}{i}'
+            created_at = timestamp(start + rng.random() * args.days * DAY / 2)
+            users.append((
+                first_user_id + i, username, f'{username}@example.com', True, hashed.salt, hashed.password, True,
+                False, created_at, created_at,
+            ))
+            full_name = f'{args.prefix.title()} User {i}' if rng.random() < 0.6 else None
+            profiles.append((first_user_id + i, full_name, None, '', None, created_at, created_at))
+
+        await loader.copy('users', USER_COLUMNS, users)
+        await loader.copy('profiles', PROFILE_COLUMNS, profiles)
+        print(f'users       {loader.rows["users"]:>12,}')
+
+
+async def load_cleanings(loader: Loader, rng: random.Random, args, *, first_user_id: int, first_cleaning_id: int, start: float) -> None:
+    now = start + args.days * DAY
+
+    owners = list(range(first_user_id, first_user_id + args.users))
+    rng.shuffle(owners)
+    owner_cum_weights = zipf_cum_weights(len(owners), args.owner_skew)
+
+    cleaners = rng.sample(owners, max(int(args.users * args.cleaner_fraction), 1))
+    cleaner_cum_weights = zipf_cum_weights(len(cleaners), args.cleaner_skew)
+    # how good each cleaner is decides their ratings
+    quality = {cleaner: rng.uniform(2.5, 5.0) for cleaner in cleaners}
+
+    print(f'heaviest owner: {args.prefix}{owners[0] - first_user_id}   most popular cleaner: {args.prefix}{cleaners[0] - first_user_id}')
+
+    for chunk_start in range(0, args.cleanings, args.chunk_size):
+        chunk_size = min(args.chunk_size, args.cleanings - chunk_start)
+        chunk_owners = rng.choices(owners, cum_weights=owner_cum_weights, k=chunk_size)
+
+        cleanings, offers, evaluations = [], [], []
+        for i, owner in enumerate(chunk_owners):
+            cleaning_id = first_cleaning_id + chunk_start + i
+            posted = start + args.days * DAY / 2 + rng.random() * args.days * DAY / 2
+            cleaning_type = rng.choice(CLEANING_TYPES)
+            cleanings.append((
+                cleaning_id, f'{rng.choice(ROOMS)} {cleaning_type.replace("_", " ")}', 'generated cleaning',
+                cleaning_type, Decimal(rng.randint(1500, 25000)) / 100, owner, timestamp(posted), timestamp(posted),
+            ))
+
+            # most cleanings get a few offers, some get none and a few get many
+            offer_count = int(rng.expovariate(1 / args.offers_per_cleaning) + 0.5)
+            if not offer_count:
+                continue
+            bidders = set(rng.choices(cleaners, cum_weights=cleaner_cum_weights, k=offer_count))
+            bidders.discard(owner)
+            if not bidders:
+                continue
+
+            offered_at = [min(posted + rng.random() * 2 * DAY, now) for _ in bidders]
+            if rng.random() >= args.accepted_fraction:
+                offers.extend(
+                    (bidder, cleaning_id, 'pending', timestamp(at), timestamp(at)) for bidder, at in zip(bidders, offered_at)
+                )
+                continue
+
+            accepted = rng.choice(tuple(bidders))
+            evaluated = rng.random() < args.evaluated_fraction
+            for bidder, at in zip(bidders, offered_at):
+                status = ('completed' if evaluated else 'accepted') if bidder == accepted else 'rejected'
+                offers.append((bidder, cleaning_id, status, timestamp(at), timestamp(at)))
+
+            if evaluated:
+                evaluated_at = timestamp(min(max(offered_at) + rng.uniform(1, 7) * DAY, now))
+                no_show = rng.random() < 0.02
+                overall_rating = 1 if no_show else rating(rng, quality[accepted])
+                evaluations.append((
+                    cleaning_id, accepted, no_show, None, None,
+                    *(rating(rng, quality[accepted]) if rng.random() < 0.9 else None for _ in range(3)),
+                    overall_rating, evaluated_at, evaluated_at,
+                ))
+
+        await loader.copy('cleanings', CLEANING_COLUMNS, cleanings)
+        await loader.copy('user_offers_for_cleanings', OFFER_COLUMNS, offers)
+        await loader.copy('cleaning_to_cleaner_evaluations', EVALUATION_COLUMNS, evaluations)
+        print(f'cleanings   {loader.rows["cleanings"]:>12,}')
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--cleanings', type=int, default=300000)
+    parser.add_argument('--offers-per-cleaning', type=float, default=3.0, help='average, exponentially distributed')
+    parser.add_argument('--cleaner-fraction', type=float, default=0.2, help='share of users who make offers')
+    parser.add_argument('--accepted-fraction', type=float, default=0.6, help='share of cleanings with offers that accept one')
+    parser.add_argument('--evaluated-fraction', type=float, default=0.8, help='share of accepted offers that get evaluated')
+    parser.add_argument('--owner-skew', type=float, default=1.1, help='zipf exponent of cleanings per owner')
+    parser.add_argument('--cleaner-skew', type=float, default=1.1, help='zipf exponent of offers per cleaner')
+    parser.add_argument('--days', type=int, default=365, help='how far back the data goes')
+    parser.add_argument('--prefix', default='gen', help='username prefix, change it to load a second dataset')
+    parser.add_argument('--password', default='generatedpassword', help='password of every generated user')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='rows generated per COPY')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    # every cleaning needs an owner, and an empty id range can't be reserved from a sequence
+    if args.users < 1 or args.cleanings < 1:
+        parser.error('--users and --cleanings must be at least 1')
+
+    rng = random.Random(args.seed)
+    start = time.time() - args.days * DAY
+
+    conn = await asyncpg.connect(f"{DATABASE_URL}{os.environ.get('DB_SUFFIX', '')}")
+    try:
+        loader = Loader(conn)
+        started = time.perf_counter()
+
+        async with conn.transaction():
+            # keeps other inserts from taking ids out of the reserved ranges until we commit
+            await conn.execute('LOCK TABLE users, cleanings IN SHARE ROW EXCLUSIVE MODE')
+            first_user_id = await reserve_ids(conn, 'users_id_seq', args.users)
+            first_cleaning_id = await reserve_ids(conn, 'cleanings_id_seq', args.cleanings)
+
+            await load_users(loader, rng, args, first_user_id=first_user_id, start=start)
+            await load_cleanings(
+                loader, rng, args, first_user_id=first_user_id, first_cleaning_id=first_cleaning_id, start=start,
+            )
+
+            aggregates_started = time.perf_counter()
+            await conn.execute(BUILD_CLEANER_AGGREGATES_QUERY, first_user_id, first_user_id + args.users - 1)
+            loader.seconds['cleaner_evaluation_aggregates'] = time.perf_counter() - aggregates_started
+
+        # fresh statistics so the planner doesn't plan against the old row counts
+        for table in (*loader.rows, 'cleaner_evaluation_aggregates'):
+            await conn.execute(f'ANALYZE {table}')
+
+        elapsed = time.perf_counter() - started
+    finally:
+        await conn.close()
+
+    for table, rows in loader.rows.items():
+        print(f'{table:<34}{rows:>12,} rows   {loader.seconds[table]:>7.1f}s copy   {rows / loader.seconds[table]:>10,.0f} rows/s')
+    print(f"{'cleaner_evaluation_aggregates':<34}{'':>17}{loader.seconds['cleaner_evaluation_aggregates']:>7.1f}s")
+    total_rows = sum(loader.rows.values())
+    print(f'{total_rows:,} rows in {elapsed:.1f}s ({total_rows / elapsed:,.0f} rows/s), password: {args.password}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,315 @@
+'''
+HTTP load test with a realistic request mix. It reports p50/p95/p99 latency and throughput for each named route.
+
+Each virtual user is an owner and a cleaner. They log in and then repeat a job cycle:
+- the owner posts a cleaning and lists their cleanings
+- the cleaner makes an offer
+- the owner accepts it and evaluates the cleaner
+- the cleaner's stats are read
+
+Accounts are registered during setup, which isn't measured. A fixed seed drives prices and ratings, so two runs
+with the same settings send the same requests in the same amounts.
+
+Without --base-url the app runs in process, including its startup warmup, and httpx sends requests straight to
+it. Only the configured database is needed then. With --base-url the requests go over the network to a running
+server, such as the gunicorn entrypoint.
+
+    python -m benchmarks.loadtest --users 20 --sessions 3 --save loadtest-baseline.json
+    python -m benchmarks.loadtest --users 20 --sessions 3 --compare loadtest-baseline.json
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --users 50
+'''
+import json
+import math
+import time
+import random
+import asyncio
+import secrets
+import argparse
+import contextvars
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from datetime import datetime
+from datetime import timezone
+from typing import Awaitable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.core.config import JWT_TOKEN_PREFIX
+
+from app.api.server import get_application
+
+PASSWORD = 'loadtestpassword'
+
+# report order, following the job cycle
+ROUTE_NAMES = (
+    'users:login-email-and-password',
+    'cleanings:create-cleaning',
+    'cleanings:list-all-user-cleanings',
+    'offers:create-offer',
+    'offers:accept-offer-from-user',
+    'evaluations:create-evaluation-for-cleaner',
+    'evaluations:get-stats-for-cleaner',
+)
+
+
+class UnexpectedResponse(Exception):
+    pass
+
+
+class LoadTestClient:
+    '''
+    Sends requests by route name and records every latency under that name.
+    A response with the wrong status is also counted as an error and ends the job cycle it was part of.
+    '''
+    def __init__(self, client: AsyncClient, app: FastAPI) -> None:
+        self.client = client
+        self.app = app
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(
+        self,
+        method: str,
+        route_name: str,
+        *,
+        expected_status: int = 200,
+        token: Optional[str] = None,
+        path_params: Optional[Dict] = None,
+        **kwargs,
+    ):
+        url = self.app.url_path_for(route_name, **(path_params or {}))
+        headers = {'Authorization': f'{JWT_TOKEN_PREFIX} {token}'} if token else {}
+
+        start = time.perf_counter()
+        response = await self.client.request(method, url, headers=headers, **kwargs)
+        self.samples[route_name].append(time.perf_counter() - start)
+
+        if response.status_code != expected_status:
+            self.errors[route_name] += 1
+            raise UnexpectedResponse(f'{route_name} returned {response.status_code}: {response.text[:200]}')
+
+        return response
+
+
+async def register_user(lt: LoadTestClient, username: str) -> Dict:
+    new_user = {'email': f'{username}@loadtest.example.com', 'username': username, 'password': PASSWORD}
+    response = await lt.client.post(lt.app.url_path_for('users:register-new-user'), json={'new_user': new_user})
+    response.raise_for_status()
+
+    return new_user
+
+
+async def register_pairs(lt: LoadTestClient, *, run_id: str, count: int) -> List[Tuple[Dict, Dict]]:
+    pairs = []
+    for i in range(count):
+        owner = await register_user(lt, f'lt-{run_id}-owner-{i}')
+        cleaner = await register_user(lt, f'lt-{run_id}-cleaner-{i}')
+        pairs.append((owner, cleaner))
+
+    return pairs
+
+
+def start_in_fresh_context(coro: Awaitable) -> asyncio.Future:
+    '''
+    In process, the app handles a request inside the task that sends it. databases keeps that task's connection
+    in a ContextVar which every task started from it inherits, so virtual users started from one task would all
+    queue on a single connection. An empty context gives each of them their own pooled connection.
+    '''
+    return contextvars.Context().run(asyncio.ensure_future, coro)
+
+
+async def login(lt: LoadTestClient, user: Dict) -> str:
+    response = await lt.request(
+        'POST', 'users:login-email-and-password', data={'username': user['email'], 'password': user['password']},
+    )
+
+    return response.json()['access_token']
+
+
+async def run_job_cycle(
+    lt: LoadTestClient, rng: random.Random, *, owner_token: str, cleaner: Dict, cleaner_token: str,
+) -> None:
+    new_cleaning = {
+        'name': 'load test cleaning',
+        'description': 'two bedrooms, one bath',
+        'price': rng.randint(20, 80) + 0.99,
+        'cleaning_type': rng.choice(('spot_clean', 'full_clean', 'dust_up')),
+    }
+    response = await lt.request(
+        'POST', 'cleanings:create-cleaning', expected_status=201, token=owner_token,
+        json={'new_cleaning': new_cleaning},
+    )
+    cleaning_id = response.json()['id']
+
+    await lt.request('GET', 'cleanings:list-all-user-cleanings', token=owner_token, params={'limit': 20})
+
+    await lt.request(
+        'POST', 'offers:create-offer', expected_status=201, token=cleaner_token,
+        path_params={'cleaning_id': cleaning_id},
+    )
+    await lt.request(
+        'PUT', 'offers:accept-offer-from-user', token=owner_token,
+        path_params={'cleaning_id': cleaning_id, 'username': cleaner['username']},
+    )
+
+    evaluation_create = {
+        'no_show': False,
+        'headline': 'load test',
+        'professionalism': rng.randint(3, 5),
+        'completeness': rng.randint(3, 5),
+        'efficiency': rng.randint(3, 5),
+        'overall_rating': rng.randint(3, 5),
+    }
+    await lt.request(
+        'POST', 'evaluations:create-evaluation-for-cleaner', expected_status=201, token=owner_token,
+        path_params={'cleaning_id': cleaning_id, 'username': cleaner['username']},
+        json={'evaluation_create': evaluation_create},
+    )
+
+    await lt.request(
+        'GET', 'evaluations:get-stats-for-cleaner', token=owner_token, path_params={'username': cleaner['username']},
+    )
+
+
+async def run_virtual_user(
+    lt: LoadTestClient, rng: random.Random, *, owner: Dict, cleaner: Dict, sessions: int, cycles: int,
+) -> None:
+    for _ in range(sessions):
+        try:
+            owner_token = await login(lt, owner)
+            cleaner_token = await login(lt, cleaner)
+        except UnexpectedResponse as e:
+            print(e)
+            continue
+
+        for _ in range(cycles):
+            try:
+                await run_job_cycle(lt, rng, owner_token=owner_token, cleaner=cleaner, cleaner_token=cleaner_token)
+            except UnexpectedResponse as e:
+                print(e)
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    # nearest rank, so every reported value is a latency that was actually observed
+    index = max(math.ceil(pct / 100 * len(sorted_samples)) - 1, 0)
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> Dict:
+    ordered = sorted(samples)
+
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput_rps': round(len(ordered) / elapsed, 2),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+    }
+
+
+def build_report(lt: LoadTestClient, *, elapsed: float, settings: Dict) -> Dict:
+    routes = {
+        route_name: summarize(lt.samples[route_name], lt.errors[route_name], elapsed)
+        for route_name in ROUTE_NAMES if lt.samples[route_name]
+    }
+    all_samples = [sample for route_samples in lt.samples.values() for sample in route_samples]
+    routes['all'] = summarize(all_samples, sum(lt.errors.values()), elapsed)
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'settings': settings,
+        'elapsed_seconds': round(elapsed, 2),
+        'routes': routes,
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    print(f"{report['elapsed_seconds']:.2f}s   {json.dumps(report['settings'])}")
+    print(f"{'route':<44}{'requests':>9}{'errors':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+
+    for route_name, stats in report['routes'].items():
+        print(
+            f"{route_name:<44}{stats['requests']:>9}{stats['errors']:>7}{stats['throughput_rps']:>9.1f}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+        )
+
+        baseline_stats = (baseline or {}).get('routes', {}).get(route_name)
+        if baseline_stats:
+            deltas = [
+                f"{(stats[key] - baseline_stats[key]) / baseline_stats[key] * 100:>+8.1f}%" if baseline_stats[key] else f"{'-':>9}"
+                for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms')
+            ]
+            print(f"{'  vs baseline':<60}{''.join(deltas)}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='running server to test, the app runs in process when left out')
+    parser.add_argument('--users', type=int, default=10, help='virtual users running at the same time')
+    parser.add_argument('--sessions', type=int, default=2, help='logins per virtual user')
+    parser.add_argument('--cycles', type=int, default=5, help='job cycles per session')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='write the report to this json file as a baseline')
+    parser.add_argument('--compare', help='baseline json file to compare against')
+    args = parser.parse_args()
+
+    settings = {
+        'target': args.base_url or 'in-process',
+        'users': args.users,
+        'sessions': args.sessions,
+        'cycles': args.cycles,
+        'seed': args.seed,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['settings'] != settings:
+            print(f"warning: baseline was run with {json.dumps(baseline['settings'])}")
+
+    # only used to build paths from route names when testing a running server
+    app = get_application()
+
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            client = await stack.enter_async_context(AsyncClient(base_url=args.base_url, timeout=60))
+        else:
+            await stack.enter_async_context(LifespanManager(app, startup_timeout=60))
+            client = await stack.enter_async_context(AsyncClient(app=app, base_url='http://loadtest', timeout=60))
+
+        lt = LoadTestClient(client, app)
+
+        # usernames are unique per run since the database keeps the accounts of earlier runs
+        pairs = await start_in_fresh_context(register_pairs(lt, run_id=secrets.token_hex(4), count=args.users))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            start_in_fresh_context(run_virtual_user(
+                lt, random.Random(args.seed + i), owner=owner, cleaner=cleaner,
+                sessions=args.sessions, cycles=args.cycles,
+            ))
+            for i, (owner, cleaner) in enumerate(pairs)
+        ))
+        elapsed = time.perf_counter() - start
+
+    report = build_report(lt, elapsed=elapsed, settings=settings)
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'saved baseline to {args.save}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,105 @@
+'''
+Compare the cpu cost of turning db rows into models with full pydantic validation
+(`CleaningInDB(**record)`) against the trusted path repositories use
+(`CleaningInDB.from_trusted_record(record)`).
+
+Rows are generated in memory with the same python types asyncpg returns (Decimal prices,
+datetimes, enum values as text), so no database is needed.
+
+    python -m benchmarks.model_construction --rows 10000 --repeat 5
+'''
+import time
+import argparse
+from decimal import Decimal
+from datetime import datetime
+from datetime import timedelta
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from app.models.cleaning import CleaningInDB
+from app.models.offer import OfferInDB
+from app.models.user import UserInDB
+
+
+def cleaning_rows(count: int) -> List[Dict]:
+    now = datetime.now()
+    return [
+        {
+            'id': i,
+            'name': f'cleaning - {i}',
+            'description': f'description - {i}',
+            'price': Decimal(f'{i % 1000}.99'),
+            'cleaning_type': ('dust_up', 'spot_clean', 'full_clean')[i % 3],
+            'owner': i % 100 + 1,
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def offer_rows(count: int) -> List[Dict]:
+    now = datetime.now()
+    return [
+        {
+            'cleaning_id': i,
+            'user_id': i % 100 + 1,
+            'status': ('pending', 'accepted', 'rejected')[i % 3],
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def user_rows(count: int) -> List[Dict]:
+    now = datetime.now()
+    return [
+        {
+            'id': i,
+            'username': f'user{i}',
+            'email': f'user{i}@phresh.io',
+            'email_verified': False,
+            'password': '$2b$12$' + 'x' * 53,
+            'salt': '$2b$12$' + 'y' * 22,
+            'is_active': True,
+            'is_superuser': False,
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def best_of(repeat: int, build: Callable, rows: List[Dict]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(rows)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for model, rows in (
+        (CleaningInDB, cleaning_rows(args.rows)),
+        (OfferInDB, offer_rows(args.rows)),
+        (UserInDB, user_rows(args.rows)),
+    ):
+        validated = best_of(args.repeat, lambda rows: [model(**row) for row in rows], rows)
+        trusted = best_of(args.repeat, lambda rows: [model.from_trusted_record(row) for row in rows], rows)
+        print(
+            f'{model.__name__:<13} validated {validated * 1000:8.1f} ms   trusted {trusted * 1000:8.1f} ms   '
+            f'{validated / trusted:.1f}x faster over {args.rows:,} rows'
+        )
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+'''
+Compare per query overhead of `CleaningsRepository.get_cleaning_by_id` through `databases`
+(sqlalchemy text() compiled on every call) and through the QueryExecutor (compiled once, run on asyncpg).
+
+    python -m benchmarks.query_executor --cleaning-id 1 --iterations 5000
+'''
+import os
+import time
+import asyncio
+import argparse
+
+from databases import Database
+
+from app.core.config import DATABASE_URL
+
+from app.db.repositories.cleanings import CleaningsRepository
+from app.db.repositories.cleanings import GET_CLEANING_BY_ID_QUERY
+
+
+class DatabasesOnly:
+    '''
+    Sends every query through `databases` as a plain string, the way repositories did before the executor.
+    '''
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def fetch_one(self, query, values=None):
+        return await self._db.fetch_one(query=str(query), values=values)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+async def run(cleanings_repo: CleaningsRepository, *, label: str, cleaning_id: int, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await cleanings_repo.get_cleaning_by_id(id=cleaning_id, requesting_user=None)
+    elapsed = time.perf_counter() - start
+
+    per_query = elapsed / iterations * 1_000_000
+    print(f'{label:<10} {per_query:,.1f} us/query   {iterations / elapsed:,.0f} queries/s')
+
+    return per_query
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cleaning-id', type=int, required=True, help='existing cleaning to look up')
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    db = Database(f"{DATABASE_URL}{os.environ.get('DB_SUFFIX', '')}", min_size=1, max_size=1)
+    await db.connect()
+    try:
+        before_repo = CleaningsRepository(DatabasesOnly(db))
+        after_repo = CleaningsRepository(db)
+
+        # warm up the connection and asyncpg's prepared statement cache for both forms of the query
+        for repo in (before_repo, after_repo):
+            await run(repo, label='warmup', cleaning_id=args.cleaning_id, iterations=100)
+
+        print(f'query: {" ".join(GET_CLEANING_BY_ID_QUERY.split())}')
+        before = await run(before_repo, label='databases', cleaning_id=args.cleaning_id, iterations=args.iterations)
+        after = await run(after_repo, label='executor', cleaning_id=args.cleaning_id, iterations=args.iterations)
+        print(f'saved      {before - after:,.1f} us/query ({before / after:.2f}x)')
+    finally:
+        await db.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
\ No newline at end of file
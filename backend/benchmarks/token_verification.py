@@ -0,0 +1,59 @@
+'''
+Compare throughput of resolving the username from an access token with and without the
+verified token cache. Cold verification is a full jwt.decode (HMAC + audience check) plus
+JWTPayload validation, which is what every authenticated request used to pay for.
+
+Needs no database.
+
+    python -m benchmarks.token_verification --iterations 100000
+'''
+import time
+import argparse
+from datetime import datetime
+
+from app.core.config import SECRET_KEY
+
+from app.models.user import UserInDB
+
+from app.services.authentication import AuthService
+from app.services.cache import VerifiedTokenCache
+
+
+def run(service: AuthService, *, label: str, token: str, iterations: int) -> float:
+    secret_key = str(SECRET_KEY)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        service.get_username_from_token(token=token, secret_key=secret_key)
+    elapsed = time.perf_counter() - start
+
+    print(f'{label:<8} {elapsed / iterations * 1_000_000:.2f} us/token   {iterations / elapsed:,.0f} tokens/s')
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    user = UserInDB(
+        id=1,
+        username='lebronjames',
+        email='lebron@james.io',
+        password='not-a-real-hash',
+        salt='not-a-real-salt',
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+    cold_service = AuthService()
+    cached_service = AuthService(token_cache=VerifiedTokenCache(max_size=10, ttl=300))
+    token = cold_service.create_access_token_for_user(user=user, secret_key=str(SECRET_KEY))
+
+    cold = run(cold_service, label='cold', token=token, iterations=args.iterations)
+    cached = run(cached_service, label='cached', token=token, iterations=args.iterations)
+    print(f'cached verification is {cold / cached:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+'''
+Compare round trips and latency of resolving a user together with their profile.
+
+The two step lookup is how users used to be loaded (user row, then a profile query);
+the joined lookup is what UsersRepository does now.
+
+    python -m benchmarks.user_lookup --username lebronjames --iterations 1000
+'''
+import os
+import time
+import asyncio
+import argparse
+
+from databases import Database
+
+from app.core.config import DATABASE_URL
+
+from app.models.user import UserInDB
+from app.models.profile import ProfilePublic
+
+from app.db.repositories.users import UsersRepository
+from app.db.repositories.profiles import ProfilesRepository
+
+
+GET_USER_ROW_BY_USERNAME_QUERY = """
+    SELECT id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at
+    FROM users
+    WHERE username = :username;
+"""
+
+
+class CountingDatabase:
+    '''
+    Proxy around a Database that counts every statement sent through it.
+    '''
+    def __init__(self, db: Database) -> None:
+        self._db = db
+        self.queries = 0
+
+    async def fetch_one(self, query, values=None):
+        self.queries += 1
+        return await self._db.fetch_one(query=query, values=values)
+
+    async def fetch_all(self, query, values=None):
+        self.queries += 1
+        return await self._db.fetch_all(query=query, values=values)
+
+    async def execute(self, query, values=None):
+        self.queries += 1
+        return await self._db.execute(query=query, values=values)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+async def two_step_lookup(db: CountingDatabase, username: str) -> UserInDB:
+    user_record = await db.fetch_one(query=GET_USER_ROW_BY_USERNAME_QUERY, values={'username': username})
+    profile = await ProfilesRepository(db).get_profile_by_user_id(user_id=user_record['id'])
+
+    return UserInDB(**user_record, profile=ProfilePublic(**profile.dict()))
+
+
+async def joined_lookup(db: CountingDatabase, username: str) -> UserInDB:
+    return await UsersRepository(db).get_user_by_username(username=username)
+
+
+async def run(db: Database, *, label: str, lookup, username: str, iterations: int) -> None:
+    counting_db = CountingDatabase(db)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await lookup(counting_db, username)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f'{label:<12} {counting_db.queries / iterations:.1f} queries/lookup   '
+        f'{elapsed / iterations * 1000:.3f} ms/lookup   {iterations / elapsed:,.0f} lookups/s'
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--username', required=True, help='existing user to look up')
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    db = Database(f"{DATABASE_URL}{os.environ.get('DB_SUFFIX', '')}", min_size=1, max_size=1)
+    await db.connect()
+    try:
+        # warm up connections and the server side plan cache
+        await joined_lookup(CountingDatabase(db), args.username)
+
+        await run(db, label='two step', lookup=two_step_lookup, username=args.username, iterations=args.iterations)
+        await run(db, label='joined', lookup=joined_lookup, username=args.username, iterations=args.iterations)
+    finally:
+        await db.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,38 @@
+'''
+Production server settings, used by the Dockerfile:
+
+    gunicorn -c gunicorn_conf.py app.api.server:app
+
+Every setting can be changed through the environment, see the WEB_* values in app/core/config.py.
+'''
+from app.core.config import WEB_BACKLOG
+from app.core.config import WEB_CONCURRENCY
+from app.core.config import WEB_GRACEFUL_TIMEOUT
+from app.core.config import WEB_HOST
+from app.core.config import WEB_KEEP_ALIVE
+from app.core.config import WEB_MAX_REQUESTS
+from app.core.config import WEB_MAX_REQUESTS_JITTER
+from app.core.config import WEB_MAX_WORKERS
+from app.core.config import WEB_PORT
+from app.core.config import WEB_TIMEOUT
+from app.core.config import WEB_WORKERS_PER_CORE
+from app.core.workers import get_worker_count
+
+bind = f'{WEB_HOST}:{WEB_PORT}'
+workers = get_worker_count(
+    concurrency=WEB_CONCURRENCY, workers_per_core=WEB_WORKERS_PER_CORE, max_workers=WEB_MAX_WORKERS,
+)
+worker_class = 'app.core.workers.AutoUvicornWorker'
+
+keepalive = WEB_KEEP_ALIVE
+backlog = WEB_BACKLOG
+# restarting workers now and then bounds slow memory growth, the jitter keeps them from restarting together
+max_requests = WEB_MAX_REQUESTS
+max_requests_jitter = WEB_MAX_REQUESTS_JITTER
+timeout = WEB_TIMEOUT
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+
+# heartbeat files on tmpfs, docker's overlay filesystem can stall workers into timeouts
+worker_tmp_dir = '/dev/shm'
+accesslog = None
+errorlog = '-'
\ No newline at end of file
@@ -25,11 +25,13 @@ from app.models.offer import OfferCreate
 from app.models.offer import OfferUpdate
 from app.models.evaluation import EvaluationCreate
 
+from app.db.executor import QueryExecutor
 from app.db.repositories.cleanings import CleaningsRepository
 from app.db.repositories.users import UsersRepository
 from app.db.repositories.offers import OffersRepository
 from app.db.repositories.evaluations import EvaluationsRepository
 
+from app.core import config
 from app.core.config import SECRET_KEY
 from app.core.config import JWT_TOKEN_PREFIX
 
@@ -93,9 +95,30 @@ def db(app: FastAPI) -> Database:
     return app.state._db
 
 
+# Count the queries repositories issue while a test runs
+@pytest.fixture
+def query_counter(monkeypatch) -> List[str]:
+    queries: List[str] = []
+
+    def _counted(method: Callable) -> Callable:
+        async def _wrapper(self, query, *args, **kwargs):
+            queries.append(str(query))
+            return await method(self, query, *args, **kwargs)
+        return _wrapper
+
+    # every repository query goes through the executor, compiled or not
+    for name in ('fetch_all', 'fetch_one', 'fetch_val', 'execute', 'execute_many'):
+        monkeypatch.setattr(QueryExecutor, name, _counted(getattr(QueryExecutor, name)))
+
+    return queries
+
+
 # Make requests in our tests
 @pytest.fixture
-async def client(app: FastAPI) -> AsyncClient:
+async def client(app: FastAPI, monkeypatch) -> AsyncClient:
+    # a bcrypt hash per hashing worker on every startup would add up over the whole suite
+    monkeypatch.setattr(config, 'PASSWORD_HASHING_WARMUP', False)
+
     async with LifespanManager(app):
         async with AsyncClient(
             app=app,
@@ -185,6 +208,29 @@ async def test_user(db: Database) -> UserInDB:
     return await user_fixture_helper(db=db, new_user=new_user)
 
 
+@pytest.fixture
+async def test_superuser(db: Database) -> UserInDB:
+    new_user = UserCreate(email='ada@lovelace.io', username='adalovelace', password='analyticalengine')
+    user = await user_fixture_helper(db=db, new_user=new_user)
+
+    # there's no route for granting it, superusers are made by hand in the db
+    await db.execute(query='UPDATE users SET is_superuser = TRUE WHERE id = :id', values={'id': user.id})
+
+    return user.copy(update={'is_superuser': True})
+
+
+@pytest.fixture
+def superuser_client(client: AsyncClient, test_superuser: UserInDB) -> AsyncClient:
+    access_token = auth_service.create_access_token_for_user(user=test_superuser, secret_key=str(SECRET_KEY))
+
+    client.headers = {
+        **client.headers,
+        'Authorization': f'{JWT_TOKEN_PREFIX} {access_token}',
+    }
+
+    return client
+
+
 @pytest.fixture
 async def test_user2(db: Database) -> UserInDB:
     new_user = UserCreate(email='serena@williams.io', username='serenawilliams', password='tennistwins')
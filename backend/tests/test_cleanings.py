@@ -2,13 +2,19 @@ from typing import List
 from typing import Dict
 from typing import Union
 from typing import Optional
+from typing import Callable
+
+import json
 
 import pytest
 
+from pydantic import ValidationError
+
 from httpx import AsyncClient
 
 from fastapi import FastAPI
 from fastapi import status
+from fastapi.encoders import jsonable_encoder
 
 from databases import  Database
 
@@ -17,6 +23,7 @@ from app.db.repositories.cleanings import CleaningsRepository
 from app.models.cleaning import CleaningCreate
 from app.models.cleaning import CleaningInDB
 from app.models.cleaning import CleaningPublic
+from app.models.cleaning import CleaningType
 
 from app.models.user import UserInDB
 
@@ -111,6 +118,70 @@ class TestCreateCleaning:
         assert res.status_code == status_code
 
 
+class TestCreateCleaningsBatch:
+    async def test_valid_batch_creates_all_cleanings_in_one_insert(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB, query_counter: List[str]
+    ) -> None:
+        new_cleanings = [
+            CleaningCreate(name=f'batch cleaning {i}', price=10 + i, cleaning_type='dust_up').dict() for i in range(50)
+        ]
+        res = await authorized_client.post(
+            app.url_path_for('cleanings:create-cleanings-batch'), json={'new_cleanings': new_cleanings}
+        )
+        assert res.status_code == status.HTTP_201_CREATED
+        assert res.json()['errors'] == []
+
+        created_cleanings = [CleaningPublic(**cleaning) for cleaning in res.json()['created']]
+        assert [cleaning.name for cleaning in created_cleanings] == [cleaning['name'] for cleaning in new_cleanings]
+        assert [cleaning.price for cleaning in created_cleanings] == [cleaning['price'] for cleaning in new_cleanings]
+        assert all(cleaning.owner == test_user.id for cleaning in created_cleanings)
+        assert all(cleaning.cleaning_type == CleaningType.dust_up for cleaning in created_cleanings)
+
+        assert len([query for query in query_counter if 'INSERT INTO cleanings' in query]) == 1
+
+
+    async def test_invalid_items_are_reported_by_index(
+        self, app: FastAPI, authorized_client: AsyncClient
+    ) -> None:
+        new_cleanings = [
+            {'name': 'valid cleaning', 'price': 10.00},
+            {'name': 'missing price'},
+            {'name': 'valid cleaning with defaults', 'price': 20.00, 'description': 'desc'},
+            {'name': 'bad type', 'price': 10.00, 'cleaning_type': 'not_a_type'},
+        ]
+        res = await authorized_client.post(
+            app.url_path_for('cleanings:create-cleanings-batch'), json={'new_cleanings': new_cleanings}
+        )
+        assert res.status_code == status.HTTP_201_CREATED
+
+        created_cleanings = [CleaningPublic(**cleaning) for cleaning in res.json()['created']]
+        assert [cleaning.name for cleaning in created_cleanings] == ['valid cleaning', 'valid cleaning with defaults']
+        assert created_cleanings[0].cleaning_type == CleaningType.spot_clean
+
+        errors = res.json()['errors']
+        assert [error['index'] for error in errors] == [1, 3]
+        assert errors[0]['errors'][0]['loc'] == ['price']
+        assert errors[1]['errors'][0]['loc'] == ['cleaning_type']
+
+
+    @pytest.mark.parametrize(
+        'new_cleanings, status_code',
+        (
+            ([], 400),
+            ([{'name': 'test_name', 'price': 10.00}] * 501, 400),
+            ([{'name': 'test_name'}, {'price': 10.00}], 422),
+            (None, 422),
+        ),
+    )
+    async def test_invalid_batches_raise_error(
+        self, app: FastAPI, authorized_client: AsyncClient, new_cleanings: Optional[List[Dict]], status_code: int
+    ) -> None:
+        res = await authorized_client.post(
+            app.url_path_for('cleanings:create-cleanings-batch'), json={'new_cleanings': new_cleanings}
+        )
+        assert res.status_code == status_code
+
+
 class TestGetCleaning:
     async def test_get_cleaning_by_id(
         self, app: FastAPI, authorized_client: AsyncClient, test_cleaning: CleaningInDB
@@ -121,6 +192,35 @@ class TestGetCleaning:
         assert cleaning == test_cleaning
 
 
+    async def test_unchanged_cleaning_returns_not_modified_until_updated(
+        self, app: FastAPI, authorized_client: AsyncClient, test_cleaning: CleaningInDB
+    ) -> None:
+        url = app.url_path_for('cleanings:get-cleaning-by-id', cleaning_id=test_cleaning.id)
+        res = await authorized_client.get(url)
+        assert res.status_code == status.HTTP_200_OK
+        etag = res.headers['etag']
+        assert etag.startswith('W/"')
+
+        res = await authorized_client.get(url, headers={'If-None-Match': etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.content == b''
+        assert res.headers['etag'] == etag
+
+        res = await authorized_client.get(url, headers={'If-None-Match': f'"other", {etag[2:]}'})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+        res = await authorized_client.put(
+            app.url_path_for('cleanings:update-cleaning-by-id', cleaning_id=test_cleaning.id),
+            json={'cleaning_update': {'description': 'changed for etag'}},
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await authorized_client.get(url, headers={'If-None-Match': etag})
+        assert res.status_code == status.HTTP_200_OK
+        assert res.headers['etag'] != etag
+        assert res.json()['description'] == 'changed for etag'
+
+
     async def test_unauthorized_users_cant_access_cleanings(
         self, app: FastAPI, client: AsyncClient, test_cleaning: CleaningInDB
     ) -> None:
@@ -165,6 +265,68 @@ class TestGetCleaning:
         # assert all cleanings created by another user not included (redundant, but fine)
         assert all(cleaning not in cleanings for cleaning in test_cleanings_list)
 
+    async def test_user_cleanings_are_paginated_newest_first_with_cursor(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user2: UserInDB,
+        test_cleanings_list: List[CleaningInDB],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user2)
+        seen = []
+        params = {'limit': 2}
+        while True:
+            res = await authorized_client.get(app.url_path_for('cleanings:list-all-user-cleanings'), params=params)
+            assert res.status_code == status.HTTP_200_OK
+            page = [CleaningInDB(**cleaning) for cleaning in res.json()]
+            assert len(page) <= 2
+            seen.extend(page)
+
+            next_cursor = res.headers.get('X-Next-Cursor')
+            if not next_cursor:
+                break
+            params['cursor'] = next_cursor
+
+        # every cleaning comes back exactly once, newest first
+        assert len({cleaning.id for cleaning in seen}) == len(seen)
+        assert seen == sorted(seen, key=lambda cleaning: (cleaning.created_at, cleaning.id), reverse=True)
+        assert all(cleaning in seen for cleaning in test_cleanings_list)
+
+    async def test_cleanings_list_matches_response_model_serialization(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user2: UserInDB,
+        test_cleanings_list: List[CleaningInDB],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user2)
+        res = await authorized_client.get(app.url_path_for('cleanings:list-all-user-cleanings'))
+        assert res.status_code == status.HTTP_200_OK
+        # same body FastAPI would have produced by validating into CleaningPublic and encoding
+        returned = {cleaning['id']: cleaning for cleaning in res.json()}
+        for cleaning in test_cleanings_list:
+            expected = json.loads(json.dumps(jsonable_encoder(CleaningPublic(**cleaning.dict()))))
+            assert returned[cleaning.id] == expected
+
+        # and the documented schema still points at CleaningPublic
+        schema = app.openapi()['paths'][app.url_path_for('cleanings:list-all-user-cleanings')]['get']
+        items = schema['responses']['200']['content']['application/json']['schema']['items']
+        assert items['$ref'].endswith('/CleaningPublic')
+
+    @pytest.mark.parametrize(
+        'params, status_code',
+        (
+            ({'limit': 0}, 422),
+            ({'limit': 1000}, 422),
+            ({'cursor': 'not-a-cursor'}, 400),
+        ),
+    )
+    async def test_invalid_pagination_params_raise_error(
+        self, app: FastAPI, authorized_client: AsyncClient, params: Dict, status_code: int,
+    ) -> None:
+        res = await authorized_client.get(app.url_path_for('cleanings:list-all-user-cleanings'), params=params)
+        assert res.status_code == status_code
+
 
 class TestUpdateCleaning:
     @pytest.mark.parametrize(
@@ -293,4 +455,26 @@ class TestDeleteCleaning:
         status_code: int,
     ) -> None:
         res = await authorized_client.delete(app.url_path_for('cleanings:delete-cleaning-by-id', cleaning_id=id))
-        assert res.status_code == status_code
\ No newline at end of file
+        assert res.status_code == status_code
+
+
+class TestTrustedCleaningRecords:
+    async def test_trusted_records_match_validated_models(
+        self, client: AsyncClient, db: Database, test_cleaning: CleaningInDB
+    ) -> None:
+        record = await db.fetch_one(
+            query="""
+                SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
+                FROM cleanings
+                WHERE id = :id;
+            """,
+            values={'id': test_cleaning.id},
+        )
+        trusted = CleaningInDB.from_trusted_record(record)
+        assert trusted == CleaningInDB(**record)
+        assert isinstance(trusted.price, float)
+        assert trusted.cleaning_type == CleaningType(record['cleaning_type'])
+
+    async def test_records_missing_required_fields_are_validated(self, client: AsyncClient) -> None:
+        with pytest.raises(ValidationError):
+            CleaningInDB.from_trusted_record({'name': 'no id or owner'})
\ No newline at end of file
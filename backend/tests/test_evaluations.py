@@ -1,6 +1,9 @@
+from typing import Dict
 from typing import List
 from typing import Callable
 
+import json
+
 import pytest
 
 from httpx import AsyncClient
@@ -10,8 +13,13 @@ from statistics import mean
 from fastapi import FastAPI
 from fastapi import status
 
+from databases import Database
+
+from app.models.cleaning import CleaningCreate
 from app.models.cleaning import CleaningInDB
+from app.models.cleaning import CleaningPublic
 from app.models.user import UserInDB
+from app.models.user import UserPublic
 from app.models.offer import OfferInDB
 from app.models.evaluation import EvaluationCreate
 from app.models.evaluation import EvaluationPublic
@@ -19,9 +27,27 @@ from app.models.evaluation import EvaluationInDB
 from app.models.evaluation import EvaluationAggregate
 from app.db.repositories.evaluations import EvaluationsRepository
 
+from app.api.dependencies.pagination import NEXT_CURSOR_HEADER
+
+from tests.conftest import create_cleaning_with_evaluated_offer_helper
+
 
 pytestmark = pytest.mark.asyncio
 
+EVALUATION_CREATE_QUERY_BUDGET = 5
+
+
+async def fetch_all_pages(client: AsyncClient, url: str, params: Dict) -> List[Dict]:
+    # follow X-Next-Cursor until the last page
+    evaluations = []
+    while True:
+        res = await client.get(url, params=params)
+        assert res.status_code == status.HTTP_200_OK
+        evaluations.extend(res.json())
+        if NEXT_CURSOR_HEADER not in res.headers:
+            return evaluations
+        params = {**params, 'cursor': res.headers[NEXT_CURSOR_HEADER]}
+
 
 class TestEvaluationRoutes:
     async def test_routes_exist(self, app: FastAPI, client: AsyncClient) -> None:
@@ -45,6 +71,11 @@ class TestEvaluationRoutes:
         )
         assert res.status_code != status.HTTP_404_NOT_FOUND
 
+        res = await client.get(
+            app.url_path_for('evaluations:export-evaluations-for-cleaner', username='bradpitt')
+        )
+        assert res.status_code != status.HTTP_404_NOT_FOUND
+
 
 class TestCreateEvaluations:
     async def test_owner_can_leave_evaluation_for_cleaner_and_mark_offer_completed(
@@ -94,6 +125,29 @@ Though the cleaner took their time, I would definitely hire them again for the q
         assert res.status_code == status.HTTP_200_OK
         assert res.json()['status'] == 'completed'
 
+    async def test_evaluation_create_stays_within_query_budget(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user2: UserInDB,
+        test_user3: UserInDB,
+        test_cleaning_with_accepted_offer: CleaningInDB,
+        query_counter: List[str],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user2)
+        query_counter.clear()
+        res = await authorized_client.post(
+            app.url_path_for(
+                'evaluations:create-evaluation-for-cleaner',
+                cleaning_id=test_cleaning_with_accepted_offer.id,
+                username=test_user3.username,
+            ),
+            json={'evaluation_create': {'overall_rating': 4}},
+        )
+        assert res.status_code == status.HTTP_201_CREATED
+        # current user + permission context + insert, offer update and stats update
+        assert len(query_counter) <= EVALUATION_CREATE_QUERY_BUDGET
+
     async def test_non_owner_cant_leave_review(
         self,
         app: FastAPI,
@@ -217,6 +271,155 @@ class TestGetEvaluations:
             assert evaluation.overall_rating >= 0
 
 
+    async def test_export_streams_same_evaluations_as_list_as_ndjson(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user3: UserInDB,
+        test_user4: UserInDB,
+        test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user4)
+        listed = await fetch_all_pages(
+            authorized_client,
+            app.url_path_for('evaluations:list-evaluations-for-cleaner', username=test_user3.username),
+            {'limit': 100},
+        )
+
+        res = await authorized_client.get(
+            app.url_path_for('evaluations:export-evaluations-for-cleaner', username=test_user3.username)
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.headers['content-type'].startswith('application/x-ndjson')
+        assert res.text.endswith('\n')
+
+        exported = [json.loads(line) for line in res.text.splitlines()]
+        key = lambda evaluation: evaluation['cleaning_id']
+        assert sorted(exported, key=key) == sorted(listed, key=key)
+        assert all(EvaluationPublic(**evaluation).cleaner == test_user3.id for evaluation in exported)
+
+
+    async def test_evaluations_are_paginated_newest_first(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user3: UserInDB,
+        test_user4: UserInDB,
+        test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user4)
+        res = await authorized_client.get(
+            app.url_path_for('evaluations:export-evaluations-for-cleaner', username=test_user3.username)
+        )
+        exported = [json.loads(line) for line in res.text.splitlines()]
+
+        paged = await fetch_all_pages(
+            authorized_client,
+            app.url_path_for('evaluations:list-evaluations-for-cleaner', username=test_user3.username),
+            {'limit': 2},
+        )
+        keys = [(EvaluationPublic(**evaluation).created_at, evaluation['cleaning_id']) for evaluation in paged]
+        assert keys == sorted(keys, reverse=True)
+        assert len(set(keys)) == len(keys)
+        assert sorted(evaluation['cleaning_id'] for evaluation in paged) == sorted(
+            evaluation['cleaning_id'] for evaluation in exported
+        )
+
+
+    async def test_evaluations_can_be_sorted_oldest_first_and_filtered(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user3: UserInDB,
+        test_user4: UserInDB,
+        test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user4)
+        res = await authorized_client.get(
+            app.url_path_for('evaluations:export-evaluations-for-cleaner', username=test_user3.username)
+        )
+        exported = [json.loads(line) for line in res.text.splitlines()]
+        expected = [
+            evaluation for evaluation in exported if evaluation['overall_rating'] >= 3 and not evaluation['no_show']
+        ]
+
+        paged = await fetch_all_pages(
+            authorized_client,
+            app.url_path_for('evaluations:list-evaluations-for-cleaner', username=test_user3.username),
+            {'limit': 3, 'sort': 'oldest', 'min_overall_rating': 3, 'no_show': 'false'},
+        )
+        keys = [(EvaluationPublic(**evaluation).created_at, evaluation['cleaning_id']) for evaluation in paged]
+        assert keys == sorted(keys)
+        assert sorted(evaluation['cleaning_id'] for evaluation in paged) == sorted(
+            evaluation['cleaning_id'] for evaluation in expected
+        )
+
+
+    async def test_listed_evaluations_can_embed_cleaner_and_cleanings_with_one_extra_query(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user3: UserInDB,
+        test_user4: UserInDB,
+        test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB],
+        query_counter: List[str],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user4)
+        url = app.url_path_for('evaluations:list-evaluations-for-cleaner', username=test_user3.username)
+
+        # the first request also warms the authenticated user cache
+        res = await authorized_client.get(url, params={'limit': 5})
+        assert res.status_code == status.HTTP_200_OK
+
+        query_counter.clear()
+        res = await authorized_client.get(url, params={'limit': 5})
+        assert res.status_code == status.HTTP_200_OK
+        queries_without_expand = len(query_counter)
+
+        query_counter.clear()
+        res = await authorized_client.get(url, params=[('limit', 5), ('expand', 'cleaner'), ('expand', 'cleaning')])
+        assert res.status_code == status.HTTP_200_OK
+        assert len(query_counter) == queries_without_expand + 1
+
+        # expanded objects take the place of the ids, under the same keys
+        evaluations = res.json()
+        assert len(evaluations) == 5
+        cleanings_by_id = {cleaning.id: cleaning for cleaning in test_list_of_cleanings_with_evaluated_offer}
+        for evaluation in evaluations:
+            cleaner = UserPublic(**evaluation['cleaner_id'])
+            cleaning = CleaningPublic(**evaluation['cleaning_id'])
+            assert cleaner.username == test_user3.username
+            assert cleaning.owner is not None
+            if cleaning.id in cleanings_by_id:
+                assert cleaning.name == cleanings_by_id[cleaning.id].name
+
+
+    @pytest.mark.parametrize(
+        'params, status_code',
+        (
+            ({'limit': 0}, status.HTTP_422_UNPROCESSABLE_ENTITY),
+            ({'expand': 'owner'}, status.HTTP_422_UNPROCESSABLE_ENTITY),
+            ({'sort': 'best'}, status.HTTP_422_UNPROCESSABLE_ENTITY),
+            ({'min_overall_rating': 6}, status.HTTP_422_UNPROCESSABLE_ENTITY),
+            ({'cursor': 'not-a-cursor'}, status.HTTP_400_BAD_REQUEST),
+        ),
+    )
+    async def test_invalid_list_params_raise_error(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user3: UserInDB,
+        test_user4: UserInDB,
+        params: Dict,
+        status_code: int,
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user4)
+        res = await authorized_client.get(
+            app.url_path_for('evaluations:list-evaluations-for-cleaner', username=test_user3.username), params=params
+        )
+        assert res.status_code == status_code
+
+
     async def test_authenticated_user_can_get_aggregate_stats_for_cleaner(
         self,
         app: FastAPI,
@@ -226,11 +429,12 @@ class TestGetEvaluations:
         test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB],
     ) -> None:
         authorized_client = create_authorized_client(user=test_user4)
+        # the listing is paginated, the export holds every evaluation
         res = await authorized_client.get(
-            app.url_path_for('evaluations:list-evaluations-for-cleaner', username=test_user3.username)
+            app.url_path_for('evaluations:export-evaluations-for-cleaner', username=test_user3.username)
         )
         assert res.status_code == status.HTTP_200_OK
-        evaluations = [EvaluationPublic(**evaluation) for evaluation in res.json()]
+        evaluations = [EvaluationPublic(**json.loads(line)) for line in res.text.splitlines()]
 
         res = await authorized_client.get(
             app.url_path_for('evaluations:get-stats-for-cleaner', username=test_user3.username)
@@ -254,6 +458,72 @@ class TestGetEvaluations:
         assert len([e for e in evaluations if e.overall_rating == 4]) == stats.four_stars
         assert len([e for e in evaluations if e.overall_rating == 5]) == stats.five_stars
 
+    async def test_unchanged_stats_return_not_modified_until_new_evaluation(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        test_user2: UserInDB,
+        test_user4: UserInDB,
+        test_user6: UserInDB,
+    ) -> None:
+        await create_cleaning_with_evaluated_offer_helper(
+            db=db,
+            owner=test_user2,
+            cleaner=test_user6,
+            cleaning_create=CleaningCreate(name='etag cleaning', price=29.99, cleaning_type='full_clean'),
+            evaluation_create=EvaluationCreate(professionalism=4, completeness=4, efficiency=4, overall_rating=4),
+        )
+
+        authorized_client = create_authorized_client(user=test_user4)
+        url = app.url_path_for('evaluations:get-stats-for-cleaner', username=test_user6.username)
+        res = await authorized_client.get(url)
+        assert res.status_code == status.HTTP_200_OK
+        etag = res.headers['etag']
+
+        res = await authorized_client.get(url, headers={'If-None-Match': etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.content == b''
+
+        await create_cleaning_with_evaluated_offer_helper(
+            db=db,
+            owner=test_user2,
+            cleaner=test_user6,
+            cleaning_create=CleaningCreate(name='etag cleaning', price=29.99, cleaning_type='full_clean'),
+            evaluation_create=EvaluationCreate(professionalism=2, completeness=2, efficiency=2, overall_rating=2),
+        )
+
+        res = await authorized_client.get(url, headers={'If-None-Match': etag})
+        assert res.status_code == status.HTTP_200_OK
+        assert res.headers['etag'] != etag
+
+    async def test_new_evaluation_is_folded_into_cleaner_stats(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        test_user2: UserInDB,
+        test_user5: UserInDB,
+    ) -> None:
+        evals_repo = EvaluationsRepository(db)
+        before = await evals_repo.get_cleaner_aggregates(cleaner=test_user5)
+        total_before = before['total_evaluations'] if before else 0
+        five_stars_before = before['five_stars'] if before else 0
+
+        await create_cleaning_with_evaluated_offer_helper(
+            db=db,
+            owner=test_user2,
+            cleaner=test_user5,
+            cleaning_create=CleaningCreate(name='aggregate cleaning', price=29.99, cleaning_type='full_clean'),
+            evaluation_create=EvaluationCreate(professionalism=5, overall_rating=5, no_show=True),
+        )
+
+        after = await evals_repo.get_cleaner_aggregates(cleaner=test_user5)
+        assert after['total_evaluations'] == total_before + 1
+        assert after['five_stars'] == five_stars_before + 1
+        assert after['max_overall_rating'] == 5
+        assert after['total_no_show'] >= 1
+
     async def test_unauthenticated_user_forbidden_from_get_requests(
         self,
         app: FastAPI,
@@ -276,3 +546,10 @@ class TestGetEvaluations:
             )
         )
         assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+        res = await client.get(
+            app.url_path_for(
+                'evaluations:export-evaluations-for-cleaner', username=test_user3.username,
+            )
+        )
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from httpx import AsyncClient
+
+from databases import Database
+
+from app.models.cleaning import CleaningInDB
+
+from app.db.executor import QueryExecutor
+from app.db.executor import compile_query
+from app.db.executor import query_lock
+from app.db.repositories.cleanings import GET_CLEANING_BY_ID_QUERY
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestCompileQuery:
+    async def test_named_params_become_positional_in_order_of_first_use(self) -> None:
+        query = compile_query("""
+            SELECT overall_rating::float8
+            FROM cleaning_to_cleaner_evaluations
+            WHERE cleaner_id = :cleaner_id
+              AND (CAST(:rating AS integer) IS NULL OR overall_rating >= :rating)
+              AND headline != 'a:b'
+              AND created_at > :created_at
+        """)
+        assert query.param_names == ('cleaner_id', 'rating', 'created_at')
+        assert 'overall_rating::float8' in query.positional_sql
+        assert 'cleaner_id = $1' in query.positional_sql
+        assert 'CAST($2 AS integer) IS NULL OR overall_rating >= $2' in query.positional_sql
+        assert 'created_at > $3' in query.positional_sql
+        assert query.args({'created_at': 3, 'rating': 2, 'cleaner_id': 1}) == [1, 2, 3]
+
+
+    async def test_compiled_query_is_still_the_original_sql(self) -> None:
+        sql = 'SELECT id FROM cleanings WHERE id = :id'
+        assert compile_query(sql) == sql
+        assert str(compile_query(sql)) == sql
+
+
+class TestQueryExecutor:
+    async def test_databases_still_has_the_query_lock_compiled_queries_take(
+        self, client: AsyncClient, db: Database
+    ) -> None:
+        async with db.connection() as connection:
+            assert isinstance(query_lock(connection), asyncio.Lock)
+
+
+    async def test_compiled_and_plain_queries_return_the_same_rows(
+        self, client: AsyncClient, db: Database, test_cleaning: CleaningInDB
+    ) -> None:
+        executor = QueryExecutor(db)
+
+        native = await executor.fetch_one(query=GET_CLEANING_BY_ID_QUERY, values={'id': test_cleaning.id})
+        plain = await executor.fetch_one(query=str(GET_CLEANING_BY_ID_QUERY), values={'id': test_cleaning.id})
+        assert dict(native) == dict(plain)
+        assert CleaningInDB.from_trusted_record(native) == test_cleaning
+
+        assert await executor.fetch_val(query=GET_CLEANING_BY_ID_QUERY, values={'id': test_cleaning.id}) == test_cleaning.id
+        assert await executor.fetch_one(query=GET_CLEANING_BY_ID_QUERY, values={'id': -1}) is None
+
+
+    async def test_compiled_queries_join_the_current_transaction(
+        self, client: AsyncClient, db: Database, test_cleaning: CleaningInDB
+    ) -> None:
+        executor = QueryExecutor(db)
+        update = compile_query('UPDATE cleanings SET name = :name WHERE id = :id RETURNING id')
+
+        transaction = await db.transaction()
+        try:
+            assert await executor.execute(query=update, values={'name': 'rolled back', 'id': test_cleaning.id})
+            inside = await executor.fetch_one(query=GET_CLEANING_BY_ID_QUERY, values={'id': test_cleaning.id})
+            assert inside['name'] == 'rolled back'
+        finally:
+            await transaction.rollback()
+
+        after = await executor.fetch_one(query=GET_CLEANING_BY_ID_QUERY, values={'id': test_cleaning.id})
+        assert after['name'] == test_cleaning.name
\ No newline at end of file
@@ -0,0 +1,74 @@
+import pytest
+
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient
+
+from fastapi import FastAPI
+from fastapi import status
+
+from app.core import config
+from app.core.warmup import HOT_QUERIES
+
+from app.models.health import HealthStatus
+from app.models.health import WarmupReport
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestHealthRoutes:
+    async def test_routes_exist(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(app.url_path_for('health:live'))
+        assert res.status_code != status.HTTP_404_NOT_FOUND
+        res = await client.get(app.url_path_for('health:ready'))
+        assert res.status_code != status.HTTP_404_NOT_FOUND
+
+
+class TestHealthChecks:
+    async def test_worker_is_live(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(app.url_path_for('health:live'))
+        assert res.status_code == status.HTTP_200_OK
+        assert HealthStatus(**res.json()).status == 'alive'
+
+
+    async def test_worker_is_ready_once_warmed_up(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(app.url_path_for('health:ready'))
+        assert res.status_code == status.HTTP_200_OK
+
+        health = HealthStatus(**res.json())
+        assert health.status == 'ready'
+        assert health.warmup.db_connections == config.DB_MIN_POOL_SIZE
+        assert health.warmup.prepared_statements == len(HOT_QUERIES)
+        # the client fixture turns the hashing warmup off
+        assert health.warmup.hashing_workers == 0
+
+        assert app.state._db_pool.snapshot()['size'] >= config.DB_MIN_POOL_SIZE
+
+
+    async def test_startup_hashes_on_every_hashing_worker_when_enabled(self, app: FastAPI, monkeypatch) -> None:
+        monkeypatch.setattr(config, 'PASSWORD_HASHING_WARMUP', True)
+
+        async with LifespanManager(app):
+            assert WarmupReport(**app.state._warmup).hashing_workers >= 1
+
+
+    async def test_worker_is_not_ready_before_warmup_or_after_shutdown_begins(
+        self, app: FastAPI, client: AsyncClient
+    ) -> None:
+        warmup = app.state._warmup
+        app.state._ready = False
+        try:
+            res = await client.get(app.url_path_for('health:ready'))
+            assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert HealthStatus(**res.json()).status == 'stopping'
+
+            app.state._warmup = None
+            res = await client.get(app.url_path_for('health:ready'))
+            assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert HealthStatus(**res.json()).status == 'starting'
+
+            # the worker stays live throughout
+            res = await client.get(app.url_path_for('health:live'))
+            assert res.status_code == status.HTTP_200_OK
+        finally:
+            app.state._ready = True
+            app.state._warmup = warmup
\ No newline at end of file
@@ -0,0 +1,123 @@
+import pytest
+
+from httpx import AsyncClient
+
+from fastapi import FastAPI
+from fastapi import status
+
+from app.core import config
+
+from app.models.metrics import DBPoolStats
+from app.models.metrics import RouteQueryStats
+from app.models.user import UserInDB
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestMetricsRoutes:
+    async def test_routes_exist(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(app.url_path_for('metrics:get-db-pool-stats'))
+        assert res.status_code != status.HTTP_404_NOT_FOUND
+        res = await client.get(app.url_path_for('metrics:get-query-stats'))
+        assert res.status_code != status.HTTP_404_NOT_FOUND
+        res = await client.get(app.url_path_for('metrics:prometheus'))
+        assert res.status_code != status.HTTP_404_NOT_FOUND
+
+
+class TestOperatorMetricsAccess:
+    @pytest.mark.parametrize('route_name', ('metrics:get-db-pool-stats', 'metrics:get-query-stats'))
+    async def test_unauthenticated_users_cannot_read_operator_metrics(
+        self, app: FastAPI, client: AsyncClient, route_name: str,
+    ) -> None:
+        res = await client.get(app.url_path_for(route_name))
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.parametrize('route_name', ('metrics:get-db-pool-stats', 'metrics:get-query-stats'))
+    async def test_only_superusers_can_read_operator_metrics(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB, route_name: str,
+    ) -> None:
+        res = await authorized_client.get(app.url_path_for(route_name))
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestDBPoolStats:
+    async def test_pool_stats_reflect_configured_sizes_and_checkouts(
+        self, app: FastAPI, superuser_client: AsyncClient, test_superuser: UserInDB,
+    ) -> None:
+        res = await superuser_client.get(app.url_path_for('metrics:get-db-pool-stats'))
+        assert res.status_code == status.HTTP_200_OK
+        before = DBPoolStats(**res.json())
+        assert before.min_size <= before.size <= before.max_size
+
+        # any route that talks to the db checks out a connection
+        res = await superuser_client.get(app.url_path_for('cleanings:list-all-user-cleanings'))
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await superuser_client.get(app.url_path_for('metrics:get-db-pool-stats'))
+        after = DBPoolStats(**res.json())
+        assert after.acquire_latency_seconds.count > before.acquire_latency_seconds.count
+        assert after.acquire_latency_seconds.buckets['+Inf'] == after.acquire_latency_seconds.count
+        assert after.in_use == 0
+        assert after.waiters == 0
+        assert after.idle == after.size
+
+
+class TestQueryStats:
+    async def test_queries_are_aggregated_by_route_name(
+        self, app: FastAPI, superuser_client: AsyncClient, test_superuser: UserInDB,
+    ) -> None:
+        for _ in range(2):
+            res = await superuser_client.get(app.url_path_for('cleanings:list-all-user-cleanings'))
+            assert res.status_code == status.HTTP_200_OK
+
+        res = await superuser_client.get(app.url_path_for('metrics:get-query-stats'))
+        assert res.status_code == status.HTTP_200_OK
+        route_stats = RouteQueryStats(**res.json()['cleanings:list-all-user-cleanings'])
+        assert route_stats.requests == 2
+        assert route_stats.queries >= 2
+        assert route_stats.max_queries_per_request >= 1
+        assert route_stats.db_time_seconds >= route_stats.slowest_query_seconds > 0
+        assert 'FROM cleanings' in route_stats.slowest_query or 'FROM users' in route_stats.slowest_query
+
+    async def test_debug_mode_adds_query_stats_headers(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB, monkeypatch,
+    ) -> None:
+        res = await authorized_client.get(app.url_path_for('cleanings:list-all-user-cleanings'))
+        assert 'X-DB-Query-Count' not in res.headers
+
+        monkeypatch.setattr(config, 'DEBUG', True)
+        res = await authorized_client.get(app.url_path_for('cleanings:list-all-user-cleanings'))
+        assert res.status_code == status.HTTP_200_OK
+        assert int(res.headers['X-DB-Query-Count']) >= 1
+        assert float(res.headers['X-DB-Time-Ms']) >= float(res.headers['X-DB-Slowest-Ms']) > 0
+
+
+class TestPrometheusMetrics:
+    async def test_metrics_report_requests_pool_loop_and_hashing(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB,
+    ) -> None:
+        res = await authorized_client.get(app.url_path_for('cleanings:list-all-user-cleanings'))
+        assert res.status_code == status.HTTP_200_OK
+        res = await authorized_client.get('/api/not-a-route/')
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+        res = await authorized_client.get(app.url_path_for('metrics:prometheus'))
+        assert res.status_code == status.HTTP_200_OK
+        assert res.headers['content-type'].startswith('text/plain; version=0.0.4')
+        lines = res.text.splitlines()
+
+        assert (
+            'http_requests_total{route="cleanings:list-all-user-cleanings",method="GET",status="200"} 1' in lines
+        )
+        assert 'http_requests_total{route="unmatched",method="GET",status="404"} 1' in lines
+        assert 'http_request_errors_total{route="cleanings:list-all-user-cleanings"} 0' in lines
+        assert (
+            'http_request_duration_seconds_count{route="cleanings:list-all-user-cleanings"} 1' in lines
+        )
+        for metric in (
+            'event_loop_lag_last_seconds',
+            'db_pool_saturation',
+            'db_pool_waiters',
+            'password_hashing_queue_depth',
+        ):
+            assert f'# TYPE {metric} gauge' in lines
\ No newline at end of file
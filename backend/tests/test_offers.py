@@ -5,16 +5,23 @@ import pytest
 
 from httpx import AsyncClient
 from fastapi import FastAPI
+from fastapi import HTTPException
 from fastapi import status
 
+import asyncio
+import contextvars
 import random
 
 from databases import Database
 
+from asyncpg.exceptions import UniqueViolationError
+
 from app.models.cleaning import CleaningCreate
 from app.models.cleaning import CleaningInDB
+from app.models.cleaning import CleaningPublic
 
 from app.models.user import UserInDB
+from app.models.user import UserPublic
 
 from app.models.offer import OfferCreate
 from app.models.offer import OfferUpdate
@@ -177,6 +184,46 @@ class TestGetOffers:
             assert offer['user_id'] in [user.id for user in test_user_list]
 
 
+    async def test_listed_offers_can_embed_users_and_cleaning_with_one_extra_query(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        test_user2: UserInDB,
+        test_user_list: List[UserInDB],
+        test_cleaning_with_offers: CleaningInDB,
+        query_counter: List[str],
+    ) -> None:
+        authorized_client = create_authorized_client(user=test_user2)
+        url = app.url_path_for('offers:list-offers-for-cleaning', cleaning_id=test_cleaning_with_offers.id)
+
+        # the first request also warms the authenticated user cache
+        res = await authorized_client.get(url)
+        assert res.status_code == status.HTTP_200_OK
+
+        query_counter.clear()
+        res = await authorized_client.get(url)
+        assert res.status_code == status.HTTP_200_OK
+        queries_without_expand = len(query_counter)
+
+        query_counter.clear()
+        res = await authorized_client.get(url, params=[('expand', 'user'), ('expand', 'cleaning')])
+        assert res.status_code == status.HTTP_200_OK
+        assert len(query_counter) == queries_without_expand + 1
+
+        # expanded objects take the place of the ids, under the same keys
+        users_by_id = {user.id: user for user in test_user_list}
+        offers = res.json()
+        assert len(offers) == len(test_user_list)
+        for offer in offers:
+            user = UserPublic(**offer['user_id'])
+            cleaning = CleaningPublic(**offer['cleaning_id'])
+            assert user.username == users_by_id[user.id].username
+            assert user.profile.user_id == user.id
+            assert cleaning.id == test_cleaning_with_offers.id
+            assert cleaning.name == test_cleaning_with_offers.name
+            assert 'password' not in offer['user_id']
+
+
     async def test_non_owners_forbidden_from_fetching_all_offers_for_cleaning(
         self, app: FastAPI, authorized_client: AsyncClient, test_cleaning_with_offers: CleaningInDB,
     ) -> None:
@@ -293,6 +340,47 @@ class TestAcceptOffers:
                 assert offer.status == 'rejected'
 
 
+    async def test_concurrent_accepts_leave_exactly_one_accepted_offer(
+        self, client: AsyncClient, db: Database, test_cleaning_with_offers: CleaningInDB,
+    ) -> None:
+        offers_repo = OffersRepository(db)
+        pending_offers = await offers_repo.list_offers_for_cleaning(cleaning=test_cleaning_with_offers)
+
+        async def accept(offer: OfferInDB) -> int:
+            try:
+                await offers_repo.accept_offer(offer=offer, offer_update=OfferUpdate(status='accepted'))
+            except HTTPException as e:
+                return e.status_code
+
+            return status.HTTP_200_OK
+
+        # databases keeps a task's connection in a ContextVar that new tasks inherit, so tasks started from
+        # this one would all queue on its connection. A fresh context makes each accept take its own pooled one.
+        tasks = [contextvars.Context().run(asyncio.ensure_future, accept(offer)) for offer in pending_offers * 10]
+        status_codes = await asyncio.gather(*tasks)
+        assert status_codes.count(status.HTTP_200_OK) == 1
+        assert status_codes.count(status.HTTP_409_CONFLICT) == len(status_codes) - 1
+
+        offers = await offers_repo.list_offers_for_cleaning(cleaning=test_cleaning_with_offers)
+        assert [offer.status for offer in offers].count('accepted') == 1
+        assert [offer.status for offer in offers].count('rejected') == len(offers) - 1
+
+
+    async def test_database_rejects_a_second_accepted_offer(
+        self, client: AsyncClient, db: Database, test_user4: UserInDB, test_cleaning_with_accepted_offer: CleaningInDB,
+    ) -> None:
+        # concurrent accepts are serialized by ACCEPT_OFFER_QUERY's row locks, the index covers every other write
+        with pytest.raises(UniqueViolationError):
+            await db.execute(
+                query="""
+                    UPDATE user_offers_for_cleanings
+                    SET status = 'accepted'
+                    WHERE cleaning_id = :cleaning_id AND user_id = :user_id
+                """,
+                values={'cleaning_id': test_cleaning_with_accepted_offer.id, 'user_id': test_user4.id},
+            )
+
+
 class TestCancelOffers:
     async def test_user_can_cancel_offer_after_it_has_been_accepted(
         self,
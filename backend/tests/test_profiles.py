@@ -58,6 +58,28 @@ class TestProfileView:
         profile = ProfilePublic(**res.json())
         assert profile.username == test_user2.username
 
+    async def test_unchanged_profile_returns_not_modified_until_updated(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB
+    ) -> None:
+        url = app.url_path_for('profiles:get-profile-by-username', username=test_user.username)
+        res = await authorized_client.get(url)
+        assert res.status_code == status.HTTP_200_OK
+        etag = res.headers['etag']
+
+        res = await authorized_client.get(url, headers={'If-None-Match': etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.content == b''
+
+        res = await authorized_client.put(
+            app.url_path_for('profiles:update-own-profile'), json={'profile_update': {'bio': 'changed for etag'}},
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await authorized_client.get(url, headers={'If-None-Match': etag})
+        assert res.status_code == status.HTTP_200_OK
+        assert res.headers['etag'] != etag
+        assert res.json()['bio'] == 'changed for etag'
+
     async def test_unregistered_users_cannot_access_other_users_profile(
         self, app: FastAPI, client: AsyncClient, test_user2: UserInDB
     ) -> None:
@@ -119,4 +141,21 @@ class TestProfileManagement:
         res = await authorized_client.put(
             app.url_path_for('profiles:update-own-profile'), json={'profile_update': {attr: value}},
         )
-        assert res.status_code == status_code
\ No newline at end of file
+        assert res.status_code == status_code
+
+    async def test_profile_update_is_reflected_for_already_resolved_user(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB,
+    ) -> None:
+        # resolve the current user once so it's cached for this token
+        res = await authorized_client.get(app.url_path_for('users:get-current-user'))
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await authorized_client.put(
+            app.url_path_for('profiles:update-own-profile'),
+            json={'profile_update': {'full_name': 'LeBron Raymone James'}},
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await authorized_client.get(app.url_path_for('users:get-current-user'))
+        assert res.status_code == status.HTTP_200_OK
+        assert UserPublic(**res.json()).profile.full_name == 'LeBron Raymone James'
\ No newline at end of file
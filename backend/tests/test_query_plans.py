@@ -0,0 +1,190 @@
+import json
+from datetime import datetime
+from datetime import timezone
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Tuple
+
+import pytest
+
+from httpx import AsyncClient
+
+from databases import Database
+
+from app.models.cleaning import CleaningInDB
+from app.models.user import UserInDB
+
+from app.db.repositories import cleanings
+from app.db.repositories import evaluations
+from app.db.repositories import offers
+from app.db.repositories import profiles
+from app.db.repositories import users
+
+pytestmark = pytest.mark.asyncio
+
+
+# indexes the queries below are expected to use. Looking an offer up by cleaning and user is fine
+# through either the primary key or the cleaning index, the planner picks one or the other as the tables grow
+OFFER_BY_CLEANING_AND_USER = ('pk_user_offers_for_cleanings', 'ix_user_offers_for_cleanings_cleaning_id')
+EVALUATION_BY_CLEANING_AND_CLEANER = (
+    'pk_cleaning_to_cleaner_evaluations', 'ix_cleaning_to_cleaner_evaluations_cleaning_id',
+)
+EVALUATIONS_BY_CLEANER = ('ix_cleaner_evaluations_cleaner_id_created_at_cleaning_id',)
+
+# every query that reads or modifies existing rows, with the keys it filters on and the indexes it must use:
+# one of the names in each group has to show up in the plan
+REPOSITORY_QUERIES = (
+    (users.GET_USER_BY_EMAIL_QUERY, ('email',), (('ix_users_email',), ('ix_profiles_user_id',))),
+    (users.GET_USER_BY_USERNAME_QUERY, ('username',), (('ix_users_username',), ('ix_profiles_user_id',))),
+    (users.GET_USERS_BY_IDS_QUERY, ('ids',), (('users_pkey',), ('ix_profiles_user_id',))),
+    (profiles.GET_PROFILE_BY_USER_ID_QUERY, ('user_id',), (('ix_profiles_user_id',),)),
+    (profiles.GET_PROFILE_BY_USERNAME_QUERY, ('username',), (('ix_users_username',), ('ix_profiles_user_id',))),
+    (
+        profiles.UPDATE_PROFILE_QUERY,
+        ('full_name', 'phone_number', 'bio', 'image', 'user_id'),
+        (('ix_profiles_user_id',),),
+    ),
+    (cleanings.GET_CLEANING_BY_ID_QUERY, ('id',), (('cleanings_pkey',),)),
+    (cleanings.GET_CLEANINGS_BY_IDS_QUERY, ('ids',), (('cleanings_pkey',),)),
+    (cleanings.LIST_USER_CLEANINGS_QUERY, ('owner', 'limit'), (('ix_cleanings_owner_created_at_id',),)),
+    (
+        cleanings.LIST_USER_CLEANINGS_AFTER_CURSOR_QUERY,
+        ('owner', 'created_at', 'id', 'limit'),
+        (('ix_cleanings_owner_created_at_id',),),
+    ),
+    (
+        cleanings.UPDATE_CLEANING_BY_ID_QUERY,
+        ('name', 'description', 'price', 'cleaning_type', 'id'),
+        (('cleanings_pkey',),),
+    ),
+    (cleanings.DELETE_CLEANING_BY_ID_QUERY, ('id',), (('cleanings_pkey',),)),
+    (offers.LIST_OFFERS_FOR_CLEANING_QUERY, ('cleaning_id',), (('ix_user_offers_for_cleanings_cleaning_id',),)),
+    (offers.GET_OFFER_FOR_CLEANING_FROM_USER_QUERY, ('cleaning_id', 'user_id'), (OFFER_BY_CLEANING_AND_USER,)),
+    (
+        offers.ACCEPT_OFFER_QUERY,
+        ('cleaning_id', 'user_id'),
+        (('ix_user_offers_for_cleanings_pending_cleaning_id', 'ix_user_offers_for_cleanings_cleaning_id'),),
+    ),
+    (offers.CANCEL_OFFER_QUERY, ('cleaning_id', 'user_id'), (OFFER_BY_CLEANING_AND_USER,)),
+    (
+        offers.SET_ALL_OTHER_OFFERS_AS_PENDING_QUERY,
+        ('cleaning_id', 'user_id'),
+        (('ix_user_offers_for_cleanings_cleaning_id',),),
+    ),
+    (offers.RESCIND_OFFER_QUERY, ('cleaning_id', 'user_id'), (OFFER_BY_CLEANING_AND_USER,)),
+    (offers.MARK_OFFER_COMPLETED_QUERY, ('cleaning_id', 'user_id'), (OFFER_BY_CLEANING_AND_USER,)),
+    (
+        evaluations.GET_CLEANER_EVALUATION_FOR_CLEANING_QUERY,
+        ('cleaning_id', 'cleaner_id'),
+        (EVALUATION_BY_CLEANING_AND_CLEANER,),
+    ),
+    (evaluations.LIST_EVALUATIONS_FOR_CLEANER_QUERY, ('cleaner_id',), (EVALUATIONS_BY_CLEANER,)),
+    (
+        evaluations.LIST_NEWEST_EVALUATIONS_FOR_CLEANER_QUERY,
+        ('cleaner_id', 'min_overall_rating', 'no_show', 'limit'),
+        (EVALUATIONS_BY_CLEANER,),
+    ),
+    (
+        evaluations.LIST_NEWEST_EVALUATIONS_FOR_CLEANER_AFTER_CURSOR_QUERY,
+        ('cleaner_id', 'created_at', 'cleaning_id', 'min_overall_rating', 'no_show', 'limit'),
+        (EVALUATIONS_BY_CLEANER,),
+    ),
+    (
+        evaluations.LIST_OLDEST_EVALUATIONS_FOR_CLEANER_QUERY,
+        ('cleaner_id', 'min_overall_rating', 'no_show', 'limit'),
+        (EVALUATIONS_BY_CLEANER,),
+    ),
+    (
+        evaluations.LIST_OLDEST_EVALUATIONS_FOR_CLEANER_AFTER_CURSOR_QUERY,
+        ('cleaner_id', 'created_at', 'cleaning_id', 'min_overall_rating', 'no_show', 'limit'),
+        (EVALUATIONS_BY_CLEANER,),
+    ),
+    (
+        evaluations.UPDATE_CLEANER_AGGREGATES_FOR_EVALUATION_QUERY,
+        ('cleaning_id', 'cleaner_id'),
+        (EVALUATION_BY_CLEANING_AND_CLEANER,),
+    ),
+    (
+        evaluations.GET_CLEANER_AGGREGATE_RATINGS_QUERY,
+        ('cleaner_id',),
+        (('cleaner_evaluation_aggregates_pkey',),),
+    ),
+)
+
+
+def get_scan_node_types(plan: Dict) -> List[str]:
+    node_types = [plan['Node Type']] if 'Relation Name' in plan else []
+    for child in plan.get('Plans', []):
+        node_types.extend(get_scan_node_types(child))
+
+    return node_types
+
+
+def get_index_names(plan: Dict) -> Set[str]:
+    # bitmap heap scans name their index on the bitmap index scan below them
+    index_names = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        index_names |= get_index_names(child)
+
+    return index_names
+
+
+@pytest.fixture
+async def seeded_values(
+    client: AsyncClient,
+    test_user2: UserInDB,
+    test_user3: UserInDB,
+    test_cleaning_with_offers: CleaningInDB,
+    test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB],
+) -> Dict:
+    return {
+        'email': test_user2.email,
+        'username': test_user2.username,
+        'user_id': test_user3.id,
+        'owner': test_user2.id,
+        'id': test_cleaning_with_offers.id,
+        'cleaning_id': test_cleaning_with_offers.id,
+        'ids': [test_user3.id, test_cleaning_with_offers.id],
+        'cleaner_id': test_user3.id,
+        'created_at': datetime.now(timezone.utc),
+        'limit': 10,
+        'min_overall_rating': None,
+        'no_show': None,
+        'name': 'name',
+        'description': 'description',
+        'price': 9.99,
+        'cleaning_type': 'spot_clean',
+        'full_name': None,
+        'phone_number': None,
+        'bio': None,
+        'image': None,
+    }
+
+
+class TestRepositoryQueryPlans:
+    @pytest.mark.parametrize('query, keys, expected_indexes', REPOSITORY_QUERIES)
+    async def test_repository_query_uses_expected_indexes(
+        self, seeded_values: Dict, db: Database, query: str, keys: tuple, expected_indexes: Tuple[Tuple[str, ...], ...],
+    ) -> None:
+        # with sequential scans priced out, the planner only falls back to one when no index applies
+        async with db.transaction():
+            await db.execute('SET LOCAL enable_seqscan = off')
+            record = await db.fetch_one(
+                query=f'EXPLAIN (FORMAT JSON) {query}', values={key: seeded_values[key] for key in keys}
+            )
+
+        plan = record['QUERY PLAN']
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        node_types = get_scan_node_types(plan[0]['Plan'])
+        assert node_types
+        assert 'Seq Scan' not in node_types, f'Sequential scan in plan: {json.dumps(plan, indent=2)}'
+
+        # no seq scan alone isn't enough, without a usable index the planner walks a whole unrelated index instead
+        index_names = get_index_names(plan[0]['Plan'])
+        for alternatives in expected_indexes:
+            assert index_names & set(alternatives), (
+                f'None of {alternatives} in plan: {json.dumps(plan, indent=2)}'
+            )
\ No newline at end of file
@@ -5,6 +5,9 @@ from typing import (
     Optional,
 )
 
+import time
+import asyncio
+
 import pytest
 
 import jwt
@@ -47,6 +50,10 @@ from app.models.user import UserPublic
 from app.db.repositories.users import UsersRepository
 
 from app.services import auth_service
+from app.services.cache import UserCache
+from app.services.cache import VerifiedTokenCache
+from app.services.authentication import AuthService
+from app.services.hashing import HashingPool
 
 pytestmark = pytest.mark.asyncio
 
@@ -114,6 +121,35 @@ class TestUserRegistration:
         assert res.status_code == status_code
 
 
+    async def test_registration_is_a_single_round_trip(
+        self, app: FastAPI, client: AsyncClient, query_counter: List[str],
+    ) -> None:
+        new_user = {'email': 'rihanna@fenty.io', 'username': 'badgalriri', 'password': 'umbrellaella'}
+        res = await client.post(app.url_path_for('users:register-new-user'), json={'new_user': new_user})
+        assert res.status_code == HTTP_201_CREATED
+        assert len(query_counter) == 1
+        assert UserPublic(**res.json()).profile is not None
+
+    async def test_concurrent_registrations_only_create_one_user(
+        self, app: FastAPI, client: AsyncClient, db: Database,
+    ) -> None:
+        responses = await asyncio.gather(*(
+            client.post(
+                app.url_path_for('users:register-new-user'),
+                json={'new_user': {'email': f'drake{i}@ovo.io', 'username': 'champagnepapi', 'password': 'hotlinebling'}},
+            )
+            for i in range(10)
+        ))
+        assert sorted(res.status_code for res in responses) == [HTTP_201_CREATED] + [HTTP_400_BAD_REQUEST] * 9
+        assert all(
+            res.json()['detail'] == 'That username is already taken. Please try another one.'
+            for res in responses if res.status_code == HTTP_400_BAD_REQUEST
+        )
+
+        # and the one user that was created got a profile along with it
+        user_in_db = await UsersRepository(db).get_user_by_username(username='champagnepapi')
+        assert user_in_db.profile is not None
+
     async def test_users_saved_password_is_hashed_and_has_salt(
         self,
         app: FastAPI,
@@ -309,4 +345,94 @@ class TestUserMe:
         res = await client.get(
             app.url_path_for('users:get-current-user'), headers={'Authorization': f'{jwt_prefix} {token}'}
         )
-        assert res.status_code == HTTP_401_UNAUTHORIZED
\ No newline at end of file
+        assert res.status_code == HTTP_401_UNAUTHORIZED
+
+
+class TestUserCache:
+    async def test_cached_users_are_evicted_least_recently_used_first(
+        self, client: AsyncClient, test_user: UserInDB, test_user2: UserInDB,
+    ) -> None:
+        cache = UserCache(max_size=2, ttl=60)
+        cache.set_user(token='token-1', user=test_user)
+        cache.set_user(token='token-2', user=test_user2)
+        assert cache.get_user(token='token-1') == test_user
+
+        cache.set_user(token='token-3', user=test_user2)
+        assert len(cache) == 2
+        assert cache.get_user(token='token-1') == test_user
+        assert cache.get_user(token='token-2') is None
+
+    async def test_cached_users_expire_after_ttl(
+        self, client: AsyncClient, test_user: UserInDB, monkeypatch,
+    ) -> None:
+        cache = UserCache(max_size=10, ttl=60)
+        cache.set_user(token='token-1', user=test_user)
+        assert cache.get_user(token='token-1') == test_user
+
+        monotonic = time.monotonic
+        monkeypatch.setattr(time, 'monotonic', lambda: monotonic() + 61)
+        assert cache.get_user(token='token-1') is None
+        assert len(cache) == 0
+        assert cache._keys_by_user_id == {}
+
+    async def test_invalidating_user_drops_all_of_their_tokens(
+        self, client: AsyncClient, test_user: UserInDB, test_user2: UserInDB,
+    ) -> None:
+        cache = UserCache(max_size=10, ttl=60)
+        cache.set_user(token='token-1', user=test_user)
+        cache.set_user(token='token-2', user=test_user)
+        cache.set_user(token='token-3', user=test_user2)
+
+        cache.invalidate_user(user_id=test_user.id)
+        assert cache.get_user(token='token-1') is None
+        assert cache.get_user(token='token-2') is None
+        assert cache.get_user(token='token-3') == test_user2
+
+
+class TestVerifiedTokenCache:
+    async def test_verified_tokens_skip_decoding_until_evicted(
+        self, client: AsyncClient, test_user: UserInDB, monkeypatch,
+    ) -> None:
+        service = AuthService(token_cache=VerifiedTokenCache(max_size=10, ttl=60))
+        token = service.create_access_token_for_user(user=test_user, secret_key=str(SECRET_KEY))
+        assert service.get_username_from_token(token=token, secret_key=str(SECRET_KEY)) == test_user.username
+
+        def fail_decode(*args, **kwargs):
+            raise jwt.InvalidSignatureError()
+
+        monkeypatch.setattr(jwt, 'decode', fail_decode)
+        assert service.get_username_from_token(token=token, secret_key=str(SECRET_KEY)) == test_user.username
+
+        # a cached token is only good for the secret it was verified with
+        with pytest.raises(HTTPException):
+            service.get_username_from_token(token=token, secret_key='ABC123')
+
+        service.token_cache.clear()
+        with pytest.raises(HTTPException):
+            service.get_username_from_token(token=token, secret_key=str(SECRET_KEY))
+
+    async def test_cached_tokens_dont_outlive_their_exp(self, client: AsyncClient, test_user: UserInDB) -> None:
+        cache = VerifiedTokenCache(max_size=10, ttl=60)
+        cache.set_username(token='token-1', secret_key='secret', username=test_user.username, expires_at=0)
+        assert cache.get_username(token='token-1', secret_key='secret') is None
+        assert len(cache) == 0
+
+
+class TestPasswordHashingPool:
+    async def test_async_hashing_round_trips_with_sync_verification(self) -> None:
+        salt = auth_service.generate_salt()
+        hashed_pw = await auth_service.hash_password_async(password='heatcavslakers', salt=salt)
+
+        assert auth_service.verify_password(password='heatcavslakers', salt=salt, hashed_pw=hashed_pw)
+        assert await auth_service.verify_password_async(password='heatcavslakers', salt=salt, hashed_pw=hashed_pw)
+        assert not await auth_service.verify_password_async(password='wrongpassword', salt=salt, hashed_pw=hashed_pw)
+
+    async def test_full_pool_rejects_new_work_with_503(self) -> None:
+        pool = HashingPool(max_workers=1, max_queue=0)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(sum, [1, 2])
+
+        assert exc_info.value.status_code == 503
+        assert pool.pending == 0
+        pool.shutdown()
\ No newline at end of file
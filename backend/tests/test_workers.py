@@ -0,0 +1,40 @@
+from gunicorn.config import Config
+from gunicorn.glogging import Logger
+
+from app.core.workers import AutoUvicornWorker
+from app.core.workers import get_worker_count
+
+
+class TestWorkerCount:
+    def test_explicit_concurrency_wins(self) -> None:
+        assert get_worker_count(concurrency=3, cpu_count=16) == 3
+        assert get_worker_count(concurrency=3, max_workers=2, cpu_count=16) == 3
+
+    def test_scales_with_cpu_count(self) -> None:
+        assert get_worker_count(cpu_count=8) == 8
+        assert get_worker_count(workers_per_core=2, cpu_count=8) == 16
+        assert get_worker_count(workers_per_core=0.5, cpu_count=8) == 4
+
+    def test_runs_at_least_two_workers(self) -> None:
+        assert get_worker_count(cpu_count=1) == 2
+        assert get_worker_count(workers_per_core=0.25, cpu_count=4) == 2
+
+    def test_max_workers_caps_the_count(self) -> None:
+        assert get_worker_count(max_workers=4, cpu_count=32) == 4
+        assert get_worker_count(max_workers=0, cpu_count=32) == 32
+        assert get_worker_count(max_workers=1, cpu_count=32) == 1
+
+
+class TestAutoUvicornWorker:
+    def test_passes_gunicorn_settings_through_to_uvicorn(self) -> None:
+        cfg = Config()
+        cfg.set('keepalive', 7)
+        cfg.set('max_requests', 123)
+        cfg.set('max_requests_jitter', 0)
+        cfg.set('backlog', 99)
+
+        worker = AutoUvicornWorker(0, 0, [], None, 30, cfg, Logger(cfg))
+        assert worker.config.timeout_keep_alive == 7
+        assert worker.config.limit_max_requests == 123
+        assert worker.config.backlog == 99
+        assert (worker.config.loop, worker.config.http) == ('auto', 'auto')
\ No newline at end of file